@@ -0,0 +1,40 @@
+import argparse
+
+from utils.batch import list_graphs, expand_jobs, run_batch, SEEDINGS, PRICINGS
+from utils.solver import SOLVERS
+
+def main():
+    parser = argparse.ArgumentParser(description="複数のグラフとパラメータの組合せで列生成法をまとめて解く")
+    parser.add_argument("source", help="グラフ (*.csv) のディレクトリ, またはマニフェスト (.json / .jsonl)")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="出力先 (.jsonl または .parquet)")
+    parser.add_argument("--lambda", dest="lambda_values", type=float, nargs="+", default=[0.5])
+    parser.add_argument("--seeding", nargs="+", choices=SEEDINGS, default=["singleton"])
+    parser.add_argument("--pricing", nargs="+", choices=PRICINGS, default=["heuristic"])
+    parser.add_argument("--jobs", type=int, default=None, help="同時に実行するジョブ数 (省略時は CPU 数)")
+    parser.add_argument("--time-limit", type=float, default=None, help="ジョブごとの制限時間 [秒]")
+    parser.add_argument("--memory-limit", type=float, default=None, help="ジョブごとのメモリの上限 [MB]")
+    parser.add_argument("--lp-solver", choices=SOLVERS, default="CBC")
+    parser.add_argument("--milp-solver", choices=SOLVERS, default="CBC")
+    parser.add_argument("--cache-dir", default=None, help="グラフのキャッシュを置くディレクトリ")
+    parser.add_argument(
+        "--checkpoint-dir", default=None, help="チェックポイントを置くディレクトリ (既にあるジョブはそこから再開する)"
+    )
+    args = parser.parse_args()
+
+    graphs = list_graphs(args.source)
+    jobs = expand_jobs(
+        graphs, args.lambda_values, seedings=args.seeding, pricings=args.pricing, time_limit=args.time_limit,
+        lp_solver=args.lp_solver, milp_solver=args.milp_solver, cache_dir=args.cache_dir,
+        checkpoint_dir=args.checkpoint_dir,
+    )
+    print(f"グラフ数: {len(graphs)}, ジョブ数: {len(jobs)}")
+
+    rows = run_batch(jobs, output=args.output, n_jobs=args.jobs, memory_limit=args.memory_limit)
+
+    failed = [row for row in rows if row["status"] in ("timeout", "memory_limit", "error", "crashed")]
+    print(f"完了: {len(rows) - len(failed)}, 失敗: {len(failed)}, 出力: {args.output}")
+    for row in failed:
+        print(f"  [{row['job_id']}] {row['name']} lambda={row['lambda_val']}: {row['status']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import sys
+
+from utils.benchmark import STAGES, make_cases, quick_cases, run_benchmarks, environment, compare_to_baseline
+
+def main():
+    parser = argparse.ArgumentParser(description="合成グラフで各ステージの実行時間を計測し, ベースラインと比べる")
+    parser.add_argument("-o", "--output", default=None, help="計測結果の出力先 (JSON)")
+    parser.add_argument("--quick", action="store_true", help="小さなケースだけを計測する")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 30, 40])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.1, 0.3])
+    parser.add_argument("--negative-fractions", type=float, nargs="+", default=[0.2, 0.5])
+    parser.add_argument("--noises", type=float, nargs="+", default=[0.05])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=60.0, help="AP-MILP と列生成法の制限時間 [秒]")
+    parser.add_argument("--baseline", default=None, help="比べるベースライン (以前の出力の JSON)")
+    parser.add_argument("--save-baseline", default=None, help="計測結果をベースラインとして保存する先")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="回帰とみなす実行時間の増加率")
+    parser.add_argument("--min-seconds", type=float, default=0.01, help="回帰とみなす実行時間の最小の差 [秒]")
+    args = parser.parse_args()
+
+    if args.quick:
+        cases = quick_cases()
+    else:
+        cases = make_cases(args.sizes, args.densities, args.negative_fractions, args.noises)
+
+    def progress(result):
+        print(f"{result['case']:<32} {result['stage']:<22} min {result['min']:.4f}s  median {result['median']:.4f}s")
+
+    results = run_benchmarks(cases, args.stages, repeats=args.repeats, time_limit=args.time_limit, callback=progress)
+    report = {"environment": environment(), "results": results}
+
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline["results"], args.tolerance, args.min_seconds)
+
+        print(f"\n=== ベースラインとの比較: {args.baseline} ===")
+        if baseline["environment"] != report["environment"]:
+            print("注意: ベースラインと計測環境が異なる")
+        for row in regressions:
+            print(
+                f"  {row['case']:<32} {row['stage']:<22} {row['baseline']:.4f}s -> {row['current']:.4f}s "
+                f"(x{row['ratio']:.2f})"
+            )
+        print(f"回帰: {len(regressions)} 件")
+
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,11 @@
-from utils.input_data import read_csv_as_numpy
-from utils.graph import generate_signed_graph
+from utils.input_data import read_csv_as_signed_graph
+from utils.graph_cache import load_cached_signed_graph
 from utils.plot import plot_graph, plot_lps_objective, plot_partitioned_graph
-from utils.partition import generate_singleton
+from utils.seeding import generate_seed_partitions
+from utils.lps import LPS
+from utils.ap_milp import AP_MILP
 from utils.column_generation import column_generation
+from utils.branch_and_price import branch_and_price
 
 def main():
     # データセットの選択
@@ -10,20 +13,25 @@ def main():
     # dataset = "02_GahukuGama_AdjMat.csv"
     print(f"\n=== データセット: {dataset} ===")
 
-    # 隣接行列のデータを読込む
-    Adj = read_csv_as_numpy(f"./data/test_data/{dataset}")
+    # 隣接行列のデータを読込む (2 回目以降はキャッシュをメモリマップで読込む)
+    graph = load_cached_signed_graph(f"./data/test_data/{dataset}", loader=read_csv_as_signed_graph)
 
     # 隣接行列をもとにグラフを生成
-    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+    G = graph.to_networkx()
+    vertices, A_plus, A_minus, D_plus, D_minus = graph.unpack()
 
     # # グラフの可視化
     plot_graph(G, title="Signed Graph")
 
     # 列生成法
     lambda_val = 0.5
-    init_partitions = [generate_singleton(vertices)]
+    # 初期の分割は単独の頂点の分割とヒューリスティック (連結成分, ラベル伝播, 局所移動, スペクトル分割) の分割
+    init_partitions = generate_seed_partitions(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val)
+    # LPS と AP-MILP は分枝価格法の根ノードでも使い回す
+    lps = LPS(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions)
+    ap_milp = AP_MILP(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val)
     cg_opt, cg_sol, lps_opt_list, S, cnt = column_generation(
-        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions, lps=lps, ap_milp=ap_milp
     )
 
     # 結果の出力
@@ -37,8 +45,20 @@ def main():
     # LPSの最適値の推移をプロット
     plot_lps_objective(lps_opt_list)
 
+    # 分枝価格法で整数の分割を求める (LPS の解は分数のことがある).
+    # 根ノードは列生成法で解いた LPS から始めるので, 列生成法をやり直さない
+    bp_opt, bp_sol, bp_stats = branch_and_price(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions, lps=lps, ap_milp=ap_milp
+    )
+    print("\n=== 分枝価格法の結果 ===")
+    print(f"ノード数: {bp_stats['nodes']}")
+    print(f"最終目的関数値: {bp_opt:.4f}")
+    print("最終分割:")
+    for C in bp_sol:
+        print(f"  {set(C)}")
+
     # 最終的な分割の可視化
-    plot_partitioned_graph(G, cg_sol, title="Partitioned Signed Network")
+    plot_partitioned_graph(G, bp_sol, title="Partitioned Signed Network")
 
 if __name__ == '__main__':
     main()
@@ -1,5 +1,5 @@
-from utils.input_data import read_csv_as_numpy
-from utils.graph import generate_signed_graph
+from utils.input_data import read_csv_as_signed_graph
+from utils.graph_cache import load_cached_signed_graph
 from utils.plot import plot_graph, plot_lps_objective, plot_partitioned_graph
 from utils.partition import generate_singleton
 from utils.column_generation_with_partition import column_generation_with_partition
@@ -10,11 +10,12 @@ def main():
     # dataset = "02_GahukuGama_AdjMat.csv"
     print(f"\n=== データセット: {dataset} ===")
 
-    # 隣接行列のデータを読込む
-    Adj = read_csv_as_numpy(f"./data/test_data/{dataset}")
+    # 隣接行列のデータを読込む (2 回目以降はキャッシュをメモリマップで読込む)
+    graph = load_cached_signed_graph(f"./data/test_data/{dataset}", loader=read_csv_as_signed_graph)
 
     # 隣接行列をもとにグラフを生成
-    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+    G = graph.to_networkx()
+    vertices, A_plus, A_minus, D_plus, D_minus = graph.unpack()
 
     # # グラフの可視化
     # plot_graph(G, title=f"Signed Graph - {dataset}")
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from utils.input_data import read_csv_as_numpy
+from utils.graph import generate_signed_graph
+
+def random_signed_graph(n, seed):
+    """正の辺 35%, 負の辺 20% のランダムな符号付きグラフの隣接行列"""
+    rng = np.random.default_rng(seed)
+    A = np.zeros((n, n), dtype=int)
+    for i in range(n):
+        for j in range(i + 1, n):
+            r = rng.random()
+            if r < 0.35:
+                A[i, j] = A[j, i] = 1
+            elif r < 0.55:
+                A[i, j] = A[j, i] = -1
+
+    return A
+
+@pytest.fixture
+def fractional_graph():
+    """lambda = 0.5 で列生成法の解が分数になる 7 頂点のグラフ (全分割の列挙による最適値は 41 / 12)"""
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(random_signed_graph(7, seed=7))
+
+    return vertices, A_plus, A_minus, D_plus, D_minus
+
+@pytest.fixture
+def slovene():
+    """Slovene データセットのグラフ"""
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+
+    return vertices, A_plus, A_minus, D_plus, D_minus
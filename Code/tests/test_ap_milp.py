@@ -0,0 +1,54 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from utils.input_data import read_csv_as_numpy
+from utils.graph import generate_signed_graph
+from utils.wc import calc_w_C
+from utils.ap_milp import AP_MILP
+from utils.ap_milp_with_partition import AP_MILPWithPartition
+
+@pytest.fixture
+def brute_force():
+    """全列挙による要素数ごとの被約費用の最大値"""
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+    lambda_val = 0.5
+
+    rng = np.random.default_rng(0)
+    lps_dual_sol = {u: float(rng.uniform(-1, 4)) for u in vertices}
+
+    best = {}
+    for k in range(1, len(vertices) + 1):
+        best[k] = max(
+            calc_w_C(list(C), A_plus, A_minus, D_plus, D_minus, lambda_val) - sum(lps_dual_sol[u] for u in C)
+            for C in itertools.combinations(vertices, k)
+        )
+
+    return (vertices, A_plus, A_minus, D_plus, D_minus, lambda_val), lps_dual_sol, best
+
+@pytest.mark.parametrize("formulation", ["full", "compact"])
+def test_ap_milp(brute_force, formulation):
+    """AP-MILP の最適値が被約費用の最大値と一致するか"""
+    graph, lps_dual_sol, best = brute_force
+
+    ap_milp = AP_MILP(*graph, formulation=formulation)
+    ap_milp.add_lps_dual_sol(lps_dual_sol)
+    ap_milp_opt, ap_milp_sol = ap_milp.solve_model()
+
+    assert ap_milp_opt == pytest.approx(max(best.values()))
+
+@pytest.mark.parametrize("formulation", ["full", "compact"])
+def test_ap_milp_with_partition(brute_force, formulation):
+    """要素数 k を固定した AP-MILP の最適値が k * (被約費用の最大値) と一致するか"""
+    graph, lps_dual_sol, best = brute_force
+
+    ap_milp = AP_MILPWithPartition(*graph, formulation=formulation)
+    ap_milp.add_lps_dual_sol(lps_dual_sol)
+    for k in range(2, len(graph[0]) + 1):
+        ap_milp.update_partition_constr(k)
+        ap_milp_opt, ap_milp_sol = ap_milp.solve_model()
+
+        assert ap_milp_opt == pytest.approx(k * best[k])
+        assert sum(x_val > 0.5 for x_val in ap_milp_sol["x_u"].values()) == k
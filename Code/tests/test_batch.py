@@ -0,0 +1,129 @@
+import json
+import multiprocessing
+import sys
+
+import pytest
+
+from utils.batch import list_graphs, expand_jobs, checkpoint_path, run_job, run_batch, _worker
+
+def test_list_graphs(tmp_path):
+    """ディレクトリとマニフェストのどちらからでも同じグラフの一覧が得られるか"""
+    graphs = list_graphs("./data/test_data")
+    assert [graph["name"] for graph in graphs] == ["01_Slovene_AdjMat", "02_GahukuGama_AdjMat"]
+    assert all(graph["format"] == "adjacency" for graph in graphs)
+
+    manifest = tmp_path / "graphs.jsonl"
+    manifest.write_text(
+        json.dumps({"path": graphs[0]["path"], "name": "slovene"}) + "\n" + json.dumps(graphs[1]["path"]) + "\n"
+    )
+    from_manifest = list_graphs(str(manifest))
+    assert [graph["name"] for graph in from_manifest] == ["slovene", "02_GahukuGama_AdjMat"]
+    assert [graph["path"] for graph in from_manifest] == [graph["path"] for graph in graphs]
+
+def test_expand_jobs():
+    """ジョブがグラフとパラメータの格子の直積になるか"""
+    graphs = list_graphs("./data/test_data")
+    jobs = expand_jobs(graphs, [0.3, 0.5], seedings=("singleton", "heuristic"), pricings=("exact",))
+
+    assert len(jobs) == 2 * 2 * 2
+    assert [job["job_id"] for job in jobs] == list(range(8))
+    assert {(job["lambda_val"], job["seeding"]) for job in jobs} == {
+        (0.3, "singleton"), (0.3, "heuristic"), (0.5, "singleton"), (0.5, "heuristic")
+    }
+
+    with pytest.raises(ValueError):
+        expand_jobs(graphs, [0.5], pricings=("exhaustive",))
+
+def test_run_job():
+    """Slovene の lambda = 0.5 の最適値と分割が得られるか"""
+    graphs = list_graphs("./data/test_data")
+    job = expand_jobs(graphs[:1], [0.5], pricings=("exact",))[0]
+
+    result = run_job(job)
+
+    assert result["status"] == "optimal"
+    assert result["cg_opt"] == pytest.approx(23.0)
+    assert result["integral"]
+    assert result["partition_value"] == pytest.approx(23.0)
+    assert sorted(u for C in result["partition"] for u in C) == list(range(result["n"]))
+
+def test_run_batch(tmp_path):
+    """並列に解いた結果が JSONL に 1 行ずつ書かれ, 失敗したジョブも記録されるか"""
+    graphs = list_graphs("./data/test_data")
+    graphs.append({"name": "missing", "path": str(tmp_path / "missing.csv"), "format": "adjacency"})
+    jobs = expand_jobs(graphs, [0.5], seedings=("singleton", "heuristic"), time_limit=60)
+    output = tmp_path / "results.jsonl"
+
+    rows = run_batch(jobs, output=str(output), n_jobs=2)
+
+    assert [row["job_id"] for row in rows] == list(range(6))
+    with open(output, encoding="utf-8") as f:
+        written = [json.loads(line) for line in f]
+    assert sorted(row["job_id"] for row in written) == list(range(6))
+
+    for row in rows:
+        if row["name"] == "missing":
+            assert row["status"] == "error"
+        else:
+            assert row["status"] == "optimal"
+            assert row["max_rss_mb"] > 0
+    assert [row["cg_opt"] for row in rows if row["name"] == "01_Slovene_AdjMat"] == [pytest.approx(23.0)] * 2
+
+def test_run_batch_timeout(tmp_path):
+    """制限時間を過ぎても終わらないジョブは子プロセスごと止めるか"""
+    graphs = list_graphs("./data/test_data")
+    jobs = expand_jobs(graphs[1:], [0.5], pricings=("exact",), time_limit=0.0)
+
+    rows = run_batch(jobs, n_jobs=1, kill_grace=0.0, poll_interval=0.01)
+
+    assert rows[0]["status"] == "timeout"
+
+def test_worker_without_resource(tmp_path, monkeypatch):
+    """resource のないプラットフォームでもメモリの上限を警告して無視し, ジョブを実行するか"""
+    graphs = [{"name": "missing", "path": str(tmp_path / "missing.csv"), "format": "adjacency"}]
+    job = expand_jobs(graphs, [0.5])[0]
+    monkeypatch.setitem(sys.modules, "resource", None)
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+
+    with pytest.warns(UserWarning, match="memory_limit"):
+        _worker(job, sender, memory_limit=1024)
+
+    result = receiver.recv()
+    assert result["status"] == "error"
+    assert result["max_rss_mb"] is None
+
+def test_run_job_checkpoint(tmp_path, monkeypatch):
+    """チェックポイントがあれば再開して同じ結果になるか"""
+    graphs = list_graphs("./data/test_data")
+    job = expand_jobs(graphs[:1], [0.5], pricings=("exact",), checkpoint_dir=str(tmp_path))[0]
+
+    first = run_job(job)
+
+    # 終了済みのチェックポイントからは列生成法を解き直さずに結果を返す
+    def fail(*args, **kwargs):
+        raise AssertionError("column_generation must not be called")
+    monkeypatch.setattr("utils.batch.column_generation", fail)
+    second = run_job(job)
+
+    assert not first["resumed"]
+    assert second["resumed"]
+    assert second["status"] == first["status"] == "optimal"
+    assert second["cg_opt"] == pytest.approx(first["cg_opt"])
+    assert second["iterations"] == first["iterations"]
+    assert second["partition_value"] == pytest.approx(first["partition_value"])
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+def test_checkpoint_path_options(tmp_path):
+    """ソルバーや column_generation の引数が違うジョブは別のチェックポイントになるか"""
+    graphs = list_graphs("./data/test_data")
+    base = expand_jobs(graphs[:1], [0.5], checkpoint_dir=str(tmp_path))[0]
+    same = expand_jobs(graphs[:1], [0.5], checkpoint_dir=str(tmp_path))[0]
+    others = [
+        expand_jobs(graphs[:1], [0.5], checkpoint_dir=str(tmp_path), lp_solver="HiGHS")[0],
+        expand_jobs(graphs[:1], [0.5], checkpoint_dir=str(tmp_path), milp_solver="HiGHS")[0],
+        expand_jobs(graphs[:1], [0.5], checkpoint_dir=str(tmp_path), gap_tol=1e-3)[0],
+    ]
+
+    assert checkpoint_path(base) == checkpoint_path(same)
+    paths = {checkpoint_path(job) for job in [base] + others}
+    assert len(paths) == 4
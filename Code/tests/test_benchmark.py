@@ -0,0 +1,39 @@
+import pytest
+
+from utils.benchmark import STAGES, make_cases, run_benchmarks, compare_to_baseline
+
+def test_run_benchmarks():
+    """全てのステージが計測され, 列生成法が最適性を確かめて終わるか"""
+    cases = make_cases(sizes=(10,), densities=(0.3,), negative_fractions=(0.3,))
+
+    results = run_benchmarks(cases, repeats=2, time_limit=30)
+
+    assert [row["stage"] for row in results] == list(STAGES)
+    assert all(len(row["times"]) == 2 and 0 <= row["min"] <= row["median"] for row in results)
+    cg = results[-1]
+    assert cg["status"] == "optimal"
+    assert cg["cg_opt"] > 0
+
+    with pytest.raises(ValueError):
+        run_benchmarks(cases, stages=("ap_milp",))
+
+def test_compare_to_baseline():
+    """許容範囲を超えて遅くなったものだけを回帰とし, 制限時間に達したベースラインは比べない"""
+    baseline = [
+        {"case": "a", "stage": "lps_build", "min": 1.0},
+        {"case": "a", "stage": "calc_w_C", "min": 1.0},
+        {"case": "a", "stage": "column_generation", "min": 60.0, "status": "time_limit"},
+        {"case": "b", "stage": "lps_build", "min": 0.001},
+    ]
+    results = [
+        {"case": "a", "stage": "lps_build", "min": 2.0},
+        {"case": "a", "stage": "calc_w_C", "min": 1.2},
+        {"case": "a", "stage": "column_generation", "min": 120.0, "status": "time_limit"},
+        {"case": "b", "stage": "lps_build", "min": 0.005},
+        {"case": "c", "stage": "lps_build", "min": 9.0},
+    ]
+
+    regressions = compare_to_baseline(results, baseline, tolerance=0.5, min_seconds=0.01)
+
+    assert [(row["case"], row["stage"]) for row in regressions] == [("a", "lps_build")]
+    assert regressions[0]["ratio"] == pytest.approx(2.0)
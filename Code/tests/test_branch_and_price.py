@@ -0,0 +1,86 @@
+import pytest
+
+from utils.input_data import read_csv_as_numpy
+from utils.graph import generate_signed_graph
+from utils.partition import generate_singleton
+from utils.lps import LPS
+from utils.ap_milp import AP_MILP
+from utils.column_generation import column_generation
+from utils.branch_and_price import branch_and_price, select_branching_pair
+
+def test_select_branching_pair():
+    """f_rs が分数の組を選び, 整数解なら None"""
+    lps_primal_sol = {
+        frozenset({0, 1, 2}): 0.5, frozenset({0, 1}): 0.5, frozenset({2}): 0.5, frozenset({3}): 1.0,
+    }
+    assert select_branching_pair(lps_primal_sol) in {(0, 2), (1, 2)}
+    assert select_branching_pair({frozenset({0, 1}): 1.0, frozenset({2}): 1.0}) is None
+
+def test_branch_and_price_slovene():
+    """根ノードの LPS が整数解なら分枝しない"""
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+
+    bp_opt, bp_sol, stats = branch_and_price(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)]
+    )
+
+    assert bp_opt == pytest.approx(23.0)
+    assert set(bp_sol) == {
+        frozenset({0, 2, 5, 7, 8}), frozenset({1, 3}), frozenset({4}), frozenset({6}), frozenset({9})
+    }
+    assert stats["nodes"] == 1
+    assert stats["status"] == "optimal"
+
+def test_branch_and_price_reuse_root(fractional_graph, monkeypatch):
+    """列生成法で解いた LPS と AP-MILP を渡すと, 根ノードの列生成法をやり直さずに同じ分割が得られるか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = fractional_graph
+    init_partitions = [generate_singleton(vertices)]
+    solves = []
+    solve_model = LPS.solve_model
+    def counting_solve_model(self):
+        solves.append(self)
+        return solve_model(self)
+    monkeypatch.setattr(LPS, "solve_model", counting_solve_model)
+
+    branch_and_price(vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions, heuristic_pricing=False)
+    fresh_solves = len(solves)
+
+    lps = LPS(vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions)
+    ap_milp = AP_MILP(vertices, A_plus, A_minus, D_plus, D_minus, 0.5)
+    column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions, heuristic_pricing=False,
+        lps=lps, ap_milp=ap_milp, presolve=True,
+    )
+    solves.clear()
+    bp_opt, bp_sol, stats = branch_and_price(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions, heuristic_pricing=False,
+        lps=lps, ap_milp=ap_milp,
+    )
+
+    assert bp_opt == pytest.approx(41 / 12)
+    assert stats["status"] == "optimal"
+    assert ap_milp.fixed == []
+    assert len(solves) < fresh_solves
+
+@pytest.mark.parametrize("strategy", ["best_bound", "depth_first"])
+def test_branch_and_price_fractional(fractional_graph, strategy):
+    """根ノードの LPS が分数解のグラフで, 全分割の列挙と同じ最適値の分割が得られるか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = fractional_graph
+    init_partitions = [generate_singleton(vertices)]
+
+    cg_opt, cg_sol, _, _, _ = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions, heuristic_pricing=False
+    )
+    assert any(1e-6 < z_val < 1 - 1e-6 for z_val in cg_sol.values())
+
+    bp_opt, bp_sol, stats = branch_and_price(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions, strategy=strategy
+    )
+
+    assert bp_opt == pytest.approx(41 / 12)
+    assert bp_opt < cg_opt
+    assert sorted(u for C in bp_sol for u in C) == list(vertices)
+    assert stats["status"] == "optimal"
+    assert stats["nodes"] > 1
+    assert stats["gap"] == pytest.approx(0.0)
@@ -0,0 +1,40 @@
+from utils.input_data import read_csv_as_numpy
+from utils.graph import generate_signed_graph
+from utils.partition import generate_singleton
+from utils.lps import LPS
+from utils.parallel_pricing import PartitionPricer
+from utils.cardinality_search import CardinalitySearch
+
+def test_cardinality_search():
+    """上界が AP-MILP の最適値以上で, 枝刈りしても同じ列が見つかるか"""
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+    lambda_val = 0.5
+
+    lps = LPS(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, [generate_singleton(vertices)])
+    _, _, lps_dual_sol = lps.solve_model()
+
+    search = CardinalitySearch(A_plus, A_minus, D_plus, D_minus, lambda_val)
+    bounds = search.upper_bounds(lps_dual_sol)
+    ks = range(2, len(vertices) + 1)
+
+    with PartitionPricer(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val) as pricer:
+        columns, ap_milp_opts = pricer.price(lps_dual_sol, ks)
+
+        focus_ks, rest_ks = search.candidates(lps_dual_sol)
+        assert focus_ks == []
+        assert len(rest_ks) < len(ks)
+        pruned_columns, _ = pricer.price(lps_dual_sol, rest_ks)
+
+        search.record(pruned_columns)
+        focus_ks, _ = search.candidates(lps_dual_sol)
+        assert set(focus_ks) <= set(range(1, 7)) and len(focus_ks) > 0
+
+    with PartitionPricer(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, lp_bound=True) as pricer:
+        lp_columns, lp_opts = pricer.price(lps_dual_sol, ks)
+
+    for k in ks:
+        assert bounds[k] >= ap_milp_opts[k] - 1e-6
+        assert lp_opts[k] >= ap_milp_opts[k] - 1e-6
+    assert pruned_columns == columns
+    assert lp_columns == columns
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from utils.partition import generate_singleton
+from utils.column_generation import column_generation, resume_column_generation
+from utils.checkpoint import load_checkpoint, restore_lps
+
+class Preempted(Exception):
+    pass
+
+def test_checkpoint_round_trip(slovene, tmp_path):
+    """保存した列, 重み, キャッシュ, 双対解を読み込み, 作り直した LPS の最適値が一致するか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = slovene
+    cg_opt, _, lps_opt_list, _, cnt, stats = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)],
+        heuristic_pricing=False, purge_age=1, purge_threshold=0.0, return_stats=True,
+        checkpoint_path=tmp_path / "cg.npz",
+    )
+
+    checkpoint = load_checkpoint(tmp_path / "cg.npz")
+    assert checkpoint["iteration"] == cnt
+    assert checkpoint["status"] == "optimal"
+    assert checkpoint["lps_opt_list"] == pytest.approx(lps_opt_list)
+    assert checkpoint["lps_opt_list"][-1] == pytest.approx(cg_opt)
+    assert len(checkpoint["ub_list"]) == cnt + 1
+    assert checkpoint["ub_list"][-1] == pytest.approx(stats["ub_list"][-1])
+    assert checkpoint["best_ub"] == pytest.approx(stats["best_ub"])
+    assert set(checkpoint["dual_sol"]) == set(vertices)
+
+    lps = restore_lps(checkpoint, vertices, A_plus, A_minus, D_plus, D_minus, 0.5)
+    assert list(lps.w_C_dict) == checkpoint["columns"]
+    assert lps.column_cache == pytest.approx(checkpoint["cache"])
+    assert lps.protected == {frozenset({u}) for u in vertices}
+
+    lps_opt, _, _ = lps.solve_model()
+    assert lps_opt == pytest.approx(cg_opt)
+
+    # 別の lambda や別のグラフのチェックポイントからは作り直さない
+    with pytest.raises(ValueError):
+        restore_lps(checkpoint, vertices, A_plus, A_minus, D_plus, D_minus, 0.3)
+    with pytest.raises(ValueError):
+        restore_lps(checkpoint, vertices, A_plus, A_minus, np.asarray(D_plus) + 1, D_minus, 0.5)
+
+def test_checkpoint_stabilization_center(slovene, tmp_path):
+    """安定化の中心と暫定解を保存するか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = slovene
+    column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)],
+        stabilization="box", heuristic_interval=1, checkpoint_path=tmp_path / "cg.npz",
+    )
+
+    checkpoint = load_checkpoint(tmp_path / "cg.npz")
+    assert set(checkpoint["center"]) == set(vertices)
+    assert checkpoint["incumbent"] == pytest.approx(23.0)
+    assert sum(len(C) for C in checkpoint["incumbent_sol"]) == len(vertices)
+
+@pytest.mark.parametrize("stabilization", [None, "wentges"])
+def test_resume_column_generation(slovene, tmp_path, stabilization):
+    """途中で止めた列生成法をチェックポイントから再開して同じ最適値が得られるか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = slovene
+    path = tmp_path / "cg.npz"
+
+    def preempt(record):
+        if record["event"] == "iteration" and record["iteration"] >= 2:
+            raise Preempted()
+
+    with pytest.raises(Preempted):
+        column_generation(
+            vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)],
+            multi_column=False, heuristic_pricing=False, stabilization=stabilization,
+            callback=preempt, checkpoint_path=path, checkpoint_interval=0,
+        )
+
+    checkpoint = load_checkpoint(path)
+    assert checkpoint["status"] is None
+    assert checkpoint["iteration"] >= 2
+
+    records = []
+    cg_opt, _, lps_opt_list, _, cnt = resume_column_generation(
+        path, vertices, A_plus, A_minus, D_plus, D_minus, 0.5,
+        multi_column=False, heuristic_pricing=False, stabilization=stabilization,
+        callback=records.append, checkpoint_interval=0,
+    )
+
+    assert cg_opt == pytest.approx(23.0)
+    assert records[0]["iteration"] == checkpoint["iteration"]
+    assert lps_opt_list[:checkpoint["iteration"]] == pytest.approx(checkpoint["lps_opt_list"])
+    assert len(lps_opt_list) == cnt + 1
+    assert load_checkpoint(path)["status"] == "optimal"
+
+def test_resume_finished_column_generation(slovene, tmp_path):
+    """終了したチェックポイントから再開しても最後の LPS の値が重複しないか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = slovene
+    path = tmp_path / "cg.npz"
+    cg_opt, _, lps_opt_list, _, cnt = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)],
+        heuristic_pricing=False, checkpoint_path=path,
+    )
+
+    resumed_opt, _, resumed_list, _, resumed_cnt = resume_column_generation(
+        path, vertices, A_plus, A_minus, D_plus, D_minus, 0.5, heuristic_pricing=False,
+    )
+
+    assert resumed_opt == pytest.approx(cg_opt)
+    assert resumed_cnt == cnt
+    assert resumed_list == pytest.approx(lps_opt_list)
+    assert load_checkpoint(path)["lps_opt_list"] == pytest.approx(lps_opt_list)
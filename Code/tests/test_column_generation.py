@@ -0,0 +1,167 @@
+import json
+
+import pytest
+
+from utils.partition import generate_singleton
+from utils.column_generation import column_generation
+from utils.telemetry import Telemetry
+from utils.solver import highs_available
+
+requires_highs = pytest.mark.skipif(not highs_available(), reason="highspy is not installed")
+
+@pytest.mark.parametrize("multi_column, heuristic_pricing", [(False, False), (True, False), (True, True)])
+def test_column_generation(slovene, multi_column, heuristic_pricing):
+    """列生成法の最適値と最終解"""
+    vertices, A_plus, A_minus, D_plus, D_minus = slovene
+
+    cg_opt, cg_sol, lps_opt_list, S, cnt = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)],
+        multi_column=multi_column, heuristic_pricing=heuristic_pricing,
+    )
+
+    expected_partition = {
+        frozenset({0, 2, 5, 7, 8}), frozenset({1, 3}), frozenset({4}), frozenset({6}), frozenset({9})
+    }
+
+    assert cg_opt == pytest.approx(23.0)
+    assert {C for C, value in cg_sol.items() if value > 1e-6} == expected_partition
+    assert lps_opt_list[-1] == pytest.approx(23.0)
+    assert len(lps_opt_list) == cnt + 1
+
+@pytest.mark.parametrize("stabilization", ["wentges", "box", "du_merle"])
+def test_column_generation_with_stabilization(slovene, stabilization):
+    """双対変数を安定化しても同じ最適値に収束するか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = slovene
+
+    cg_opt, cg_sol, lps_opt_list, S, cnt = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)],
+        multi_column=False, heuristic_pricing=False, stabilization=stabilization,
+    )
+
+    assert cg_opt == pytest.approx(23.0)
+    assert lps_opt_list[-1] == pytest.approx(23.0)
+    assert len(lps_opt_list) == cnt + 1
+
+def test_column_generation_bounds(slovene):
+    """ラグランジュ上界とギャップ・制限時間による終了"""
+    vertices, A_plus, A_minus, D_plus, D_minus = slovene
+    init_partitions = [generate_singleton(vertices)]
+    kwargs = dict(multi_column=False, heuristic_pricing=False, return_stats=True)
+
+    cg_opt, _, lps_opt_list, _, cnt, stats = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions, **kwargs
+    )
+    assert stats["status"] == "optimal"
+    assert stats["best_ub"] == pytest.approx(23.0, abs=1e-3)
+    assert stats["gap"] < 1e-4
+    assert len(stats["ub_list"]) == len(lps_opt_list)
+    for lps_opt, ub in zip(lps_opt_list, stats["ub_list"]):
+        assert ub >= 23.0 - 1e-6 >= lps_opt - 1e-6
+
+    # ギャップの許容値が大きければ最初の価格付けで終了する
+    cg_opt, _, lps_opt_list, _, cnt, stats = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions, gap_tol=10.0, **kwargs
+    )
+    assert stats["status"] == "gap"
+    assert cnt == 0
+    assert cg_opt == lps_opt_list[0]
+    assert stats["gap"] <= 10.0
+
+    cg_opt, cg_sol, lps_opt_list, _, cnt, stats = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions, time_limit=0, **kwargs
+    )
+    assert stats["status"] == "time_limit"
+    assert cg_opt == lps_opt_list[-1]
+    assert sum(cg_sol.values()) > 0
+
+def test_column_generation_with_purge(fractional_graph):
+    """使われない列を LPS から外しても同じ最適値に収束するか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = fractional_graph
+    init_partitions = [generate_singleton(vertices)]
+    kwargs = dict(multi_column=True, heuristic_pricing=False)
+
+    cg_opt, _, _, S, _ = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions, **kwargs
+    )
+    purged_opt, _, lps_opt_list, purged_S, cnt = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions,
+        purge_age=1, purge_threshold=0.0, **kwargs
+    )
+
+    assert purged_opt == pytest.approx(cg_opt)
+    assert len(purged_S) < len(S)
+    assert len(lps_opt_list) == cnt + 1
+
+@pytest.mark.parametrize("lp_solver, milp_solver", [
+    ("CBC", "CBC"),
+    pytest.param("HiGHS", "CBC", marks=requires_highs),
+    pytest.param("CBC", "HiGHS", marks=requires_highs),
+    pytest.param("HiGHS", "HiGHS", marks=requires_highs),
+])
+def test_column_generation_solvers(fractional_graph, lp_solver, milp_solver):
+    """LPS と AP-MILP のソルバーを変えても同じ最適値に収束するか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = fractional_graph
+
+    cg_opt, _, lps_opt_list, _, cnt = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)],
+        heuristic_pricing=False, lp_solver=lp_solver, milp_solver=milp_solver,
+    )
+
+    assert cg_opt == pytest.approx(3.5)
+    assert len(lps_opt_list) == cnt + 1
+
+def test_column_generation_telemetry(slovene, tmp_path):
+    """反復ごとの計測値がコールバックとトレースに同じ内容で渡されるか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = slovene
+    records = []
+    trace_path = tmp_path / "trace.jsonl"
+
+    cg_opt, _, lps_opt_list, S, cnt, stats = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)],
+        heuristic_pricing=True, return_stats=True, callback=records.append, trace_path=str(trace_path),
+    )
+
+    iterations = [record for record in records if record["event"] == "iteration"]
+    assert [record["iteration"] for record in iterations] == list(range(cnt + 1))
+    assert [record["lps_opt"] for record in iterations] == pytest.approx(lps_opt_list)
+    assert all(record["master_time"] > 0 and record["wc_time"] >= 0 for record in iterations)
+    assert iterations[0]["dual_change"] is None
+    assert sum(record["columns_added"] for record in iterations) == len(S) - len(vertices)
+
+    # 最後の反復は AP-MILP で列がないことを確かめて終わる
+    assert iterations[-1]["pricing"] == "milp"
+    assert iterations[-1]["columns_added"] == 0
+    assert records[-1]["event"] == "finish"
+    assert records[-1]["cg_opt"] == pytest.approx(cg_opt)
+    assert stats["trace"] == records
+
+    with open(trace_path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["event"] for line in lines] == [record["event"] for record in records]
+
+def test_column_generation_trace_closed_on_error(slovene, tmp_path, monkeypatch):
+    """途中で例外が出てもトレースのファイルを閉じ, 確定した反復までが残るか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = slovene
+    trace_path = tmp_path / "trace.jsonl"
+    instances = []
+
+    class RecordingTelemetry(Telemetry):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            instances.append(self)
+    monkeypatch.setattr("utils.column_generation.Telemetry", RecordingTelemetry)
+
+    def callback(record):
+        if record["iteration"] == 1:
+            raise RuntimeError("stop")
+
+    with pytest.raises(RuntimeError, match="stop"):
+        column_generation(
+            vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)],
+            callback=callback, trace_path=str(trace_path),
+        )
+
+    assert instances[0].trace is None
+    with open(trace_path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["iteration"] for line in lines] == [0]
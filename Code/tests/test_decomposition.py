@@ -0,0 +1,77 @@
+import numpy as np
+import scipy.sparse as sp
+import pytest
+
+from utils.signed_graph import SignedGraph
+from utils.partition import generate_singleton
+from utils.column_generation import column_generation
+from utils.decomposition import decomposed_column_generation
+
+def disjoint_union(*blocks):
+    """隣接行列を対角に並べたグラフ"""
+    A = sp.block_diag([sp.csr_array(np.asarray(block, dtype=np.int8)) for block in blocks], format="csr")
+
+    return SignedGraph.from_adjacency(A)
+
+def test_decomposition_trivial_components():
+    """孤立点と孤立した辺だけのグラフは解析的に解き, 双対変数が非負なら全体でも最適"""
+    graph = disjoint_union([[0]], [[0, 1], [1, 0]], [[0, -1], [-1, 0]], [[0]])
+    vertices, A_plus, A_minus, D_plus, D_minus = graph.unpack()
+
+    cg_opt, cg_sol, S, stats = decomposed_column_generation(vertices, A_plus, A_minus, D_plus, D_minus, 0.5)
+
+    # 正の辺は 1 つにまとめて w = 2 lambda, 負の辺は単独で w = 2 lambda ずつ
+    assert cg_opt == pytest.approx(1.0 + 2.0)
+    assert set(cg_sol) == {
+        frozenset({0}), frozenset({1, 2}), frozenset({3}), frozenset({4}), frozenset({5})
+    }
+    assert stats["components"] == 4
+    assert stats["trivial"] == 4
+    assert stats["certificate"] == "dual"
+
+@pytest.mark.parametrize("lambda_val", [0.3, 0.5])
+def test_decomposition_matches_full(fractional_graph, lambda_val):
+    """連結成分に分けて解いた最適値が全体の列生成法の最適値と一致するか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = fractional_graph
+    A = np.asarray(A_plus) - np.asarray(A_minus)
+    negative_triangle = -(np.ones((3, 3), dtype=int) - np.eye(3, dtype=int))
+    graph = disjoint_union(A, negative_triangle, [[0]], [[0, 1], [1, 0]])
+    vertices, A_plus, A_minus, D_plus, D_minus = graph.unpack()
+
+    cg_opt, cg_sol, S, stats = decomposed_column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, heuristic_pricing=False
+    )
+    full_opt, _, _, _, _ = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, [generate_singleton(vertices)],
+        heuristic_pricing=False
+    )
+
+    assert cg_opt == pytest.approx(full_opt)
+    assert stats["components"] == 4
+    assert stats["certificate"] in ("dual", "pricing")
+    assert stats["status"] == "optimal"
+    assert cg_opt >= stats["component_opt"] - 1e-6
+
+    # 解は各頂点を合計 1 で覆う
+    cover = {u: 0.0 for u in vertices}
+    for C, z_val in cg_sol.items():
+        for u in C:
+            cover[u] += z_val
+    assert all(value == pytest.approx(1.0) for value in cover.values())
+
+@pytest.mark.parametrize("certify", [False, True])
+def test_decomposition_not_optimal_components(fractional_graph, certify):
+    """成分の列生成法が最適に終わらなければ双対変数による証明は出さないか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = fractional_graph
+    A = np.asarray(A_plus) - np.asarray(A_minus)
+    graph = disjoint_union(A, A, [[0]])
+    vertices, A_plus, A_minus, D_plus, D_minus = graph.unpack()
+
+    _, _, _, stats = decomposed_column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, certify=certify, time_limit=0, heuristic_pricing=False
+    )
+
+    assert stats["certificate"] is None
+    assert stats["status"] == "time_limit"
+    assert stats["statuses"] == sorted(stats["statuses"])
+    assert "time_limit" in stats["statuses"]
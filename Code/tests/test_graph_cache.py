@@ -0,0 +1,69 @@
+import functools
+import shutil
+
+import numpy as np
+
+from utils.input_data import read_csv_as_signed_graph, read_edge_list
+from utils.graph_cache import load_cached_signed_graph
+
+def test_load_cached_signed_graph(tmp_path):
+    """
+    キャッシュの作成と, 2 回目以降のメモリマップでの読み込み
+    """
+    source = tmp_path / "01_Slovene_AdjMat.csv"
+    shutil.copy("./data/test_data/01_Slovene_AdjMat.csv", source)
+    cache_dir = tmp_path / "cache"
+
+    calls = []
+    def loader(path):
+        calls.append(path)
+        return read_csv_as_signed_graph(path)
+
+    expected = read_csv_as_signed_graph(source)
+    graph = load_cached_signed_graph(source, loader, cache_dir=cache_dir)
+    cached = load_cached_signed_graph(source, loader, cache_dir=cache_dir)
+
+    # 元ファイルの解析は 1 回だけ
+    assert len(calls) == 1
+
+    # 読み取り専用のメモリマップから読み込まれている
+    assert not cached.A_plus.indices.flags.writeable
+    assert not cached.D_minus.flags.writeable
+
+    for g in [graph, cached]:
+        assert np.array_equal(g.A_plus.toarray(), expected.A_plus.toarray())
+        assert np.array_equal(g.A_minus.toarray(), expected.A_minus.toarray())
+        assert np.array_equal(g.D_plus, expected.D_plus)
+        assert np.array_equal(g.D_minus, expected.D_minus)
+        assert g.edge_lists() == expected.edge_lists()
+
+    # 内容が変わればキャッシュも作り直される
+    source.write_text(source.read_text().replace("0.0,-1.0", "0.0,1.0", 1))
+    load_cached_signed_graph(source, loader, cache_dir=cache_dir)
+    assert len(calls) == 2
+    assert len(list(cache_dir.iterdir())) == 2
+
+def test_load_cached_signed_graph_loader_arguments(tmp_path):
+    """
+    同じファイルでも loader の引数が違えば別のキャッシュを使う
+    """
+    source = tmp_path / "edges.csv"
+    source.write_text("0,1,1\n1,2,-1\n")
+    cache_dir = tmp_path / "cache"
+
+    small = load_cached_signed_graph(source, functools.partial(read_edge_list, n=3), cache_dir=cache_dir)
+    large = load_cached_signed_graph(source, functools.partial(read_edge_list, n=10), cache_dir=cache_dir)
+    assert small.n == 3
+    assert large.n == 10
+
+    # ラムダ式はクロージャの値で区別する
+    graphs = [
+        load_cached_signed_graph(source, lambda path: read_edge_list(path, n=n), cache_dir=cache_dir) for n in (4, 5)
+    ]
+    assert [g.n for g in graphs] == [4, 5]
+
+    # 明示したキーが同じならキャッシュを使い回す
+    first = load_cached_signed_graph(source, functools.partial(read_edge_list, n=6), cache_dir=cache_dir, key="edges")
+    second = load_cached_signed_graph(source, functools.partial(read_edge_list, n=7), cache_dir=cache_dir, key="edges")
+    assert first.n == second.n == 6
+    assert len(list(cache_dir.iterdir())) == 5
@@ -0,0 +1,29 @@
+import pytest
+
+from utils.input_data import read_csv_as_numpy
+from utils.graph import generate_signed_graph
+from utils.partition import generate_singleton
+from utils.lps import LPS
+from utils.pricing import reduced_cost
+from utils.wc import calc_w_C
+from utils.heuristic_pricing import LocalSearchPricer
+
+def test_local_search_pricer():
+    """局所探索で見つけた列の被約費用が正しく, 正であるか"""
+    Adj = read_csv_as_numpy("./data/test_data/02_GahukuGama_AdjMat.csv")
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+    lambda_val = 0.5
+
+    lps = LPS(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, [generate_singleton(vertices)])
+    _, _, lps_dual_sol = lps.solve_model()
+
+    pricer = LocalSearchPricer(A_plus, A_minus, D_plus, D_minus, lambda_val)
+    columns = pricer.find_columns(lps_dual_sol, known_columns=lps.w_C_dict, max_columns=5)
+
+    assert 0 < len(columns) <= 5
+    assert [rc for rc, _ in columns] == sorted([rc for rc, _ in columns], reverse=True)
+    for rc, C in columns:
+        assert C not in lps.w_C_dict
+        w_C = calc_w_C(sorted(C), A_plus, A_minus, D_plus, D_minus, lambda_val)
+        assert rc == pytest.approx(reduced_cost(w_C, C, lps_dual_sol))
+        assert rc > 0
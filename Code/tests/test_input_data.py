@@ -1,6 +1,10 @@
+import gzip
+
 import numpy as np
+import pytest
 
-from utils.input_data import read_csv_as_numpy
+from utils.input_data import read_csv_as_numpy, read_edge_list
+from utils.signed_graph import SignedGraph
 
 def test_read_csv_as_numpy():
     """
@@ -22,3 +26,68 @@ def test_read_csv_as_numpy():
     ])
 
     assert np.array_equal(Adj, expected)
+
+def test_read_edge_list(tmp_path):
+    """
+    read_edge_list のテスト (gzip 圧縮・チャンク読み込み)
+    """
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    u, v = np.nonzero(np.triu(Adj, k=1))
+
+    path = tmp_path / "01_Slovene_EdgeList.csv.gz"
+    with gzip.open(path, "wt") as f:
+        f.write("# u,v,sign\n")
+        for i, j in zip(u, v):
+            f.write(f"{i},{j},{int(Adj[i, j])}\n")
+
+    graph = read_edge_list(path, chunksize=7)
+
+    assert graph.n == 10
+    assert np.array_equal(graph.A_plus.toarray(), (Adj > 0).astype(int))
+    assert np.array_equal(graph.A_minus.toarray(), (Adj < 0).astype(int))
+    assert np.array_equal(graph.D_plus, [4, 4, 4, 4, 3, 4, 3, 4, 4, 2])
+    assert np.array_equal(graph.D_minus, [5, 5, 5, 5, 6, 5, 6, 5, 5, 7])
+
+def test_read_edge_list_weighted(tmp_path):
+    """
+    重み列付きの辺リストでは sign の符号を辺の符号とし, 0 以下の重みはエラーとする
+    """
+    path = tmp_path / "weighted.csv"
+    path.write_text("0,1,1,2.5\n1,2,-1,0.5\n2,3,1,3.0\n")
+
+    graph = read_edge_list(path, n=5)
+
+    assert graph.n == 5
+    assert graph.edge_lists() == ([(0, 1), (2, 3)], [(1, 2)])
+
+    for weight in ["-0.5", "0"]:
+        path.write_text(f"0,1,1,2.5\n1,2,1,{weight}\n")
+        with pytest.raises(ValueError):
+            read_edge_list(path)
+
+def test_read_edge_list_chunks(tmp_path):
+    """
+    チャンクをまたぐ重複辺・自己ループ・符号 0 の辺の扱いが SignedGraph.from_edges と同じか
+    """
+    rng = np.random.default_rng(0)
+    u = rng.integers(0, 30, size=500)
+    v = rng.integers(0, 30, size=500)
+    sign = rng.choice([-1, 0, 1], size=500)
+    path = tmp_path / "edges.csv"
+    path.write_text("".join(f"{i},{j},{s}\n" for i, j, s in zip(u, v, sign)))
+
+    expected = SignedGraph.from_edges(40, u, v, sign)
+    for chunksize in [1, 13, 1000]:
+        graph = read_edge_list(path, n=40, chunksize=chunksize)
+        assert graph.edge_lists() == expected.edge_lists()
+        assert np.array_equal(graph.D_plus, expected.D_plus)
+
+    with pytest.raises(ValueError):
+        read_edge_list(path, n=10)
+
+    # 負の頂点番号は CSR の末尾の頂点を指してしまうのでエラーとする
+    for row in ["-1,2,1", "2,-3,-1"]:
+        path.write_text(f"0,1,1\n{row}\n")
+        for n in [None, 5]:
+            with pytest.raises(ValueError, match="out of range"):
+                read_edge_list(path, n=n)
@@ -0,0 +1,41 @@
+import pytest
+
+from utils.wc import calc_w_C
+from utils.lps import LPS
+from utils.partition import generate_singleton
+from utils.column_generation import column_generation
+from utils.lambda_sweep import lambda_sweep
+
+def test_lps_set_lambda(fractional_graph):
+    """lambda を変えた後の列の重みが calc_w_C と一致するか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = fractional_graph
+    lps = LPS(vertices, A_plus, A_minus, D_plus, D_minus, 0.2, [generate_singleton(vertices)])
+    lps.update_model_batch([frozenset({0, 1, 2}), frozenset(vertices)])
+
+    lps.set_lambda(0.7)
+
+    for C, w_C in lps.w_C_dict.items():
+        assert w_C == pytest.approx(calc_w_C(list(C), A_plus, A_minus, D_plus, D_minus, 0.7))
+        assert lps.z_C[C].obj == pytest.approx(w_C)
+
+def test_lambda_sweep(fractional_graph):
+    """列を引き継いだ掃引の最適値が lambda ごとに解き直した最適値と一致するか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = fractional_graph
+    init_partitions = [generate_singleton(vertices)]
+    lambda_values = [0.8, 0.2, 0.5]
+
+    path = lambda_sweep(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_values, init_partitions, heuristic_pricing=False
+    )
+
+    assert [point["lambda_val"] for point in path] == sorted(lambda_values)
+    for point in path:
+        cg_opt, _, _, _, _ = column_generation(
+            vertices, A_plus, A_minus, D_plus, D_minus, point["lambda_val"], init_partitions, heuristic_pricing=False
+        )
+        assert point["cg_opt"] == pytest.approx(cg_opt)
+        assert sorted(u for C in point["partition"] for u in C) == list(vertices)
+        assert point["partition_value"] <= point["cg_opt"] + 1e-6
+
+    # lambda = 0.5 では LPS の解が分数になる
+    assert not path[1]["integral"]
@@ -5,6 +5,9 @@ from utils.input_data import read_csv_as_numpy
 from utils.graph import generate_signed_graph
 from utils.wc import calc_w_C
 from utils.lps import LPS
+from utils.solver import highs_available
+
+requires_highs = pytest.mark.skipif(not highs_available(), reason="highspy is not installed")
 
 @pytest.fixture
 def lps_instance():
@@ -20,7 +23,7 @@ def lps_instance():
     }
     S = list(w_C_dict.keys())
 
-    lps = LPS(S, w_C_dict, vertices)
+    lps = LPS(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions)
 
     return lps, w_C_dict, S, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val
 
@@ -50,7 +53,7 @@ def test_solve_lps(lps_instance):
     """LPSを解いたときの出力が期待値と一致するか"""
     lps, _, _, _, _, _, _, _, _ = lps_instance
 
-    lps_opt, lps_primal_sol, lps_dual_sol = lps.solve_lps()
+    lps_opt, lps_primal_sol, lps_dual_sol = lps.solve_model()
 
     expected_optimal_value = 18.0
     expected_primal_sol = {
@@ -78,7 +81,7 @@ def test_update_lps(lps_instance):
     }
     new_S = list(new_w_C_dict.keys())
 
-    lps.update_lps(new_S, new_w_C_dict)
+    lps.update_model_batch(new_S)
 
     # 期待される更新後の w_C_dict
     expected_updated_w_C_dict = {
@@ -94,7 +97,7 @@ def test_update_lps(lps_instance):
         frozenset({8}): 1.0, frozenset({9}): 1.0, frozenset({0, 1, 2}): 0.0
     }
     
-    lps_opt, lps_primal_sol, lps_dual_sol = lps.solve_lps()
+    lps_opt, lps_primal_sol, lps_dual_sol = lps.solve_model()
 
     # 更新後のチェック
     assert set(lps.w_C_dict.keys()) == set(expected_updated_w_C_dict.keys())
@@ -105,3 +108,77 @@ def test_update_lps(lps_instance):
     assert lps.model.status == OptimizationStatus.OPTIMAL
     assert lps_opt == expected_optimal_value
     assert lps_primal_sol == expected_primal_sol
+
+
+@pytest.fixture
+def slovene_lps_args():
+    """Slovene データセットで LPS を作る引数 (単独の頂点の分割から始める)"""
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+
+    return vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [[[u] for u in vertices]]
+
+@pytest.mark.parametrize("solver_name", ["CBC", pytest.param("HiGHS", marks=requires_highs)])
+def test_lps_warm_start(slovene_lps_args, solver_name):
+    """
+    列を追加した後の求解が前回の基底から再開し, 最初から解いた場合と同じ最適値になるか
+    (CBC では再開したかを確かめられないので is_warm は None)
+    """
+    columns = [frozenset({0, 2, 5, 7, 8}), frozenset({1, 3})]
+
+    results = {}
+    for warm_start in (True, False):
+        lps = LPS(*slovene_lps_args, solver_name=solver_name, warm_start=warm_start)
+        lps.solve_model()
+        assert not lps.is_warm()
+
+        lps.update_model_batch(columns)
+        results[warm_start] = lps.solve_model()[0]
+        assert lps.is_warm() == (warm_start if solver_name == "HiGHS" else None)
+        assert len(lps.iterations) == 2
+
+    assert results[True] == pytest.approx(23.0)
+    assert results[False] == pytest.approx(23.0)
+
+@requires_highs
+def test_lps_restore_basis(slovene_lps_args):
+    """保存した最適基底を戻すと単体法の反復なしで同じ最適値が得られるか"""
+    lps = LPS(*slovene_lps_args, solver_name="HiGHS")
+    lps.update_model_batch([frozenset({0, 2, 5, 7, 8}), frozenset({1, 3})])
+    lps_opt = lps.solve_model()[0]
+    basis = lps.save_basis()
+
+    lps.restrict_columns(lambda C: len(C) == 1)
+    lps.solve_model()
+    lps.restrict_columns(lambda C: True)
+    lps.update_model_batch([frozenset({4, 6})])
+
+    assert lps.restore_basis(basis)
+    assert lps.solve_model()[0] == pytest.approx(lps_opt)
+    assert lps.iterations[-1] == 0
+
+@requires_highs
+def test_lps_is_warm_rejected_basis(slovene_lps_args, monkeypatch):
+    """HiGHS が基底を受け付けなければ is_warm は False で, スラック基底から解く"""
+    lps = LPS(*slovene_lps_args, solver_name="HiGHS")
+    lps.solve_model()
+    lps.update_model_batch([frozenset({0, 2, 5, 7, 8})])
+
+    monkeypatch.setattr("utils.lps.set_basis", lambda model, basis: False)
+    lps_opt = lps.solve_model()[0]
+
+    cold = LPS(*slovene_lps_args, solver_name="HiGHS", warm_start=False)
+    cold.update_model_batch([frozenset({0, 2, 5, 7, 8})])
+
+    assert lps.is_warm() is False
+    assert lps_opt == pytest.approx(cold.solve_model()[0])
+
+def test_lps_save_basis_cbc(slovene_lps_args):
+    """CBC では基底を取り出せない"""
+    lps = LPS(*slovene_lps_args)
+    lps.solve_model()
+
+    assert lps.save_basis() is None
+    assert not lps.restore_basis(None)
+    assert lps.iterations == [None]
+    assert lps.is_warm() is None
@@ -0,0 +1,41 @@
+import numpy as np
+import scipy.sparse as sp
+import pytest
+from mip import CONTINUOUS, maximize, xsum
+
+from utils.solver import create_model, highs_available
+from utils.milp_builder import add_constrs_from_matrix
+
+requires_highs = pytest.mark.skipif(not highs_available(), reason="highspy is not installed")
+
+def solve_with_rows(solver_name, existing_row):
+    """
+    3 変数の LP に行列の制約を追加して解く (existing_row が True なら先に 1 行追加しておく)
+    """
+    model = create_model(solver_name)
+    x = [model.add_var(var_type=CONTINUOUS, lb=0, ub=10) for _ in range(3)]
+    if existing_row:
+        model.add_constr(x[0] <= 10)
+
+    # 2 行目は同じ変数の要素が重複し (x_1 + x_1 + x_2), 3 行目は空の行
+    A = sp.csr_array(
+        (np.array([1.0, 1.0, 1.0, 1.0, 1.0]), np.array([0, 1, 1, 1, 2]), np.array([0, 2, 5, 5])), shape=(3, 3)
+    )
+    constrs = add_constrs_from_matrix(model, x, A, np.array([1.0, 2.0, 0.0]), sense="<")
+    model.objective = maximize(xsum(x))
+    model.optimize()
+
+    return model.objective_value, constrs
+
+@pytest.mark.parametrize("solver_name", ["CBC", pytest.param("HiGHS", marks=requires_highs)])
+def test_add_constrs_from_matrix(solver_name):
+    """行をまとめて追加した場合と 1 行ずつ追加した場合で同じ LP になるか"""
+    bulk_opt, bulk_constrs = solve_with_rows(solver_name, existing_row=False)
+    row_opt, row_constrs = solve_with_rows(solver_name, existing_row=True)
+
+    # x_0 + x_1 <= 1, 2 x_1 + x_2 <= 2 のもとで x_0 + x_1 + x_2 の最大値は 3 (x_0 = 1, x_2 = 2)
+    assert bulk_opt == pytest.approx(3.0)
+    assert row_opt == pytest.approx(3.0)
+    assert [c.idx for c in bulk_constrs] == [0, 1, 2]
+    assert [c.idx for c in row_constrs] == [1, 2, 3]
+    assert bulk_constrs[0].pi == pytest.approx(row_constrs[0].pi)
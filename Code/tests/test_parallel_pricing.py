@@ -0,0 +1,30 @@
+from utils.input_data import read_csv_as_numpy
+from utils.graph import generate_signed_graph
+from utils.partition import generate_singleton
+from utils.lps import LPS
+from utils.parallel_pricing import PartitionPricer
+
+def test_partition_pricer():
+    """並列に解いた結果が逐次で解いた結果と一致するか"""
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+    lambda_val = 0.5
+
+    lps = LPS(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, [generate_singleton(vertices)])
+    _, _, lps_dual_sol = lps.solve_model()
+
+    ks = range(2, len(vertices) + 1)
+    with PartitionPricer(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, n_jobs=1) as pricer:
+        serial_columns, serial_opts = pricer.price(lps_dual_sol, ks)
+    with PartitionPricer(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, n_jobs=2) as pricer:
+        parallel_columns, parallel_opts = pricer.price(lps_dual_sol, ks)
+        limited_columns, _ = pricer.price(lps_dual_sol, ks, max_columns=1)
+
+    assert serial_columns == {
+        2: frozenset({5, 8}), 3: frozenset({5, 7, 8}), 4: frozenset({2, 5, 7, 8}), 5: frozenset({0, 2, 5, 7, 8})
+    }
+    assert parallel_columns.keys() == serial_columns.keys()
+    assert parallel_opts.keys() == serial_opts.keys()
+    for k in serial_opts:
+        assert abs(parallel_opts[k] - serial_opts[k]) < 1e-6
+    assert len(limited_columns) >= 1
@@ -0,0 +1,129 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from utils.input_data import read_csv_as_numpy
+from utils.graph import generate_signed_graph
+from utils.signed_graph import SignedGraph
+from utils.partition import generate_singleton
+from utils.column_generation import column_generation
+from utils.wc import calc_w_C
+from utils.ap_milp import AP_MILP
+from utils.presolve import reduce_pricing_graph, fixable_vertices, PresolvedPricer
+
+@pytest.fixture
+def small_graph():
+    """
+    孤立点 0, 負の辺しかない頂点 1, 三角形 2-3-4 とそのペンダント 5, 孤立した正の辺 6-7 からなるグラフ
+    """
+    u = np.array([1, 2, 2, 3, 2, 6])
+    v = np.array([2, 3, 4, 4, 5, 7])
+    sign = np.array([-1, 1, 1, 1, 1, 1])
+
+    return SignedGraph.from_edges(8, u, v, sign)
+
+def test_reduce_pricing_graph(small_graph):
+    """外す頂点, ペンダントの隣接頂点, 双子"""
+    kept, removed, anchors, twins = reduce_pricing_graph(small_graph)
+
+    assert removed == {0: "isolated", 1: "negative_only", 5: "pendant", 7: "pendant"}
+    assert anchors == {5: 2, 7: 6}
+    assert kept.tolist() == [2, 3, 4, 6]
+    assert (3, 4) in twins
+    assert all(u in kept and v in kept for u, v in twins)
+
+def test_presolved_pricer_lift(small_graph):
+    """ペンダントは隣接頂点が列に入っているときだけ戻す"""
+    vertices, A_plus, A_minus, D_plus, D_minus = small_graph.unpack()
+    pricer = PresolvedPricer(vertices, A_plus, A_minus, D_plus, D_minus, 0.5)
+    # 外した孤立点と負の辺しかない頂点の双対変数は大きくして, 列に加えても被約費用が増えないようにする
+    dual_sol = {u: 1.0 if u in (0, 1) else 0.0 for u in vertices}
+
+    assert pricer.num_binaries() == 4
+    assert pricer.lift(frozenset({6}), dual_sol) == frozenset({6, 7})
+    assert 7 not in pricer.lift(frozenset({3}), dual_sol)
+
+    # 三角形とペンダントをまとめた列の被約費用が正
+    columns = pricer.find_columns(dual_sol)
+    assert columns
+    assert all(rc > 0 for rc, _ in columns)
+    assert frozenset({2, 3, 4, 5}) in [C for _, C in columns]
+
+def random_graph_and_duals(seed, n):
+    """正と負の辺をランダムに張ったグラフと, 一部の頂点の双対変数を大きくした双対変数"""
+    rng = np.random.default_rng(seed)
+    u, v = np.triu_indices(n, 1)
+    mask = rng.random(len(u)) < 0.3
+    sign = rng.choice([1, -1], size=mask.sum(), p=[0.7, 0.3])
+    graph = SignedGraph.from_edges(n, u[mask], v[mask], sign)
+    vertices, A_plus, A_minus, D_plus, D_minus = graph.unpack()
+
+    bound = 3 * np.asarray(D_plus) + np.asarray(D_minus)
+    y = rng.uniform(-1.0, 2.0, size=n)
+    large = rng.random(n) < 0.4
+    y[large] = bound[large] + rng.uniform(1.0, 3.0, size=large.sum())
+
+    return (vertices, A_plus, A_minus, D_plus, D_minus), dict(zip(vertices, y.tolist()))
+
+def max_reduced_cost(columns, graph, lambda_val, dual_sol):
+    """列の被約費用 w_C - y(C) の最大値を総当たりで求める"""
+    vertices, A_plus, A_minus, D_plus, D_minus = graph
+    return max(
+        calc_w_C(list(C), A_plus, A_minus, D_plus, D_minus, lambda_val) - sum(dual_sol[u] for u in C)
+        for C in columns
+    )
+
+@pytest.mark.parametrize("lambda_val", [0.3, 0.5, 0.8])
+def test_fixable_vertices_brute_force(lambda_val):
+    """固定した頂点を使わない列だけでも, 被約費用の最大値 (0 との大きい方) が変わらないか"""
+    total_fixed = 0
+    for seed in range(10):
+        graph, dual_sol = random_graph_and_duals(seed, 8)
+        vertices, _, _, D_plus, D_minus = graph
+        fixed = fixable_vertices(dual_sol, D_plus, D_minus, lambda_val)
+        total_fixed += len(fixed)
+
+        columns = [C for k in range(1, 9) for C in itertools.combinations(vertices, k)]
+        reduced = [C for C in columns if not set(C) & set(fixed)]
+        assert max(0.0, max_reduced_cost(columns, graph, lambda_val, dual_sol)) == pytest.approx(
+            max(0.0, max_reduced_cost(reduced, graph, lambda_val, dual_sol))
+        )
+
+    assert total_fixed > 0
+
+def test_ap_milp_fix_vertices():
+    """固定した AP-MILP と元の AP-MILP の最適値 (0 との大きい方) が一致し, バイナリ変数が減るか"""
+    for seed in range(3):
+        graph, dual_sol = random_graph_and_duals(seed, 14)
+        vertices, A_plus, A_minus, D_plus, D_minus = graph
+        ap_milp = AP_MILP(vertices, A_plus, A_minus, D_plus, D_minus, 0.5)
+        ap_milp.add_lps_dual_sol(dual_sol)
+        full_opt, _ = ap_milp.solve_model()
+
+        fixed = fixable_vertices(dual_sol, D_plus, D_minus, 0.5)
+        assert fixed
+        ap_milp.fix_vertices(fixed)
+        fixed_opt, fixed_sol = ap_milp.solve_model()
+        assert max(0.0, fixed_opt) == pytest.approx(max(0.0, full_opt), abs=1e-6)
+        assert all(fixed_sol["x_u"][u] < 0.5 for u in fixed)
+
+        # 固定を外すと元の AP-MILP に戻る
+        ap_milp.fix_vertices()
+        assert ap_milp.solve_model()[0] == pytest.approx(full_opt, abs=1e-6)
+
+def test_column_generation_with_presolve(fractional_graph):
+    """前処理した AP-MILP を使っても元の AP-MILP と同じ最適値になるか"""
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    _, *slovene = generate_signed_graph(A=Adj)
+
+    for (vertices, A_plus, A_minus, D_plus, D_minus), expected in ((slovene, 23.0), (fractional_graph, 3.5)):
+        records = []
+        cg_opt, _, _, _, _ = column_generation(
+            vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)],
+            heuristic_pricing=False, presolve=True, callback=records.append,
+        )
+
+        assert cg_opt == pytest.approx(expected)
+        assert any(record.get("pricing") == "presolve" for record in records)
+        assert all("fixed" in record for record in records if record.get("pricing") == "milp")
@@ -0,0 +1,55 @@
+import pytest
+
+from utils.input_data import read_csv_as_numpy
+from utils.graph import generate_signed_graph
+from utils.partition import generate_singleton
+from utils.lps import LPS
+from utils.column_generation import column_generation
+from utils.primal_heuristics import restricted_master_mip, dive, greedy_rounding, find_incumbent
+
+def is_partition(partition, vertices):
+    return sorted(u for C in partition for u in C) == list(vertices)
+
+def test_primal_heuristics(fractional_graph):
+    """分数解の LPS の列から得た分割が実行可能で, LP の最適値以下か"""
+    vertices, A_plus, A_minus, D_plus, D_minus = fractional_graph
+    init_partitions = [generate_singleton(vertices)]
+
+    cg_opt, _, _, S, _ = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions, heuristic_pricing=False
+    )
+    lps = LPS(vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions)
+    lps.update_model_batch(S)
+    lps_opt, lps_primal_sol, _ = lps.solve_model()
+    assert lps_opt == pytest.approx(cg_opt)
+
+    rounding_value, rounding_partition = greedy_rounding(vertices, lps_primal_sol, lps.weight_engine)
+    diving_value, diving_partition = dive(vertices, lps.w_C_dict)
+    mip_value, mip_partition = restricted_master_mip(vertices, lps.w_C_dict, start=rounding_partition)
+
+    for value, partition in [
+        (rounding_value, rounding_partition), (diving_value, diving_partition), (mip_value, mip_partition)
+    ]:
+        assert is_partition(partition, vertices)
+        assert value == pytest.approx(sum(lps.weight_engine.weights(partition)))
+        assert value <= cg_opt + 1e-6
+
+    # MIP は列の上の最適解なので, 丸めや潜水より悪くならない
+    assert mip_value >= max(rounding_value, diving_value) - 1e-6
+
+    value, partition = find_incumbent(lps, lps_primal_sol, methods=("rounding", "diving", "mip"))
+    assert value == pytest.approx(mip_value)
+
+def test_column_generation_incumbent():
+    """列生成法の途中と終了時に暫定解を求める"""
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+
+    cg_opt, _, _, _, _, stats = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)],
+        multi_column=False, heuristic_pricing=False, return_stats=True, heuristic_interval=2,
+    )
+
+    assert stats["incumbent"] == pytest.approx(23.0)
+    assert is_partition(stats["incumbent_sol"], vertices)
+    assert stats["incumbent_gap"] < 1e-4
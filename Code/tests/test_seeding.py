@@ -0,0 +1,48 @@
+import pytest
+
+from utils.partition import generate_singleton
+from utils.wc import calc_w_C
+from utils.column_generation import column_generation
+from utils.seeding import (
+    positive_components, label_propagation, smd_local_moving, spectral_bisection, generate_seed_partitions
+)
+
+def is_partition(partition, vertices):
+    return sorted(u for C in partition for u in C) == list(vertices)
+
+def test_seeding_methods(slovene):
+    """各手法が頂点集合の分割を返すか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = slovene
+
+    assert sorted(map(sorted, positive_components(A_plus, A_minus, D_plus, D_minus))) == [
+        [0, 2, 5, 7, 8], [1, 3, 4, 6, 9]
+    ]
+    assert is_partition(label_propagation(A_plus, A_minus, D_plus, D_minus), vertices)
+    for partition in spectral_bisection(A_plus, A_minus, D_plus, D_minus):
+        assert is_partition(partition, vertices)
+
+    # 局所移動で最適な分割が得られる
+    partition = smd_local_moving(A_plus, A_minus, D_plus, D_minus, 0.5)
+    assert is_partition(partition, vertices)
+    assert sum(calc_w_C(C, A_plus, A_minus, D_plus, D_minus, 0.5) for C in partition) == pytest.approx(23.0)
+
+def test_generate_seed_partitions(slovene):
+    """単独の頂点の分割を先頭に含み, 列生成法の初期の分割として使えるか"""
+    vertices, A_plus, A_minus, D_plus, D_minus = slovene
+
+    init_partitions = generate_seed_partitions(vertices, A_plus, A_minus, D_plus, D_minus, 0.5)
+    assert init_partitions[0] == generate_singleton(vertices)
+    assert len(init_partitions) > 1
+    for partition in init_partitions:
+        assert is_partition(partition, vertices)
+
+    cg_opt, _, _, _, cnt = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, init_partitions,
+        multi_column=False, heuristic_pricing=False,
+    )
+    singleton_cg_opt, _, _, _, singleton_cnt = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)],
+        multi_column=False, heuristic_pricing=False,
+    )
+    assert cg_opt == pytest.approx(singleton_cg_opt)
+    assert cnt < singleton_cnt
@@ -0,0 +1,79 @@
+import numpy as np
+import scipy.sparse as sp
+
+from utils.input_data import read_csv_as_numpy
+from utils.graph import generate_signed_graph
+from utils.signed_graph import SignedGraph, signed_edge_lists, induced_sum
+from utils.wc import calc_w_C
+
+def test_signed_graph_matches_dense():
+    """
+    SignedGraph が密行列版と同じ次数・辺を与えるか
+    """
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+
+    graph = SignedGraph.from_adjacency(Adj)
+
+    assert graph.vertices == vertices
+    assert np.array_equal(graph.D_plus, D_plus)
+    assert np.array_equal(graph.D_minus, D_minus)
+    assert graph.edge_lists() == signed_edge_lists(A_plus, A_minus)
+    assert len(graph.edge_lists()[0]) == 18
+    assert len(graph.edge_lists()[1]) == 27
+
+    # networkx グラフは辺の追加順まで一致する
+    H = graph.to_networkx()
+    assert list(H.edges(data="sign")) == list(G.edges(data="sign"))
+
+def test_induced_sum_sparse():
+    """
+    疎行列での誘導部分グラフの和が密行列版と一致するか
+    """
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    _, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+    _, _, S_plus, S_minus, _, _ = generate_signed_graph(A=Adj, sparse=True)
+
+    assert sp.issparse(S_plus)
+
+    for C in [[0], [0, 2, 5, 7, 8], [1, 3, 4, 6, 9], vertices]:
+        assert induced_sum(S_plus, C) == np.sum(A_plus[np.ix_(C, C)])
+        assert induced_sum(S_minus, C) == np.sum(A_minus[np.ix_(C, C)])
+        assert calc_w_C(C, S_plus, S_minus, D_plus, D_minus, 0.5) == calc_w_C(
+            C, A_plus, A_minus, D_plus, D_minus, 0.5
+        )
+
+def test_from_edges():
+    """
+    辺リストからの生成 (対称化・重複辺・自己ループの処理)
+    """
+    graph = SignedGraph.from_edges(
+        4,
+        u=[0, 1, 2, 2, 3],
+        v=[1, 0, 3, 2, 0],
+        sign=[1, 1, -1, 1, -1],
+    )
+
+    assert np.array_equal(graph.D_plus, [1, 1, 0, 0])
+    assert np.array_equal(graph.D_minus, [1, 0, 1, 2])
+    assert graph.edge_lists() == ([(0, 1)], [(0, 3), (2, 3)])
+    assert graph.induced_sums([0, 1, 3]) == (2, 2)
+
+def test_components_and_subgraph():
+    """
+    連結成分 (符号を区別しない) と誘導部分グラフの頂点番号の振り直し
+    """
+    graph = SignedGraph.from_edges(
+        7,
+        u=[0, 1, 4],
+        v=[1, 2, 5],
+        sign=[1, -1, 1],
+    )
+
+    components = graph.components()
+    assert [component.tolist() for component in components] == [[0, 1, 2], [4, 5], [3], [6]]
+
+    sub = graph.subgraph([2, 1, 0])
+    assert sub.edge_lists() == ([(1, 2)], [(0, 1)])
+    assert np.array_equal(sub.D_plus, graph.D_plus[[2, 1, 0]])
+    assert np.array_equal(sub.D_minus, graph.D_minus[[2, 1, 0]])
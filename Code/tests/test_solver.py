@@ -0,0 +1,21 @@
+import pytest
+
+from utils.solver import create_model, highs_available, has_solution_pool
+
+requires_highs = pytest.mark.skipif(not highs_available(), reason="highspy is not installed")
+
+def test_create_model():
+    """ソルバー名は大文字小文字を区別せず, 未知の名前はエラー"""
+    model = create_model("cbc")
+    assert model.solver_name == "CBC"
+    assert has_solution_pool(model)
+
+    with pytest.raises(ValueError):
+        create_model("glpk")
+
+@requires_highs
+def test_create_highs_model():
+    """HiGHS のモデルは解プールを持たない"""
+    model = create_model("HiGHS")
+    assert model.solver_name == "HiGHS"
+    assert not has_solution_pool(model)
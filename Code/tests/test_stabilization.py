@@ -0,0 +1,43 @@
+import pytest
+
+from utils.input_data import read_csv_as_numpy
+from utils.graph import generate_signed_graph
+from utils.partition import generate_singleton
+from utils.lps import LPS
+from utils.stabilization import DualStabilizer
+
+def test_dual_box():
+    """人工変数で双対変数が箱に入り, 無効にすると元の LPS に戻るか"""
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+
+    lps = LPS(vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)])
+    lps_opt, _, lps_dual_sol = lps.solve_model()
+
+    # 箱の下端が元の双対解より上にあれば, 双対変数は箱の下端に張り付く
+    center = {u: lps_dual_sol[u] + 1.0 for u in vertices}
+    stabilizer = DualStabilizer(lps, method="box", delta=0.5)
+    stabilizer.center = center
+    stabilizer._apply()
+
+    _, _, box_dual_sol = lps.solve_model()
+    for u in vertices:
+        assert box_dual_sol[u] == pytest.approx(lps_dual_sol[u] + 0.5)
+    assert lps.dual_box_violation() > 0
+    assert not stabilizer.is_exact()
+
+    lps.clear_dual_box()
+    cleared_opt, _, cleared_dual_sol = lps.solve_model()
+    assert cleared_opt == pytest.approx(lps_opt)
+    assert lps.dual_box_violation() == 0
+    for u in vertices:
+        assert cleared_dual_sol[u] == pytest.approx(lps_dual_sol[u])
+
+def test_invalid_method():
+    """未知の安定化手法はエラー"""
+    Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj)
+    lps = LPS(vertices, A_plus, A_minus, D_plus, D_minus, 0.5, [generate_singleton(vertices)])
+
+    with pytest.raises(ValueError):
+        DualStabilizer(lps, method="unknown")
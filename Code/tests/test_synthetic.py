@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from utils.wc import calc_w_C
+from utils.synthetic import planted_signed_graph
+
+def test_planted_signed_graph():
+    """辺の数, 負の辺の割合, 対称性が指定どおりか"""
+    graph, labels = planted_signed_graph(200, communities=4, density=0.05, negative_fraction=0.4, seed=1)
+    E_plus, E_minus = graph.edges()
+    m = len(E_plus) + len(E_minus)
+
+    assert graph.n == 200
+    assert np.bincount(labels).tolist() == [50] * 4
+    assert m == round(0.05 * 200 * 199 / 2)
+    assert len(E_minus) / m == pytest.approx(0.4, abs=0.01)
+    assert (graph.A_plus != graph.A_plus.T).nnz == 0
+    assert graph.A_plus.multiply(graph.A_minus).nnz == 0
+
+    # ノイズがなければ正の辺はコミュニティ内, 負の辺はコミュニティ間だけにある
+    assert np.all(labels[E_plus[:, 0]] == labels[E_plus[:, 1]])
+    assert np.all(labels[E_minus[:, 0]] != labels[E_minus[:, 1]])
+
+def test_planted_signed_graph_noise():
+    """ノイズで符号を反転した辺の割合とシードによる再現性"""
+    graph, labels = planted_signed_graph(300, communities=3, density=0.05, noise=0.1, seed=2)
+    E_plus, E_minus = graph.edges()
+    flipped = np.sum(labels[E_plus[:, 0]] != labels[E_plus[:, 1]]) + np.sum(labels[E_minus[:, 0]] == labels[E_minus[:, 1]])
+
+    assert flipped / (len(E_plus) + len(E_minus)) == pytest.approx(0.1, abs=0.02)
+
+    same, _ = planted_signed_graph(300, communities=3, density=0.05, noise=0.1, seed=2)
+    assert (same.A_plus != graph.A_plus).nnz == 0
+
+def test_planted_partition_is_good():
+    """埋め込んだ分割の目的関数値が単独の頂点の分割より大きいか"""
+    graph, labels = planted_signed_graph(40, communities=4, density=0.3, negative_fraction=0.3, seed=0)
+    vertices, A_plus, A_minus, D_plus, D_minus = graph.unpack()
+
+    planted = sum(
+        calc_w_C(np.flatnonzero(labels == c), A_plus, A_minus, D_plus, D_minus, 0.5) for c in range(4)
+    )
+    singleton = sum(calc_w_C([u], A_plus, A_minus, D_plus, D_minus, 0.5) for u in vertices)
+
+    assert planted > singleton
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from utils.telemetry import Telemetry
+
+def test_telemetry_records(tmp_path):
+    """begin ごとに前の反復が確定し, 時間と計数器の増分がまとまるか"""
+    counter = {"value": 0}
+    records = []
+    telemetry = Telemetry(records.append, str(tmp_path / "trace.jsonl"), counters={"calls": lambda: counter["value"]})
+
+    for iteration in range(3):
+        telemetry.begin(iteration)
+        with telemetry.timer("master_time"):
+            counter["value"] += iteration + 1
+        with telemetry.timer("master_time"):
+            pass
+        telemetry.update(best_ub=float("inf"))
+    trace = telemetry.end(status="optimal")
+
+    assert trace == records
+    assert [record["event"] for record in records] == ["iteration"] * 3 + ["finish"]
+    assert [record["calls"] for record in records[:3]] == [1, 2, 3]
+    assert all(record["master_time"] >= 0 for record in records[:3])
+
+    # inf は JSON では null として書く
+    with open(tmp_path / "trace.jsonl", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines[0]["best_ub"] is None
+    assert lines[-1]["status"] == "optimal"
+
+def test_telemetry_dual_change():
+    """双対変数の変化のノルム (初回は None)"""
+    telemetry = Telemetry()
+
+    assert telemetry.dual_change({0: 1.0, 1: 2.0}) is None
+    assert telemetry.dual_change({0: 4.0, 1: 6.0}) == pytest.approx(5.0)
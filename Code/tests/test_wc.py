@@ -3,7 +3,7 @@ import numpy as np
 from utils.input_data import read_csv_as_numpy
 from utils.graph import generate_signed_graph
 from utils.partition import generate_singleton
-from utils.wc import calc_w_C
+from utils.wc import calc_w_C, ColumnWeightEngine
 
 def test_calc_w_C():
     Adj = read_csv_as_numpy("./data/test_data/01_Slovene_AdjMat.csv")
@@ -34,3 +34,58 @@ def test_calc_w_C():
     }
 
     assert results == expected
+
+def test_column_weight_engine():
+    """
+    ColumnWeightEngine の一括計算・差分計算が calc_w_C と一致するか
+    """
+    Adj = read_csv_as_numpy("./data/test_data/02_GahukuGama_AdjMat.csv")
+
+    for sparse in [False, True]:
+        G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj, sparse=sparse)
+
+        lambda_val = 0.3
+        engine = ColumnWeightEngine(A_plus, A_minus, D_plus, D_minus, lambda_val)
+
+        rng = np.random.default_rng(0)
+        columns = [
+            frozenset(rng.choice(len(vertices), size=rng.integers(1, len(vertices)), replace=False).tolist())
+            for _ in range(50)
+        ] + [frozenset([v]) for v in vertices]
+
+        w = engine.weights(columns)
+        for C, w_C in zip(columns, w):
+            assert w_C == calc_w_C(sorted(C), A_plus, A_minus, D_plus, D_minus, lambda_val)
+
+        # 差分計算
+        base_C = columns[0]
+        C, w_C = engine.derive(base_C, add=[0, 1, 2], remove=sorted(base_C)[:2])
+        assert C == (base_C - set(sorted(base_C)[:2])) | {0, 1, 2}
+        assert np.isclose(w_C, calc_w_C(sorted(C), A_plus, A_minus, D_plus, D_minus, lambda_val))
+
+def test_column_weight_engine_cache_size():
+    """
+    集計値は最近使った cache_size 列だけを保持し, 捨てた列の重みも正しく計算し直すか
+    """
+    Adj = read_csv_as_numpy("./data/test_data/02_GahukuGama_AdjMat.csv")
+    G, vertices, A_plus, A_minus, D_plus, D_minus = generate_signed_graph(A=Adj, sparse=True)
+    engine = ColumnWeightEngine(A_plus, A_minus, D_plus, D_minus, 0.5, cache_size=3)
+
+    rng = np.random.default_rng(1)
+    columns = [
+        frozenset(rng.choice(len(vertices), size=rng.integers(2, len(vertices)), replace=False).tolist())
+        for _ in range(10)
+    ]
+    expected = [calc_w_C(sorted(C), A_plus, A_minus, D_plus, D_minus, 0.5) for C in columns]
+
+    assert np.allclose(engine.weights(columns), expected)
+    assert list(engine.sums) == columns[-3:]
+
+    # 捨てた列からの差分計算と, 試した列で保持する列が入れ替わること
+    for C in columns[:5]:
+        v = next(iter(C))
+        derived, w_C = engine.derive(C, remove=[v])
+        assert np.isclose(w_C, calc_w_C(sorted(derived), A_plus, A_minus, D_plus, D_minus, 0.5))
+        assert len(engine.sums) <= 3
+    assert derived in engine.sums
+    assert np.allclose(engine.weights(columns), expected)
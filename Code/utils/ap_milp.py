@@ -1,27 +1,52 @@
-from mip import Model, xsum, maximize, CONTINUOUS, BINARY, OptimizationStatus
+import numpy as np
+from mip import xsum, maximize, CONTINUOUS, BINARY, OptimizationStatus
+
+from utils.signed_graph import as_signed_graph
+from utils.solver import create_model, has_solution_pool
+from utils.milp_builder import stack_rows, add_constrs_from_matrix
 
 class AP_MILP:
-    def __init__(self, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val):
+    def __init__(self, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, warm_start=True,
+                 formulation="compact", solver_name="CBC"):
         """
         AP-MILPの初期化
+
+        モデルは反復の間で使い回し, 双対変数の更新では x_u の目的関数の係数だけを書き換える.
+        warm_start が True の場合, 前回の最適解を次の求解の初期解 (MIP start) として渡す.
+
+        制約は辺集合の上だけで行列としてまとめて生成する. formulation で w_uv の線形化を選ぶ.
+        - "full": 各辺に w_uv <= alpha_u, w_uv <= alpha_v, w_uv >= alpha_u - (2 - x_u - x_v),
+          w_uv >= alpha_v - (2 - x_u - x_v) の 4 本
+        - "compact": 目的関数で w_uv を増やしたい正の辺には上界の 2 本,
+          減らしたい負の辺には下界 w_uv >= alpha_u + x_v - 1 の 1 本だけを置く
+          (full の下界より強く, 整数解での w_uv の値は変わらない)
+        solver_name で MILP ソルバー ("CBC" または "HiGHS") を選ぶ.
         """
-        self.model = Model(solver_name="CBC")
-        self.model.solver.set_verbose(False)
+        if formulation not in ("full", "compact"):
+            raise ValueError("formulation must be 'full' or 'compact'.")
+
+        self.model = create_model(solver_name)
         self.vertices = vertices
         self.A_plus = A_plus
         self.A_minus = A_minus
         self.D_plus = D_plus
         self.D_minus = D_minus
         self.lambda_val = lambda_val
+        self.warm_start = warm_start
+        self.formulation = formulation
+        self.incumbent = None
 
-        self.E_plus = []
-        self.E_minus = []
-        for i in range(len(vertices)):
-            for j in range(i + 1, len(vertices)):
-                if A_plus[i, j] == 1:
-                    self.E_plus.append((i, j))
-                elif A_minus[i, j] == 1:
-                    self.E_minus.append((i, j))
+        # 分枝価格法の Ryan-Foster 分枝の制約
+        self.branching_constrs = []
+        self.together = []
+        self.apart = []
+
+        # 価格付けの前処理で x_u = 0 に固定した頂点
+        self.fixed = []
+
+        # 辺リスト (疎行列なら O(m) で得られる)
+        graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+        self.E_plus, self.E_minus = graph.edge_lists()
         self.E = self.E_plus + self.E_minus
 
         # 変数
@@ -32,20 +57,16 @@ class AP_MILP:
             for (u, v) in self.E
         }
         
-        # 制約
-        for u in self.vertices:
-            self.model.add_constr(self.s - (1 - self.x_u[u]) <= self.alpha_u[u])
-            self.model.add_constr(self.alpha_u[u] <= self.s)
-            self.model.add_constr(self.alpha_u[u] <= self.x_u[u])
+        # 制約 (行列としてまとめて生成する)
+        variables = (
+            [self.x_u[u] for u in self.vertices] + [self.alpha_u[u] for u in self.vertices]
+            + [self.s] + [self.w_uv[e] for e in self.E]
+        )
+        A, b = stack_rows(self._constr_blocks(*graph.edges()), len(variables))
+        add_constrs_from_matrix(self.model, variables, A, b, sense="<")
 
         self.model.add_constr(xsum(self.alpha_u[u] for u in vertices) == 1)
 
-        for (u, v) in self.E:
-            self.model.add_constr(self.w_uv[(u, v)] <= self.alpha_u[u])
-            self.model.add_constr(self.w_uv[(u, v)] <= self.alpha_u[v])
-            self.model.add_constr(self.alpha_u[u] - (2 - self.x_u[u] - self.x_u[v]) <= self.w_uv[(u, v)])
-            self.model.add_constr(self.alpha_u[v] - (2 - self.x_u[u] - self.x_u[v]) <= self.w_uv[(u, v)])
-
         # ベース項（双対変数なし）
         self.base_term = (
             4 * xsum(self.w_uv[e] for e in self.E_plus)
@@ -54,26 +75,163 @@ class AP_MILP:
             + 2 * self.lambda_val * xsum(self.D_minus[u] * self.alpha_u[u] for u in self.vertices)
         )
 
+        # 目的関数は一度だけ設定し, 双対項は x_u の係数として後から書き換える
+        self.model.objective = maximize(self.base_term)
+
+    def _constr_blocks(self, E_plus, E_minus):
+        """
+        制約を (変数の番号, 係数, 右辺) のブロックとして生成する (すべて <= 制約)
+
+        変数の番号は x_u: u, alpha_u: n + u, s: 2n, w_uv: 2n + 1 + (辺の番号)
+        """
+        n = len(self.vertices)
+        x = np.arange(n)
+        alpha = n + x
+        s = np.full(n, 2 * n)
+        w = 2 * n + 1 + np.arange(len(E_plus) + len(E_minus))
+        w_plus, w_minus = w[:len(E_plus)], w[len(E_plus):]
+
+        blocks = [
+            # s - (1 - x_u) <= alpha_u
+            (np.column_stack([s, x, alpha]), [1, 1, -1], 1),
+            # alpha_u <= s
+            (np.column_stack([alpha, s]), [1, -1], 0),
+            # alpha_u <= x_u
+            (np.column_stack([alpha, x]), [1, -1], 0),
+        ]
+
+        if self.formulation == "full":
+            E = np.concatenate([E_plus, E_minus])
+            u, v = E[:, 0], E[:, 1]
+            blocks += [
+                (np.column_stack([w, n + u]), [1, -1], 0),
+                (np.column_stack([w, n + v]), [1, -1], 0),
+                (np.column_stack([n + u, u, v, w]), [1, 1, 1, -1], 2),
+                (np.column_stack([n + v, u, v, w]), [1, 1, 1, -1], 2),
+            ]
+        else:
+            u, v = E_plus[:, 0], E_plus[:, 1]
+            blocks += [
+                (np.column_stack([w_plus, n + u]), [1, -1], 0),
+                (np.column_stack([w_plus, n + v]), [1, -1], 0),
+            ]
+            u, v = E_minus[:, 0], E_minus[:, 1]
+            blocks += [
+                # alpha_u + x_v - 1 <= w_uv
+                (np.column_stack([n + u, v, w_minus]), [1, 1, -1], 1),
+            ]
+
+        return blocks
+
+    def set_lambda(self, lambda_val):
+        """
+        パラメータ lambda を変更する (alpha_u の目的関数の係数だけを書き換える)
+
+        制約は lambda によらないので, 前回の最適解はそのまま初期解に使える
+        """
+        self.lambda_val = lambda_val
+        for u in self.vertices:
+            self.alpha_u[u].obj = -2 * (1 - lambda_val) * self.D_plus[u] + 2 * lambda_val * self.D_minus[u]
+
     def add_lps_dual_sol(self, lps_dual_sol):
         """
         双対変数を目的関数に追加
         """
-        # 双対項
-        dual_term = - xsum(lps_dual_sol[u] * self.x_u[u] for u in self.vertices)
+        # 双対項 (x_u の係数をその場で更新する)
+        for u in self.vertices:
+            self.x_u[u].obj = -lps_dual_sol[u]
+
+    def set_branching_constrs(self, together=(), apart=()):
+        """
+        Ryan-Foster 分枝の制約を設定する (前のノードの制約は削除する)
 
-        # 目的関数を設定
-        self.model.objective = maximize(self.base_term + dual_term)
+        Parameters:
+        - together: 同じコミュニティに入れる頂点の組のリスト (x_r = x_s)
+        - apart: 別のコミュニティに分ける頂点の組のリスト (x_r + x_s <= 1)
+        """
+        if self.branching_constrs:
+            self.model.remove(self.branching_constrs)
+        self.together = list(together)
+        self.apart = list(apart)
+
+        self.branching_constrs = [self.model.add_constr(self.x_u[r] - self.x_u[s] == 0) for r, s in self.together]
+        self.branching_constrs += [self.model.add_constr(self.x_u[r] + self.x_u[s] <= 1) for r, s in self.apart]
+
+        # 前回の最適解が新しい制約を満たさなければ初期解に使わない
+        if self.incumbent is not None and not self.is_compatible(self.incumbent):
+            self.incumbent = None
+
+    def fix_vertices(self, fixed=()):
+        """
+        x_u = 0 に固定する頂点を設定する (前回固定した頂点は元に戻す)
+
+        Parameters:
+        - fixed: 固定する頂点のリスト (presolve.fixable_vertices)
+        """
+        for u in self.fixed:
+            self.x_u[u].ub = 1
+        self.fixed = list(fixed)
+        for u in self.fixed:
+            self.x_u[u].ub = 0
+
+        # 前回の最適解が固定した頂点を含めば初期解に使わない
+        if self.incumbent is not None and not self.is_compatible(self.incumbent):
+            self.incumbent = None
+
+    def is_compatible(self, C):
+        """
+        列 C が分枝の制約と固定した頂点を満たすか
+        """
+        return (
+            not any(u in C for u in self.fixed)
+            and all((r in C) == (s in C) for r, s in self.together)
+            and not any(r in C and s in C for r, s in self.apart)
+        )
+
+    def set_start_column(self, C):
+        """
+        列 C に対応する実行可能解を次の求解の初期解 (MIP start) に設定する
+        """
+        C = set(C)
+        alpha = 1 / len(C)
 
-    def solve_model(self):
+        start = [(self.x_u[u], 1.0 if u in C else 0.0) for u in self.vertices]
+        start += [(self.alpha_u[u], alpha) for u in C]
+        start.append((self.s, alpha))
+        start += [(self.w_uv[(u, v)], alpha) for (u, v) in self.E if u in C and v in C]
+        self.model.start = start
+
+    def solve_model(self, max_seconds=None):
         """
         AP-MILPを解く
+
+        Parameters:
+        - max_seconds: 制限時間 (None なら最適解が得られるまで解く)
+          制限時間で打ち切った場合, ap_milp_opt は暫定解の値で, self.ap_milp_bound が最適値の上界になる
         Returns:
-        - ap_milp_opt: 最適値
-        - ap_milp_sol: 最適解
+        - ap_milp_opt: 最適値 (実行可能解が見つからなかった場合は -inf)
+        - ap_milp_sol: 最適解 (実行可能解が見つからなかった場合は None)
         """
-        self.model.optimize()
+        # 前回の最適解は制約を満たすので, そのまま初期解として使える
+        if self.warm_start and self.incumbent:
+            self.set_start_column(self.incumbent)
+
+        if max_seconds is None:
+            self.status = self.model.optimize()
+        else:
+            self.status = self.model.optimize(max_seconds=max_seconds)
+
+        if self.model.num_solutions == 0:
+            self.ap_milp_opt = float("-inf")
+            self.ap_milp_bound = self.model.objective_bound
+            self.ap_milp_sol = None
+            return self.ap_milp_opt, self.ap_milp_sol
+
+        self.incumbent = frozenset(u for u in self.vertices if self.x_u[u].x > 0.5)
 
         self.ap_milp_opt = self.model.objective_value
+        # CBC の上界は許容誤差の分だけ最適値より大きいことがある
+        self.ap_milp_bound = max(self.ap_milp_opt, self.model.objective_bound)
         self.ap_milp_sol = {
             "x_u": {u: self.x_u[u].x for u in self.vertices},
             "alpha_u": {u: self.alpha_u[u].x for u in self.vertices},
@@ -83,6 +241,24 @@ class AP_MILP:
 
         return self.ap_milp_opt, self.ap_milp_sol
 
+    def get_solution_pool(self):
+        """
+        CBC が探索中に保存した解 (暫定解) をすべて列として取り出す
+        解プールのないソルバーでは最適解だけを返す
+        Returns:
+        - pool: frozenset(C) のリスト (先頭が最適解)
+        """
+        if not has_solution_pool(self.model):
+            return [frozenset(u for u in self.vertices if self.x_u[u].x > 0.5)] if self.model.num_solutions else []
+
+        pool = []
+        for k in range(self.model.num_solutions):
+            C = frozenset(u for u in self.vertices if self.x_u[u].xi(k) > 0.5)
+            if C not in pool:
+                pool.append(C)
+
+        return pool
+
     def debag_print_model(self):
         print("\n=== AP-MILP ===")
 
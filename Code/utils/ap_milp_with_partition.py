@@ -1,55 +1,51 @@
-from mip import Model, xsum, maximize, BINARY, OptimizationStatus
+import numpy as np
+from mip import xsum, maximize, BINARY, CONTINUOUS, OptimizationStatus
+
+from utils.signed_graph import as_signed_graph
+from utils.solver import create_model
+from utils.milp_builder import stack_rows, add_constrs_from_matrix
 
 class AP_MILPWithPartition:
-    def __init__(self, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val):
+    def __init__(self, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, formulation="compact", solver_name="CBC"):
         """
         AP-MILPの初期化
+
+        z_uv は辺集合 E の上だけに置き, 制約も行列としてまとめて生成する.
+        |C| = k に固定すると, sum_{u, v} y_v z_uv = k sum_v y_v x_v なので, 目的関数は k (w_C - sum_{u in C} y_u) になる.
+        formulation で z_uv の線形化を選ぶ.
+        - "full": 各辺に x_u + x_v <= 1 + z_uv, z_uv <= x_u, z_uv <= x_v の 3 本 (z_uv はバイナリ)
+        - "compact": 目的関数で z_uv を増やしたい正の辺には上界の 2 本,
+          減らしたい負の辺には下界の 1 本だけを置く (x_u がバイナリなので z_uv は連続変数でよい)
+        solver_name で MILP ソルバー ("CBC" または "HiGHS") を選ぶ.
         """
-        self.model = Model(solver_name="CBC")
-        self.model.solver.set_verbose(False)
+        if formulation not in ("full", "compact"):
+            raise ValueError("formulation must be 'full' or 'compact'.")
+
+        self.model = create_model(solver_name)
         self.vertices = vertices
         self.A_plus = A_plus
         self.A_minus = A_minus
         self.D_plus = D_plus
         self.D_minus = D_minus
         self.lambda_val = lambda_val
+        self.formulation = formulation
 
-        self.E_plus = []
-        self.E_minus = []
-        for i in range(len(vertices)):
-            for j in range(i + 1, len(vertices)):
-                if A_plus[i, j] == 1:
-                    self.E_plus.append((i, j))
-                elif A_minus[i, j] == 1:
-                    self.E_minus.append((i, j))
+        # 辺リスト (疎行列なら O(m) で得られる)
+        graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+        self.E_plus, self.E_minus = graph.edge_lists()
         self.E = self.E_plus + self.E_minus
 
-        # # 変数
-        # self.x_u = {u: self.model.add_var(var_type=BINARY, name=f"x_{u}") for u in self.vertices}
-        # self.z_uv = {(u, v): self.model.add_var(var_type=BINARY, name=f"z_{u}_{v}") for (u, v) in  self.E}
-        # self.k = 1
-
-        # # 制約
-        # for (u, v) in self.E:
-        #     self.model.add_constr(self.x_u[u] + self.x_u[v] <= 1 + self.z_uv[(u, v)])
-        #     self.model.add_constr(self.x_u[u] >= self.z_uv[(u, v)])
-        #     self.model.add_constr(self.x_u[v] >= self.z_uv[(u, v)])
-        # self.partition_constr = self.model.add_constr(
-        #     xsum(self.x_u[u] for u in self.vertices) == self.k,
-        #     name="partition_constr"
-        # )
-
         # 変数
+        z_type = BINARY if formulation == "full" else CONTINUOUS
         self.x_u = {u: self.model.add_var(var_type=BINARY, name=f"x_{u}") for u in self.vertices}
-        self.z_uv = {(u, v): self.model.add_var(var_type=BINARY, name=f"z_{u}_{v}") for u in self.vertices for v in self.vertices}
+        self.z_uv = {(u, v): self.model.add_var(var_type=z_type, lb=0, ub=1, name=f"z_{u}_{v}") for (u, v) in self.E}
         self.k = 1
 
-        # 制約
-        for u in self.vertices:
-            for v in self.vertices:
-                self.model.add_constr(self.x_u[u] + self.x_u[v] <= 1 + self.z_uv[(u, v)])
-                self.model.add_constr(self.x_u[u] >= self.z_uv[(u, v)])
-                self.model.add_constr(self.x_u[v] >= self.z_uv[(u, v)])
+        # 制約 (行列としてまとめて生成する)
+        variables = [self.x_u[u] for u in self.vertices] + [self.z_uv[e] for e in self.E]
+        A, b = stack_rows(self._constr_blocks(*graph.edges()), len(variables))
+        add_constrs_from_matrix(self.model, variables, A, b, sense="<")
+
         self.partition_constr = self.model.add_constr(
             xsum(self.x_u[u] for u in self.vertices) == self.k,
             name="partition_constr"
@@ -59,23 +55,65 @@ class AP_MILPWithPartition:
         self.base_term = (
             4 * xsum(self.z_uv[(u, v)] for (u, v) in  self.E_plus)
             -2 * (1 - self.lambda_val) * xsum(self.D_plus[u] * self.x_u[u] for u in self.vertices)
-            -4 * xsum(self.z_uv[(u, v)] for u in self.vertices for (u, v) in self.E_minus)
+            -4 * xsum(self.z_uv[(u, v)] for (u, v) in self.E_minus)
             +2 * self.lambda_val * xsum(self.D_minus[u] * self.x_u[u] for u in self.vertices)
         )
 
+        # x_u の係数のうち双対変数を含まない部分
+        self.base_x_coef = {
+            u: -2 * (1 - self.lambda_val) * self.D_plus[u] + 2 * self.lambda_val * self.D_minus[u]
+            for u in self.vertices
+        }
+        self.lps_dual_sol = {u: 0 for u in self.vertices}
+
+        # 目的関数は一度だけ設定し, 双対項は x_u の係数として後から書き換える
+        self.model.objective = maximize(self.base_term)
+
+    def _constr_blocks(self, E_plus, E_minus):
+        """
+        制約を (変数の番号, 係数, 右辺) のブロックとして生成する (すべて <= 制約)
+
+        変数の番号は x_u: u, z_uv: n + (辺の番号)
+        """
+        n = len(self.vertices)
+        z = n + np.arange(len(E_plus) + len(E_minus))
+        z_plus, z_minus = z[:len(E_plus)], z[len(E_plus):]
+
+        blocks = []
+        if self.formulation == "full":
+            E = np.concatenate([E_plus, E_minus])
+            u, v = E[:, 0], E[:, 1]
+            blocks += [
+                (np.column_stack([u, v, z]), [1, 1, -1], 1),
+                (np.column_stack([z, u]), [1, -1], 0),
+                (np.column_stack([z, v]), [1, -1], 0),
+            ]
+        else:
+            u, v = E_plus[:, 0], E_plus[:, 1]
+            blocks += [
+                (np.column_stack([z_plus, u]), [1, -1], 0),
+                (np.column_stack([z_plus, v]), [1, -1], 0),
+            ]
+            u, v = E_minus[:, 0], E_minus[:, 1]
+            blocks += [
+                (np.column_stack([u, v, z_minus]), [1, 1, -1], 1),
+            ]
+
+        return blocks
+
     def add_lps_dual_sol(self, lps_dual_sol):
         """
         双対変数を目的関数に追加
         """
         self.lps_dual_sol = lps_dual_sol
-        # 双対項
-        self.dual_term = - xsum(lps_dual_sol[v] * self.z_uv[(u, v)] for u in self.vertices for v in self.vertices)
-
-        print(lps_dual_sol)
-        print(self.dual_term)
+        self._update_x_coef()
 
-        # 目的関数を設定
-        self.model.objective = maximize(self.base_term + self.dual_term)
+    def _update_x_coef(self):
+        """
+        x_u の目的関数の係数をその場で更新する (双対項 - k y_u x_u を含む)
+        """
+        for u in self.vertices:
+            self.x_u[u].obj = self.base_x_coef[u] - self.k * self.lps_dual_sol[u]
 
     def solve_model(self):
         """
@@ -94,6 +132,17 @@ class AP_MILPWithPartition:
 
         return self.ap_milp_opt, self.ap_milp_sol
 
+    def solve_relaxation(self):
+        """
+        AP-MILP の線形緩和を解く (x_u を含む全ての変数の整数性を外す. モデルの変数の型は変えない)
+
+        Returns:
+        - relax_opt: 線形緩和の最適値 (AP-MILP の最適値の上界)
+        """
+        self.model.optimize(relax=True)
+
+        return self.model.objective_value
+
     def debag_print_model(self):
         print("\n=== AP-MILP ===")
 
@@ -128,4 +177,7 @@ class AP_MILPWithPartition:
 
         # 分割制約の更新
         if hasattr(self, "partition_constr"):
-            self.partition_constr.rhs = self.k
\ No newline at end of file
+            self.partition_constr.rhs = self.k
+
+        # 双対項の係数は k に比例する
+        self._update_x_coef()
\ No newline at end of file
@@ -0,0 +1,376 @@
+import glob
+import hashlib
+import itertools
+import json
+import math
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
+import warnings
+
+from utils.input_data import read_csv_as_signed_graph, read_edge_list
+from utils.graph_cache import load_cached_signed_graph
+from utils.lps import LPS
+from utils.column_generation import column_generation, relative_gap
+from utils.checkpoint import load_checkpoint, restore_lps
+from utils.primal_heuristics import find_incumbent
+from utils.partition import generate_singleton
+from utils.seeding import generate_seed_partitions
+
+LOADERS = {"adjacency": read_csv_as_signed_graph, "edge_list": read_edge_list}
+SEEDINGS = ("singleton", "heuristic")
+PRICINGS = ("exact", "heuristic")
+# チェックポイントから再開せずに結果を返す列生成法の status
+FINAL_STATUSES = ("optimal", "gap")
+
+def _graph_entry(entry, base_dir):
+    """
+    マニフェストの 1 項目をグラフの辞書 {name, path, format} に変換する
+    """
+    if isinstance(entry, str):
+        entry = {"path": entry}
+    if "path" not in entry:
+        raise ValueError("manifest entries must have a 'path'.")
+
+    path = entry["path"]
+    if not os.path.isabs(path):
+        path = os.path.join(base_dir, path)
+
+    graph_format = entry.get("format", "adjacency")
+    if graph_format not in LOADERS:
+        raise ValueError(f"unknown graph format: {graph_format}")
+
+    name = entry.get("name", os.path.splitext(os.path.basename(path))[0])
+
+    return {"name": name, "path": path, "format": graph_format}
+
+def list_graphs(source):
+    """
+    ディレクトリまたはマニフェストからグラフの一覧を作る
+
+    ディレクトリの場合は直下の *.csv を隣接行列として名前順に読む.
+    マニフェストは .json (項目のリスト) または .jsonl (1 行 1 項目) で,
+    各項目はパスの文字列か {"path", "name", "format"} の辞書 (format は "adjacency" または "edge_list").
+    相対パスはマニフェストのあるディレクトリからのパスとみなす.
+
+    Parameters:
+    - source: ディレクトリまたはマニフェストのパス
+
+    Returns:
+    - graphs: {name, path, format} の辞書のリスト
+    """
+    if os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(os.path.abspath(source), "*.csv")))
+        return [_graph_entry(path, source) for path in paths]
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        if source.endswith(".jsonl"):
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = json.load(f)
+
+    return [_graph_entry(entry, base_dir) for entry in entries]
+
+def expand_jobs(graphs, lambda_values, seedings=("singleton",), pricings=("heuristic",), time_limit=None,
+                lp_solver="CBC", milp_solver="CBC", cache_dir=None, checkpoint_dir=None, **cg_options):
+    """
+    グラフとパラメータの格子の直積からジョブのリストを作る
+
+    Parameters:
+    - graphs: list_graphs の返り値
+    - lambda_values: lambda の値のリスト
+    - seedings: 初期の分割の作り方 ("singleton": 単独の頂点の分割, "heuristic": generate_seed_partitions)
+    - pricings: 価格付けの方法 ("exact": AP-MILP のみ, "heuristic": AP-MILP の前に局所探索)
+    - time_limit: ジョブごとの列生成法の制限時間 [秒] (None なら制限なし)
+    - lp_solver, milp_solver: column_generation と同じ
+    - cache_dir: グラフのキャッシュを置くディレクトリ (None ならキャッシュを使わない)
+    - checkpoint_dir: 列生成法のチェックポイントを置くディレクトリ (None なら保存しない).
+      同じジョブのチェックポイントがあればそこから再開する (終了済みなら保存した結果を返す)
+    - cg_options: column_generation に渡すその他の引数
+
+    Returns:
+    - jobs: ジョブの辞書のリスト (job_id は 0 からの通し番号)
+    """
+    for seeding in seedings:
+        if seeding not in SEEDINGS:
+            raise ValueError(f"seeding must be one of {SEEDINGS}.")
+    for pricing in pricings:
+        if pricing not in PRICINGS:
+            raise ValueError(f"pricing must be one of {PRICINGS}.")
+
+    jobs = []
+    for graph, lambda_val, seeding, pricing in itertools.product(graphs, lambda_values, seedings, pricings):
+        jobs.append({
+            "job_id": len(jobs),
+            **graph,
+            "lambda_val": float(lambda_val),
+            "seeding": seeding,
+            "pricing": pricing,
+            "time_limit": time_limit,
+            "lp_solver": lp_solver,
+            "milp_solver": milp_solver,
+            "cache_dir": cache_dir,
+            "checkpoint_dir": checkpoint_dir,
+            "cg_options": cg_options,
+        })
+
+    return jobs
+
+def _finite(value):
+    """
+    JSON に書けるように inf と nan を None にする
+    """
+    if value is None or not math.isfinite(value):
+        return None
+    return float(value)
+
+def checkpoint_path(job):
+    """
+    ジョブのチェックポイントのパス (グラフ名とパラメータから決めるので, ジョブの並びが変わっても同じ)
+
+    ソルバーと column_generation の引数はハッシュにして名前に入れ, 設定の違うジョブのチェックポイントから再開しないようにする.
+    """
+    if job.get("checkpoint_dir") is None:
+        return None
+
+    options = {"lp_solver": job["lp_solver"], "milp_solver": job["milp_solver"], "cg_options": job["cg_options"]}
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True, default=repr).encode("utf-8")).hexdigest()[:12]
+    name = f"{job['name']}_lambda{job['lambda_val']}_{job['seeding']}_{job['pricing']}_{digest}.npz"
+    return os.path.join(job["checkpoint_dir"], name)
+
+def run_job(job, tol=1e-6):
+    """
+    1 つのジョブ (グラフ, lambda, 初期の分割, 価格付け) の列生成法を解く
+
+    LPS の解が分数の場合は LPS の列から整数の分割を求める (lambda_sweep と同じ).
+    job に checkpoint_dir があればチェックポイントを保存し, 既にあればそこから再開する.
+    チェックポイントの列生成法が終了済み (FINAL_STATUSES) なら, 列生成法は解き直さず,
+    保存した LPS を解いて結果を返す ("time_limit" で止まったものは残りの時間で続ける).
+
+    Parameters:
+    - job: expand_jobs のジョブ
+    - tol: LPS の解が整数かを判定する許容誤差
+
+    Returns:
+    - result: 結果の辞書 (JSON に書ける値だけを含む)
+    """
+    start_time = time.perf_counter()
+
+    loader = LOADERS[job["format"]]
+    if job["cache_dir"] is None:
+        graph = loader(job["path"])
+    else:
+        graph = load_cached_signed_graph(job["path"], loader, cache_dir=job["cache_dir"])
+    vertices, A_plus, A_minus, D_plus, D_minus = graph.unpack()
+    lambda_val = job["lambda_val"]
+
+    if job["seeding"] == "heuristic":
+        init_partitions = generate_seed_partitions(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val)
+    else:
+        init_partitions = [generate_singleton(vertices)]
+
+    path = checkpoint_path(job)
+    checkpoint = None
+    if path is not None and os.path.exists(path):
+        checkpoint = load_checkpoint(path)
+        lps = restore_lps(
+            checkpoint, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, solver_name=job["lp_solver"]
+        )
+    else:
+        lps = LPS(
+            vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions, solver_name=job["lp_solver"]
+        )
+    if checkpoint is not None and checkpoint["status"] in FINAL_STATUSES:
+        cg_opt, cg_sol, _ = lps.solve_model()
+        S = list(lps.w_C_dict)
+        cnt = checkpoint["iteration"]
+        stats = {
+            "status": checkpoint["status"],
+            "best_ub": checkpoint["best_ub"],
+            "gap": relative_gap(cg_opt, checkpoint["best_ub"]),
+        }
+    else:
+        cg_opt, cg_sol, _, S, cnt, stats = column_generation(
+            vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions,
+            heuristic_pricing=job["pricing"] == "heuristic", time_limit=job["time_limit"], return_stats=True,
+            milp_solver=job["milp_solver"], lps=lps, checkpoint_path=path, resume_from=checkpoint,
+            **job["cg_options"]
+        )
+
+    integral = all(z_val < tol or z_val > 1 - tol for z_val in cg_sol.values())
+    if integral:
+        partition = [C for C, z_val in cg_sol.items() if z_val > 0.5]
+        partition_value = sum(lps.w_C_dict[C] for C in partition)
+    else:
+        partition_value, partition = find_incumbent(lps, cg_sol)
+
+    return {
+        "status": stats["status"],
+        "n": len(vertices),
+        "cg_opt": _finite(cg_opt),
+        "best_ub": _finite(stats["best_ub"]),
+        "gap": _finite(stats["gap"]),
+        "integral": integral,
+        "partition_value": _finite(partition_value),
+        "partition": None if partition is None else sorted(sorted(int(u) for u in C) for C in partition),
+        "iterations": cnt,
+        "columns": len(S),
+        "resumed": checkpoint is not None,
+        "time": time.perf_counter() - start_time,
+    }
+
+def _max_rss_mb():
+    """
+    このプロセスの最大メモリ使用量 [MB] (resource のないプラットフォームでは None)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _worker(job, conn, memory_limit):
+    """
+    ジョブ用の子プロセスで run_job を実行し, 結果をパイプで親プロセスに送る
+    """
+    # アドレス空間の上限を超えた確保は MemoryError (ソルバー内部ではプロセスの異常終了) になる
+    # (resource は Unix にしかないので, 上限を与えたときだけ読み込む)
+    if memory_limit is not None:
+        try:
+            import resource
+            limit = int(memory_limit * 1024 * 1024)
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, AttributeError, ValueError, OSError) as e:
+            warnings.warn(f"memory_limit is ignored on this platform: {e!r}")
+
+    try:
+        result = run_job(job)
+    except MemoryError:
+        result = {"status": "memory_limit"}
+    except Exception as e:
+        result = {"status": "error", "error": repr(e)}
+
+    result["max_rss_mb"] = _max_rss_mb()
+    conn.send(result)
+    conn.close()
+
+def _job_row(job, result, elapsed):
+    """
+    ジョブの設定と結果を出力する 1 行にまとめる
+    """
+    row = {key: job[key] for key in ("job_id", "name", "path", "lambda_val", "seeding", "pricing")}
+    row.update(result)
+    row["wall_time"] = elapsed
+
+    return row
+
+def _write_parquet(rows, output):
+    """
+    結果を Parquet に書き出す (pandas と pyarrow または fastparquet が必要)
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(rows)
+    if "partition" in df:
+        df["partition"] = df["partition"].map(json.dumps)
+    df.to_parquet(output, index=False)
+
+def run_batch(jobs, output=None, n_jobs=None, memory_limit=None, kill_grace=30.0, poll_interval=1.0):
+    """
+    ジョブを並列に実行し, 終わった順に結果を書き出す
+
+    各ジョブは専用の子プロセスで解くので, ソルバーが異常終了しても他のジョブには影響しない.
+    制限時間は column_generation の time_limit で打ち切り, それを kill_grace 秒過ぎても
+    終わらないジョブ (グラフの読込みや初期の分割の生成, 1 回の MILP が長い場合) は子プロセスごと止める.
+    メモリの上限は子プロセスのアドレス空間の上限 (RLIMIT_AS) で与える.
+
+    Parameters:
+    - jobs: expand_jobs のジョブのリスト
+    - output: 出力先 (.jsonl なら 1 行 1 ジョブで終わった順に追記, .parquet なら最後にまとめて書く, None なら書かない)
+    - n_jobs: 同時に実行するジョブ数 (None の場合は CPU 数)
+    - memory_limit: ジョブごとのメモリの上限 [MB] (None なら制限なし. RLIMIT_AS のないプラットフォームでは警告を出して無視する)
+    - kill_grace: 制限時間を超えてから子プロセスを止めるまでの猶予 [秒]
+    - poll_interval: 実行中のジョブを確認する間隔 [秒]
+
+    Returns:
+    - rows: 結果の辞書のリスト (job_id の順)
+        status: column_generation の status ("optimal", "gap", "time_limit") または
+            "timeout" (子プロセスを止めた), "memory_limit", "error", "crashed" (子プロセスの異常終了)
+        その他に job の設定, 最適値, 上界, 分割, 反復回数, 最大メモリ使用量 [MB] (max_rss_mb, 測れなければ None), 経過時間 [秒] (wall_time)
+    """
+    if output is not None and not output.endswith((".jsonl", ".parquet")):
+        raise ValueError("output must be a .jsonl or .parquet file.")
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    ctx = multiprocessing.get_context()
+    pending = list(reversed(jobs))
+    running = {}
+    rows = []
+
+    stream = None
+    if output is not None and output.endswith(".jsonl"):
+        stream = open(output, "w", encoding="utf-8")
+
+    def finish(job, result, elapsed):
+        row = _job_row(job, result, elapsed)
+        rows.append(row)
+        if stream is not None:
+            stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+            stream.flush()
+
+    try:
+        while pending or running:
+            # 空いているワーカーにジョブを割り当てる
+            while pending and len(running) < n_jobs:
+                job = pending.pop()
+                receiver, sender = ctx.Pipe(duplex=False)
+                process = ctx.Process(target=_worker, args=(job, sender, memory_limit), daemon=True)
+                process.start()
+                sender.close()
+                running[process.sentinel] = (process, receiver, job, time.perf_counter())
+
+            multiprocessing.connection.wait(list(running), timeout=poll_interval)
+
+            for sentinel, (process, receiver, job, start) in list(running.items()):
+                elapsed = time.perf_counter() - start
+                if receiver.poll():
+                    try:
+                        result = receiver.recv()
+                    except EOFError:
+                        result = {"status": "crashed"}
+                    process.join()
+                elif not process.is_alive():
+                    # 結果を送った直後に終了した場合は poll の後で終了を見ることがあるので,
+                    # 終了を待ってからもう一度パイプを確かめる
+                    process.join()
+                    result = {"status": "crashed", "exitcode": process.exitcode}
+                    if receiver.poll():
+                        try:
+                            result = receiver.recv()
+                        except EOFError:
+                            pass
+                elif job["time_limit"] is not None and elapsed > job["time_limit"] + kill_grace:
+                    process.kill()
+                    process.join()
+                    result = {"status": "timeout"}
+                else:
+                    continue
+
+                receiver.close()
+                del running[sentinel]
+                finish(job, result, elapsed)
+    finally:
+        for process, receiver, _, _ in running.values():
+            process.kill()
+            receiver.close()
+        if stream is not None:
+            stream.close()
+
+    rows.sort(key=lambda row: row["job_id"])
+    if output is not None and output.endswith(".parquet"):
+        _write_parquet(rows, output)
+
+    return rows
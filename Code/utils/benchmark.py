@@ -0,0 +1,241 @@
+import itertools
+import os
+import platform
+import statistics
+import time
+
+import numpy as np
+
+from utils.graph import generate_signed_graph
+from utils.wc import calc_w_C
+from utils.lps import LPS
+from utils.ap_milp import AP_MILP
+from utils.column_generation import column_generation
+from utils.partition import generate_singleton
+from utils.synthetic import planted_signed_graph
+
+STAGES = (
+    "generate_signed_graph", "calc_w_C", "lps_build", "lps_resolve", "ap_milp_build", "ap_milp_solve",
+    "column_generation",
+)
+
+# 制限時間で打ち切られたことを表す状態 (実行時間は制限時間を測っているだけなので比べない)
+LIMIT_STATUSES = ("time_limit", "feasible", "no_solution_found")
+
+def make_cases(sizes=(20, 30, 40), densities=(0.1, 0.3), negative_fractions=(0.2, 0.5), noises=(0.05,),
+               communities=4, lambda_val=0.5, seed=0):
+    """
+    グラフの大きさ, 密度, 負の辺の割合, ノイズの直積でベンチマークのケースを作る
+
+    Returns:
+    - cases: ケースの辞書のリスト (name はケースを識別する文字列)
+    """
+    cases = []
+    for n, density, negative_fraction, noise in itertools.product(sizes, densities, negative_fractions, noises):
+        cases.append({
+            "name": f"n{n}_d{density}_neg{negative_fraction}_noise{noise}",
+            "n": n,
+            "communities": min(communities, n),
+            "density": density,
+            "negative_fraction": negative_fraction,
+            "noise": noise,
+            "lambda_val": lambda_val,
+            "seed": seed,
+        })
+
+    return cases
+
+def quick_cases():
+    """
+    動作確認用の小さなケース
+    """
+    return make_cases(sizes=(12, 20), densities=(0.3,), negative_fractions=(0.3,))
+
+def _random_columns(labels, count, rng):
+    """
+    埋め込んだコミュニティの部分集合と 2 つのコミュニティの和集合からなる列
+    """
+    communities = [np.flatnonzero(labels == c) for c in np.unique(labels)]
+    columns = []
+    for _ in range(count):
+        C = communities[rng.integers(len(communities))]
+        if rng.random() < 0.3 and len(communities) > 1:
+            C = np.concatenate([C, communities[rng.integers(len(communities))]])
+        size = rng.integers(1, len(C) + 1)
+        columns.append(frozenset(rng.choice(C, size=size, replace=False).tolist()))
+
+    return columns
+
+def _stage(name, graph, labels, case, time_limit):
+    """
+    ステージの準備 (計測しない) と本体 (計測する) の組を返す
+
+    Returns:
+    - setup: 引数なしで状態を返す関数
+    - run: 状態を受け取り, 追加の情報の辞書 (または None) を返す関数
+    """
+    vertices, A_plus, A_minus, D_plus, D_minus = graph.unpack()
+    lambda_val = case["lambda_val"]
+    args = (vertices, A_plus, A_minus, D_plus, D_minus, lambda_val)
+    planted = [np.flatnonzero(labels == c).tolist() for c in np.unique(labels)]
+    init_partitions = [generate_singleton(vertices), planted]
+    rng = np.random.default_rng(case["seed"])
+
+    if name == "generate_signed_graph":
+        A = graph.A_plus.astype(np.int8) - graph.A_minus.astype(np.int8)
+
+        def run(A):
+            generate_signed_graph(A, sparse=True)
+        return lambda: A, run
+
+    if name == "calc_w_C":
+        columns = [list(C) for C in _random_columns(labels, 200, rng)]
+
+        def run(columns):
+            for C in columns:
+                calc_w_C(C, A_plus, A_minus, D_plus, D_minus, lambda_val)
+        return lambda: columns, run
+
+    if name == "lps_build":
+        def run(_):
+            LPS(*args, init_partitions)
+        return lambda: None, run
+
+    if name == "lps_resolve":
+        columns = _random_columns(labels, 100, rng)
+
+        def setup():
+            lps = LPS(*args, init_partitions)
+            lps.solve_model()
+            return lps
+
+        def run(lps):
+            lps.update_model_batch(columns)
+            lps.solve_model()
+            return {"lp_iterations": lps.iterations[-1]}
+        return setup, run
+
+    if name == "ap_milp_build":
+        def run(_):
+            AP_MILP(*args)
+        return lambda: None, run
+
+    if name == "ap_milp_solve":
+        lps = LPS(*args, init_partitions)
+        _, _, lps_dual_sol = lps.solve_model()
+
+        def setup():
+            ap_milp = AP_MILP(*args)
+            ap_milp.add_lps_dual_sol(lps_dual_sol)
+            return ap_milp
+
+        def run(ap_milp):
+            ap_milp_opt, _ = ap_milp.solve_model(max_seconds=time_limit)
+            return {"ap_milp_opt": ap_milp_opt, "status": ap_milp.status.name.lower()}
+        return setup, run
+
+    if name == "column_generation":
+        def run(_):
+            cg_opt, _, _, S, cnt, stats = column_generation(
+                *args, [generate_singleton(vertices)], time_limit=time_limit, return_stats=True
+            )
+            return {"cg_opt": cg_opt, "iterations": cnt, "columns": len(S), "status": stats["status"]}
+        return lambda: None, run
+
+    raise ValueError(f"stage must be one of {STAGES}.")
+
+def run_benchmarks(cases, stages=STAGES, repeats=3, time_limit=60.0, callback=None):
+    """
+    各ケースの合成グラフで各ステージの実行時間を計測する
+
+    ステージごとに準備 (モデルの構築など計測対象でない処理) をしてから本体だけを計測し, repeats 回繰り返す.
+
+    Parameters:
+    - cases: make_cases のケースのリスト
+    - stages: 計測するステージ (STAGES の部分集合)
+    - repeats: 繰り返し回数
+    - time_limit: AP-MILP と列生成法の制限時間 [秒]
+    - callback: 計測結果の辞書を 1 件ずつ受け取る関数 (進捗の表示用, None なら呼ばない)
+
+    Returns:
+    - results: 計測結果の辞書のリスト
+        case, stage: ケースの名前とステージ
+        n, m: 頂点数と辺数
+        times: 各回の実行時間 [秒]
+        min, median: 実行時間の最小値と中央値 [秒]
+        その他にステージの情報 (反復回数, 最適値, 状態など. 最後の回の値)
+    """
+    for stage in stages:
+        if stage not in STAGES:
+            raise ValueError(f"stage must be one of {STAGES}.")
+
+    results = []
+    for case in cases:
+        graph, labels = planted_signed_graph(
+            case["n"], case["communities"], case["density"], case["negative_fraction"], case["noise"], case["seed"]
+        )
+        E_plus, E_minus = graph.edges()
+
+        for stage in stages:
+            setup, run = _stage(stage, graph, labels, case, time_limit)
+            times, info = [], None
+            for _ in range(repeats):
+                state = setup()
+                start_time = time.perf_counter()
+                info = run(state)
+                times.append(time.perf_counter() - start_time)
+
+            result = {
+                "case": case["name"], "stage": stage, "n": case["n"], "m": len(E_plus) + len(E_minus),
+                "times": times, "min": min(times), "median": statistics.median(times),
+                **(info or {}),
+            }
+            results.append(result)
+            if callback is not None:
+                callback(result)
+
+    return results
+
+def environment():
+    """
+    計測した環境の情報 (ベースラインと比べるときの参考)
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def compare_to_baseline(results, baseline, tolerance=0.5, min_seconds=0.01):
+    """
+    ベースラインと比べて遅くなったケースとステージを探す
+
+    実行時間の最小値がベースラインの (1 + tolerance) 倍を超え, かつ差が min_seconds を超えたものを回帰とする.
+    ベースラインにないケースとステージと, ベースラインで制限時間に達していたものは比べない.
+
+    Parameters:
+    - results: run_benchmarks の返り値
+    - baseline: 以前の run_benchmarks の返り値
+    - tolerance: 許容する増加率
+    - min_seconds: 回帰とみなす最小の差 [秒] (短いステージの揺らぎを無視する)
+
+    Returns:
+    - regressions: {case, stage, baseline, current, ratio} の辞書のリスト (ratio の降順)
+    """
+    baseline_times = {
+        (row["case"], row["stage"]): row["min"] for row in baseline if row.get("status") not in LIMIT_STATUSES
+    }
+
+    regressions = []
+    for row in results:
+        base = baseline_times.get((row["case"], row["stage"]))
+        if base is None:
+            continue
+        if row["min"] > base * (1 + tolerance) and row["min"] - base > min_seconds:
+            regressions.append({
+                "case": row["case"], "stage": row["stage"], "baseline": base, "current": row["min"],
+                "ratio": row["min"] / max(base, 1e-12),
+            })
+
+    return sorted(regressions, key=lambda row: -row["ratio"])
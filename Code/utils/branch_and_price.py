@@ -0,0 +1,272 @@
+import heapq
+import itertools
+import time
+
+from utils.lps import LPS
+from utils.ap_milp import AP_MILP
+from utils.pricing import collect_improving_columns, lagrangian_bound
+from utils.heuristic_pricing import LocalSearchPricer
+from utils.primal_heuristics import find_incumbent
+
+class Node:
+    def __init__(self, together=(), apart=(), bound=float("inf"), depth=0, basis=None):
+        """
+        分枝価格法の探索木のノード
+
+        Parameters:
+        - together: 同じコミュニティに入れる頂点の組のリスト
+        - apart: 別のコミュニティに分ける頂点の組のリスト
+        - bound: 親ノードで得られた上界
+        - depth: 深さ
+        - basis: 親ノードの LPS の最適基底 (LPS.save_basis, CBC では None)
+        """
+        self.together = list(together)
+        self.apart = list(apart)
+        self.bound = bound
+        self.depth = depth
+        self.basis = basis
+
+    def is_compatible(self, C):
+        """
+        列 C がこのノードの分枝の制約を満たすか
+        """
+        return (
+            all((r in C) == (s in C) for r, s in self.together)
+            and not any(r in C and s in C for r, s in self.apart)
+        )
+
+    def groups(self, vertices):
+        """
+        together の制約で同じコミュニティに入る頂点のグループ (Union-Find)
+
+        Returns:
+        - groups: frozenset のリスト (apart の組を含むグループがあれば None)
+        """
+        parent = {u: u for u in vertices}
+
+        def find(u):
+            while parent[u] != u:
+                parent[u] = parent[parent[u]]
+                u = parent[u]
+            return u
+
+        for r, s in self.together:
+            parent[find(r)] = find(s)
+
+        if any(find(r) == find(s) for r, s in self.apart):
+            return None
+
+        groups = {}
+        for u in vertices:
+            groups.setdefault(find(u), []).append(u)
+
+        return [frozenset(group) for group in groups.values()]
+
+def select_branching_pair(lps_primal_sol, tol=1e-6):
+    """
+    Ryan-Foster 分枝の頂点の組を選ぶ
+
+    f_rs = sum_{C contains r, s} z_C が 0 でも 1 でもなく, 0.5 に最も近い組を返す.
+    LPS の解が整数でなければ, 分数の値をとる列が存在し, f_rs が分数になる組が必ずある.
+
+    Returns:
+    - pair: (r, s) (LPS の解が整数なら None)
+    """
+    f = {}
+    for C, z_val in lps_primal_sol.items():
+        if z_val > tol:
+            for pair in itertools.combinations(sorted(C), 2):
+                f[pair] = f.get(pair, 0.0) + z_val
+
+    best_pair, best_score = None, float("inf")
+    for pair, f_rs in f.items():
+        if tol < f_rs < 1 - tol and abs(f_rs - 0.5) < best_score:
+            best_pair, best_score = pair, abs(f_rs - 0.5)
+
+    return best_pair
+
+def branch_and_price(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions,
+        strategy="best_bound", heuristic_pricing=True, node_limit=None, time_limit=None, tol=1e-6,
+        primal_heuristic=True, heuristic_time=1.0, lp_solver="CBC", milp_solver="CBC", lps=None, ap_milp=None):
+    '''
+    分枝価格法 (Ryan-Foster 分枝) で整数の分割を求める
+
+    各ノードで列生成法を解き, LPS の解が分数なら頂点の組 (r, s) で
+    「同じコミュニティ (together)」と「別のコミュニティ (apart)」の 2 つの子ノードに分ける.
+    分枝の制約は AP-MILP に制約として加え, LPS では制約を満たさない列の上界を 0 にする.
+    LPS と AP-MILP は全ノードで使い回すので, あるノードで生成した列は他のノードでも使える.
+    子ノードは親ノードの LPS の最適基底から解き始める (HiGHS のみ. CBC は直前に解いたノードの基底から再開する).
+    各ノードには together のグループを 1 つの列とする分割を加えるので, LPS は常に実行可能になる.
+
+    Parameters:
+    - vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions: column_generation と同じ
+    - strategy: ノードの選び方 ("best_bound": 上界が最大のノード, "depth_first": 深さ優先)
+    - heuristic_pricing: True の場合, AP-MILP の前に局所探索で列を探す
+    - node_limit: 解くノード数の上限 (None なら制限なし)
+    - time_limit: 制限時間 [秒] (None なら制限なし)
+    - tol: 許容誤差
+    - primal_heuristic: True の場合, 各ノードの LPS の解を丸めて暫定解を求める
+      (根ノードでは LPS の列の上の MIP も解く)
+    - heuristic_time: 根ノードの MIP の制限時間 [秒]
+    - lp_solver: LPS のソルバー ("CBC" または "HiGHS")
+    - milp_solver: AP-MILP のソルバー ("CBC" または "HiGHS")
+    - lps: 使い回す LPS (None なら作る). column_generation で解いた LPS を渡すと,
+      根ノードはその列から解き始めるので列生成法をやり直さない (init_partitions の列を含むこと)
+    - ap_milp: 使い回す AP_MILP (None なら作る). 分枝の制約と固定した頂点は設定し直す
+
+    Returns:
+    - bp_opt: 最良の整数解の目的関数値
+    - bp_sol: 最良の整数解 {frozenset(C): 1.0}
+    - stats: 探索の情報
+        status: "optimal", "node_limit", "time_limit" のいずれか
+        best_bound: 未探索のノードを含めた上界
+        gap: 相対ギャップ
+        nodes: 解いたノード数
+        columns: 生成した列の数
+        time: 経過時間 [秒]
+    '''
+    if strategy not in ("best_bound", "depth_first"):
+        raise ValueError("strategy must be 'best_bound' or 'depth_first'.")
+
+    start_time = time.perf_counter()
+    n = len(vertices)
+
+    if lps is None:
+        lps = LPS(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions, solver_name=lp_solver)
+    if ap_milp is None:
+        ap_milp = AP_MILP(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, solver_name=milp_solver)
+    # 分枝の制約は各ノードで設定するので, 前処理で固定した頂点だけを外しておく
+    ap_milp.fix_vertices()
+    pricer = None
+    if heuristic_pricing:
+        pricer = LocalSearchPricer(A_plus, A_minus, D_plus, D_minus, lambda_val, weight_engine=lps.weight_engine)
+
+    # 暫定解は初期の分割のうち最良のもの
+    bp_opt, bp_sol = float("-inf"), {}
+    for partition in init_partitions:
+        columns = [frozenset(C) for C in partition]
+        value = sum(lps.w_C_dict[C] for C in columns)
+        if value > bp_opt:
+            bp_opt, bp_sol = value, {C: 1.0 for C in columns}
+
+    counter = itertools.count()
+    queue = []
+
+    def push(node):
+        if strategy == "best_bound":
+            heapq.heappush(queue, (-node.bound, next(counter), node))
+        else:
+            queue.append((None, next(counter), node))
+
+    def pop():
+        if strategy == "best_bound":
+            return heapq.heappop(queue)[2]
+        return queue.pop()[2]
+
+    push(Node())
+    nodes = 0
+    status = "optimal"
+
+    while queue:
+        if node_limit is not None and nodes >= node_limit:
+            status = "node_limit"
+            break
+        if time_limit is not None and time.perf_counter() - start_time >= time_limit:
+            status = "time_limit"
+            break
+
+        node = pop()
+        if node.bound <= bp_opt + tol:
+            continue
+
+        groups = node.groups(vertices)
+        if groups is None:
+            continue
+        nodes += 1
+
+        # ノードの分枝の制約を LPS と AP-MILP に反映する
+        lps.update_model_batch(groups)
+        lps.restrict_columns(node.is_compatible)
+        lps.restore_basis(node.basis)
+        ap_milp.set_branching_constrs(node.together, node.apart)
+
+        node_opt, lps_primal_sol = _solve_node(lps, ap_milp, pricer, node, bp_opt, n, tol)
+        if node_opt is None:
+            continue
+
+        if primal_heuristic:
+            methods = ("rounding", "mip") if node.depth == 0 else ("rounding",)
+            value, partition = find_incumbent(lps, lps_primal_sol, methods=methods, max_seconds=heuristic_time)
+            if value is not None and value > bp_opt:
+                bp_opt, bp_sol = value, {C: 1.0 for C in partition}
+
+        if node_opt <= bp_opt + tol:
+            continue
+
+        pair = select_branching_pair(lps_primal_sol, tol)
+        if pair is None:
+            # 整数解なので暫定解を更新する
+            bp_opt = node_opt
+            bp_sol = {C: 1.0 for C, z_val in lps_primal_sol.items() if z_val > 0.5}
+            continue
+
+        # 深さ優先では together の子ノードを先に調べる
+        basis = lps.save_basis()
+        push(Node(node.together, node.apart + [pair], node_opt, node.depth + 1, basis))
+        push(Node(node.together + [pair], node.apart, node_opt, node.depth + 1, basis))
+
+    best_bound = max([bp_opt] + [item[2].bound for item in queue])
+    stats = {
+        "status": status,
+        "best_bound": best_bound,
+        "gap": max(0.0, best_bound - bp_opt) / max(abs(best_bound), 1e-10),
+        "nodes": nodes,
+        "columns": len(lps.S),
+        "time": time.perf_counter() - start_time,
+    }
+
+    return bp_opt, bp_sol, stats
+
+def _solve_node(lps, ap_milp, pricer, node, incumbent, n, tol):
+    """
+    ノードの列生成法を解く
+
+    Returns:
+    - node_opt: ノードの LPS の最適値 (上界で枝刈りした場合は None)
+    - lps_primal_sol: LPS の主問題の解
+    """
+    while(True):
+        lps_opt, lps_primal_sol, lps_dual_sol = lps.solve_model()
+
+        columns = []
+        if pricer is not None:
+            seeds = [C for C, z_val in lps_primal_sol.items() if z_val > tol]
+            columns = [
+                C for _, C in pricer.find_columns(lps_dual_sol, seeds=seeds, known_columns=lps.w_C_dict)
+                if node.is_compatible(C)
+            ]
+
+        if not columns:
+            ap_milp.add_lps_dual_sol(lps_dual_sol)
+            ap_milp_opt, ap_milp_sol = ap_milp.solve_model()
+
+            # ラグランジュ上界が暫定解以下なら, このノードから良い整数解は得られない
+            if lagrangian_bound(lps_dual_sol, ap_milp.ap_milp_bound, n) <= incumbent + tol:
+                return None, lps_primal_sol
+
+            if ap_milp_opt <= 10e-6:
+                return lps_opt, lps_primal_sol
+
+            frozen_C = frozenset(u for u, x_val in ap_milp_sol["x_u"].items() if x_val > 0.5)
+            pool = [frozen_C] + ap_milp.get_solution_pool()
+            columns = [frozen_C] + [
+                C for _, C in collect_improving_columns(pool, lps.weight_engine, lps_dual_sol, known_columns=lps.w_C_dict)
+                if C != frozen_C and node.is_compatible(C)
+            ]
+
+            # 丸め誤差で既存の列しか得られなければ収束とみなす
+            if all(C in lps.w_C_dict for C in columns):
+                return lps_opt, lps_primal_sol
+
+        lps.update_model_batch(columns)
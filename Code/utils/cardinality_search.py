@@ -0,0 +1,93 @@
+import numpy as np
+
+from utils.signed_graph import as_signed_graph
+
+class CardinalitySearch:
+    def __init__(self, A_plus, A_minus, D_plus, D_minus, lambda_val, k_min=2, k_max=None, window=1):
+        """
+        分割数制約付きの価格付けで調べる要素数 k を絞り込む
+
+        |C| = k の AP-MILP の最適値 k (w_C - sum_{u in C} y_u) は
+        sum_{u in C} s_u(k), s_u(k) = 2 min(D+_u, k - 1) - 2 (1 - lambda) D+_u + 2 lambda D-_u - k y_u
+        で上から抑えられる (C 内の正の隣接頂点は高々 min(D+_u, k - 1) 個で, 負の辺の項は 0 以下).
+        s_u(k) の上位 k 個の和が 0 以下の k では被約費用が正の列は存在しないので解かずに済む.
+        また, 過去の反復で列が見つかった k とその近傍を優先して調べる.
+
+        Parameters:
+        - A_plus, A_minus, D_plus, D_minus: calc_w_C と同じ (A_plus に SignedGraph も可)
+        - lambda_val: パラメータ
+        - k_min, k_max: 調べる要素数の範囲 (k_max が None なら頂点数)
+        - window: 列が見つかった k から前後いくつまでを優先するか
+        """
+        self.graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+        self.lambda_val = lambda_val
+        self.k_min = k_min
+        self.k_max = self.graph.n if k_max is None else min(k_max, self.graph.n)
+        self.window = window
+
+        self.D_plus = np.asarray(self.graph.D_plus, dtype=np.float64)
+        D_minus = np.asarray(self.graph.D_minus, dtype=np.float64)
+        self.c = -2 * (1 - lambda_val) * self.D_plus + 2 * lambda_val * D_minus
+
+        # 列が見つかった k ごとの回数
+        self.history = {}
+
+    def upper_bounds(self, lps_dual_sol, ks=None):
+        """
+        各 k について AP-MILP の最適値の上界を計算する
+
+        Parameters:
+        - lps_dual_sol: LPS の双対解 {頂点 u: 値}
+        - ks: 調べる要素数のリスト (None なら k_min ~ k_max)
+
+        Returns:
+        - bounds: {k: 上界}
+        """
+        if ks is None:
+            ks = range(self.k_min, self.k_max + 1)
+
+        y = np.array([lps_dual_sol[u] for u in self.graph.vertices], dtype=np.float64)
+        n = self.graph.n
+
+        bounds = {}
+        for k in ks:
+            s = 2 * np.minimum(self.D_plus, k - 1) + self.c - k * y
+            bounds[k] = float(np.partition(s, n - k)[n - k:].sum())
+
+        return bounds
+
+    def candidates(self, lps_dual_sol, tol=10e-6):
+        """
+        上界で枝刈りした k を優先するものとそれ以外に分ける
+
+        優先する k だけで列が見つからなかった場合は, 残りの k も解いてから終了を判定すること.
+
+        Parameters:
+        - lps_dual_sol: LPS の双対解 {頂点 u: 値}
+        - tol: 被約費用の許容誤差
+
+        Returns:
+        - focus: 過去に列が見つかった k とその近傍 (上界の降順)
+        - rest: 残りの k (上界の降順)
+        """
+        bounds = self.upper_bounds(lps_dual_sol)
+        alive = sorted((k for k, bound in bounds.items() if bound > tol), key=lambda k: -bounds[k])
+
+        near = set()
+        for k in self.history:
+            near.update(range(k - self.window, k + self.window + 1))
+
+        focus = [k for k in alive if k in near]
+        rest = [k for k in alive if k not in near]
+
+        return focus, rest
+
+    def record(self, columns):
+        """
+        列が見つかった k を記録する
+
+        Parameters:
+        - columns: {k: frozenset(C)}
+        """
+        for k in columns:
+            self.history[k] = self.history.get(k, 0) + 1
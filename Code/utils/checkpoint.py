@@ -0,0 +1,184 @@
+import json
+import math
+import os
+import tempfile
+
+import numpy as np
+
+from utils.lps import LPS
+
+CHECKPOINT_VERSION = 1
+
+def _pack_columns(columns, index):
+    """
+    列のリストを CSR 形式 (indptr, indices) の頂点の位置の配列にする
+    """
+    sizes = [len(C) for C in columns]
+    indptr = np.zeros(len(columns) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=indptr[1:])
+    indices = np.fromiter((index[u] for C in columns for u in C), dtype=np.int64, count=int(indptr[-1]))
+
+    return indptr, indices
+
+def _unpack_columns(indptr, indices, vertices):
+    """
+    _pack_columns の逆 (頂点の位置を vertices の頂点に戻す)
+    """
+    labels = np.asarray(vertices)[indices].tolist()
+
+    return [frozenset(labels[indptr[i]:indptr[i + 1]]) for i in range(len(indptr) - 1)]
+
+def _dual_array(dual_sol, vertices):
+    """
+    双対解の辞書を vertices の順の配列にする (None なら空の配列)
+    """
+    if dual_sol is None:
+        return np.zeros(0)
+    return np.array([dual_sol[u] for u in vertices], dtype=np.float64)
+
+def save_checkpoint(path, lps, iteration, lps_opt_list, ub_list, best_ub, status=None, incumbent=None,
+                    incumbent_sol=None, center=None, best_bound=float("inf"), elapsed=0.0):
+    """
+    列生成法の途中の状態を圧縮した .npz ファイルに保存する
+
+    LPS の列 (頂点の位置の CSR 形式) と重み, LPS から外してキャッシュした列, 最後の双対解, 安定化の中心,
+    LPS の最適値と上界の履歴, 暫定解を保存する. 書き込みは同じディレクトリの一時ファイルで行い,
+    最後に名前を変更するので, 途中でジョブが止められても直前のチェックポイントは壊れない.
+
+    Parameters:
+    - path: 保存先 (.npz)
+    - lps: LPS
+    - iteration: 終えた反復の数
+    - lps_opt_list, ub_list: 終えた反復の LPS の最適値とラグランジュ上界 (None は nan として保存する).
+      終了した場合は最後に解いた LPS の値も含める (iteration より 1 つ長い)
+    - best_ub: 上界の最小値
+    - status: 終了した場合は column_generation の status (途中なら None)
+    - incumbent, incumbent_sol: 暫定解の目的関数値と解 {frozenset(C): 1.0}
+    - center: 安定化の中心の双対変数 {頂点 u: 値} (None なら保存しない)
+    - best_bound: 安定化の中心の上界
+    - elapsed: それまでの経過時間 [秒]
+    """
+    vertices = list(lps.vertices)
+    index = {u: i for i, u in enumerate(vertices)}
+    columns = list(lps.w_C_dict)
+    cached = list(lps.column_cache)
+    incumbent_columns = list(incumbent_sol or {})
+
+    header = {
+        "version": CHECKPOINT_VERSION,
+        "n": len(vertices),
+        "lambda_val": float(lps.lambda_val),
+        "iteration": int(iteration),
+        "best_ub": None if math.isinf(best_ub) else float(best_ub),
+        "status": status,
+        "incumbent": None if incumbent is None else float(incumbent),
+        "best_bound": None if math.isinf(best_bound) else float(best_bound),
+        "elapsed": float(elapsed),
+    }
+
+    arrays = {"header": np.array(json.dumps(header)), "vertices": np.asarray(vertices)}
+    for name, cols in (("columns", columns), ("cache", cached), ("incumbent", incumbent_columns)):
+        arrays[f"{name}_indptr"], arrays[f"{name}_indices"] = _pack_columns(cols, index)
+    arrays["weights"] = np.array([lps.w_C_dict[C] for C in columns], dtype=np.float64)
+    arrays["protected"] = np.array([C in lps.protected for C in columns], dtype=bool)
+    arrays["cache_weights"] = np.array([lps.column_cache[C] for C in cached], dtype=np.float64)
+    arrays["dual"] = _dual_array(getattr(lps, "lps_dual_sol", None), vertices)
+    arrays["center"] = _dual_array(center, vertices)
+    arrays["lps_opt_list"] = np.array(lps_opt_list, dtype=np.float64)
+    arrays["ub_list"] = np.array([np.nan if ub is None else ub for ub in ub_list], dtype=np.float64)
+
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=parent, prefix=".tmp_", suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def load_checkpoint(path):
+    """
+    save_checkpoint で保存したチェックポイントを読み込む
+
+    Returns:
+    - checkpoint: ヘッダの値 (n, lambda_val, iteration, best_ub, status, incumbent, best_bound, elapsed) と
+        vertices: 頂点のリスト
+        columns, weights, protected: LPS の列, その重み, 外さない列かどうか
+        cache: LPS から外してキャッシュした列 {frozenset(C): w_C}
+        dual_sol, center: 最後の双対解と安定化の中心 {頂点 u: 値} (保存していなければ None)
+        lps_opt_list, ub_list: LPS の最適値と上界の履歴 (上界のない反復は None)
+        incumbent_sol: 暫定解 {frozenset(C): 1.0}
+      の辞書
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+
+    header = json.loads(str(arrays["header"]))
+    if header["version"] != CHECKPOINT_VERSION:
+        raise ValueError(f"unsupported checkpoint version: {header['version']}")
+
+    vertices = arrays["vertices"].tolist()
+
+    def columns(name):
+        return _unpack_columns(arrays[f"{name}_indptr"], arrays[f"{name}_indices"], vertices)
+
+    def dual_sol(name):
+        if len(arrays[name]) == 0:
+            return None
+        return dict(zip(vertices, arrays[name].tolist()))
+
+    checkpoint = dict(header)
+    checkpoint.update({
+        "best_ub": float("inf") if header["best_ub"] is None else header["best_ub"],
+        "best_bound": float("inf") if header["best_bound"] is None else header["best_bound"],
+        "vertices": vertices,
+        "columns": columns("columns"),
+        "weights": arrays["weights"].tolist(),
+        "protected": arrays["protected"].tolist(),
+        "cache": dict(zip(columns("cache"), arrays["cache_weights"].tolist())),
+        "dual_sol": dual_sol("dual"),
+        "center": dual_sol("center"),
+        "lps_opt_list": arrays["lps_opt_list"].tolist(),
+        "ub_list": [None if math.isnan(ub) else ub for ub in arrays["ub_list"].tolist()],
+        "incumbent_sol": {C: 1.0 for C in columns("incumbent")},
+    })
+
+    return checkpoint
+
+def restore_lps(checkpoint, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, solver_name="CBC",
+                tol=1e-6):
+    """
+    チェックポイントの列から LPS を作り直す
+
+    外さない列 (初期の列とキャッシュから戻した列) で LPS を作り, 残りの列をまとめて追加する.
+    列の重みはグラフから計算し直し, 保存した重みと比べて別のグラフや lambda のチェックポイントでないことを確かめる.
+    列の使われない反復数 (age) は 0 から数え直す.
+
+    Parameters:
+    - checkpoint: load_checkpoint の返り値
+    - vertices, A_plus, A_minus, D_plus, D_minus, lambda_val: LPS と同じ
+    - solver_name: LP ソルバー ("CBC" または "HiGHS")
+    - tol: 重みの許容誤差
+
+    Returns:
+    - lps: LPS
+    """
+    if list(vertices) != checkpoint["vertices"]:
+        raise ValueError("checkpoint vertices do not match the graph.")
+    if abs(lambda_val - checkpoint["lambda_val"]) > tol:
+        raise ValueError(f"checkpoint lambda_val {checkpoint['lambda_val']} does not match {lambda_val}.")
+
+    protected = [C for C, keep in zip(checkpoint["columns"], checkpoint["protected"]) if keep]
+    lps = LPS(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, [protected], solver_name=solver_name)
+    lps.update_model_batch([C for C, keep in zip(checkpoint["columns"], checkpoint["protected"]) if not keep])
+    lps.protected = set(protected)
+    lps.column_cache = dict(checkpoint["cache"])
+
+    for C, w_C in zip(checkpoint["columns"], checkpoint["weights"]):
+        if abs(lps.w_C_dict[C] - w_C) > tol * max(1.0, abs(w_C)):
+            raise ValueError("checkpoint column weights do not match the graph.")
+
+    return lps
@@ -1,18 +1,83 @@
+import time
+
+from mip import OptimizationStatus
+
 from utils.lps import LPS
 from utils.ap_milp import AP_MILP
+from utils.pricing import collect_improving_columns, reduced_cost, lagrangian_bound
+from utils.heuristic_pricing import LocalSearchPricer
+from utils.presolve import PresolvedPricer, fixable_vertices
+from utils.stabilization import DualStabilizer
+from utils.primal_heuristics import find_incumbent
+from utils.telemetry import Telemetry
+from utils.checkpoint import save_checkpoint, load_checkpoint, restore_lps
 
-def column_generation(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions): 
+def column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions,
+        multi_column=True, max_columns=None, heuristic_pricing=True, stabilization=None,
+        gap_tol=None, time_limit=None, return_stats=False,
+        heuristic_interval=None, heuristic_methods=("rounding", "mip"), heuristic_time=1.0,
+        purge_age=None, purge_threshold=0.5, cache_size=None, lp_solver="CBC", milp_solver="CBC",
+        lps=None, ap_milp=None, callback=None, trace_path=None, presolve=False,
+        checkpoint_path=None, checkpoint_interval=300.0, resume_from=None):
     '''
     列生成法
 
     Parameters:
     - vertices: 頂点のリスト
-    - A_plus: 正の隣接行列
-    - A_minus: 負の隣接行列
+    - A_plus: 正の隣接行列 (密行列または CSR 形式の疎行列)
+    - A_minus: 負の隣接行列 (密行列または CSR 形式の疎行列)
     - D_plus: 正の次数
     - D_minus: 負の次数
     - lambda_val: パラメータ
-    - init_partitions: 初期の分割集合
+    - init_partitions: 初期の分割集合 (resume_from から LPS を作り直す場合は使わない)
+    - multi_column: True の場合, 1 回の価格付けで被約費用が正の列をまとめて追加する
+      (CBC の解プールと最適解の近傍から集める)
+    - max_columns: 1 回の反復で追加する列の最大数 (None なら上限なし)
+    - heuristic_pricing: True の場合, AP-MILP の前に局所探索で列を探し,
+      見つからなかったときだけ AP-MILP を解く (最適性の証明は常に AP-MILP で行う)
+    - stabilization: 双対変数の安定化 (None, "wentges", "box", "du_merle", または DualStabilizer の引数の辞書)
+      安定化した双対変数で価格付けし, 元の双対変数で被約費用が正の列だけを追加する.
+      終了は安定化なしの双対変数で AP-MILP が列を返さなかったときに限る
+    - gap_tol: LPS の最適値とラグランジュ上界の相対ギャップがこの値以下になったら終了する (None なら使わない)
+      上界は AP-MILP を解いた反復でだけ更新される (局所探索で列が見つかった反復では更新されない)
+    - time_limit: 制限時間 [秒] (None なら制限なし). 超えたら直前の LPS の解を返す
+    - return_stats: True の場合, 上界とギャップをまとめた辞書 stats も返す
+    - heuristic_interval: この反復数ごとと終了時に, LPS の列から整数の分割 (暫定解) を求める (None なら求めない)
+    - heuristic_methods: 暫定解を求める手法 (find_incumbent の methods)
+    - heuristic_time: 暫定解を求める MIP の制限時間 [秒]
+    - purge_age: 値が 0 で被約費用が -purge_threshold 未満の反復がこの回数続いた列を LPS から外す (None なら外さない)
+      外した列はキャッシュに残し, AP-MILP を解く前に被約費用を計算し直して正なら戻す
+    - purge_threshold: 列を使われないとみなす被約費用の大きさ
+    - cache_size: 外した列を残す最大数 (None なら上限なし)
+    - lp_solver: LPS のソルバー ("CBC" または "HiGHS")
+    - milp_solver: AP-MILP のソルバー ("CBC" または "HiGHS")
+    - lps: 使い回す LPS (None なら init_partitions から作る). 列と基底を引き継いで解き始める
+    - ap_milp: 使い回す AP_MILP (None なら作る). いずれも lambda_val に設定済みであること
+    - callback: 反復ごとの計測値の辞書を受け取る関数 (最後に event = "finish" の辞書も渡す)
+        iteration: 反復の番号
+        lps_opt, lp_iterations: LPS の最適値と単体法の反復回数
+        master_time: LPS を解いた時間 [秒]
+        pricing_time: 価格付け (局所探索, キャッシュ, AP-MILP, 解プールからの列の収集) の時間 [秒]
+        build_time: モデルの更新 (AP-MILP の双対変数, LPS の列の追加・削除) の時間 [秒]
+        wc_time: 列の重み w_C の計算の時間 [秒] (pricing_time と build_time に含まれる)
+        checkpoint_time: チェックポイントの保存の時間 [秒]
+        pricing: 列を見つけた方法 ("heuristic", "cache", "presolve", "milp")
+        pool_size: AP-MILP の解プールから集めた候補の数
+        columns_added, columns: 追加した列の数と追加後の LPS の列の数
+        dual_change: 前の反復からの双対変数の変化 (ユークリッドノルム)
+        ub, best_ub, gap: AP-MILP を解いた反復のラグランジュ上界, その最小値, 相対ギャップ
+        fixed: AP-MILP を解いた反復で x_u = 0 に固定した頂点の数 (presolve が True のとき)
+        elapsed: 開始からの経過時間 [秒]
+    - trace_path: callback と同じ辞書を 1 行ずつ書き出す JSONL ファイル (None なら書かない)
+    - presolve: True の場合, AP-MILP の前に前処理で頂点を減らした AP-MILP (PresolvedPricer, 発見的) で列を探し,
+      見つからなかったときだけ元の AP-MILP を解く. 元の AP-MILP でも, 最適値を変えずに固定できる頂点
+      (fixable_vertices) は x_u = 0 に固定してバイナリ変数を減らす
+    - checkpoint_path: 列生成法の状態を保存する .npz ファイル (None なら保存しない). 終了時にも保存する
+    - checkpoint_interval: 前回の保存からこの秒数が経ったら, 反復の終わりにチェックポイントを保存する
+    - resume_from: 再開するチェックポイント (.npz のパスまたは load_checkpoint の返り値, None なら最初から).
+      LPS の列, キャッシュした列, 反復回数, 最適値と上界の履歴, 暫定解, 安定化の中心を引き継ぐ.
+      time_limit は再開してからの時間で数える
 
     Returns:
     - cg_opt: 最終的な最適値
@@ -20,51 +85,335 @@ def column_generation(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, in
     - lps_opt_list: 各イテレーションのLPSの最適値リスト
     - S: 最終的な列集合
     - cnt: 反復回数
+    - stats: (return_stats が True の場合のみ)
+        ub_list: 各イテレーションのラグランジュ上界 (AP-MILP を解かなかった反復は None)
+        best_ub: 上界の最小値
+        gap: 最終的な相対ギャップ (best_ub - cg_opt) / |best_ub|
+        status: "optimal", "gap", "time_limit" のいずれか
+        time: 経過時間 [秒]
+        incumbent: 暫定解の目的関数値 (heuristic_interval が None なら None)
+        incumbent_sol: 暫定解 {frozenset(C): 1.0}
+        incumbent_gap: 暫定解と best_ub の相対ギャップ
+        lp_iterations: 各イテレーションの LPS の単体法の反復回数 (CBC では None)
+        warm_solves: 直前の基底から再開した LPS の求解の回数 (LPS.is_warm で確かめられない CBC では None)
+        trace: callback に渡した辞書のリスト
     '''
     # 初期化
 
-    lps = LPS(
-        vertices=vertices, 
-        A_plus=A_plus, 
-        A_minus=A_minus, 
-        D_plus=D_plus, 
-        D_minus=D_minus, 
-        lambda_val=lambda_val, 
-        init_partitions=init_partitions
+    checkpoint = None
+    if resume_from is not None:
+        checkpoint = resume_from if isinstance(resume_from, dict) else load_checkpoint(resume_from)
+        if lps is None:
+            lps = restore_lps(
+                checkpoint, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, solver_name=lp_solver
+            )
+
+    if lps is None:
+        lps = LPS(
+            vertices=vertices, 
+            A_plus=A_plus, 
+            A_minus=A_minus, 
+            D_plus=D_plus, 
+            D_minus=D_minus, 
+            lambda_val=lambda_val, 
+            init_partitions=init_partitions,
+            solver_name=lp_solver
+            )
+
+    if ap_milp is None:
+        ap_milp = AP_MILP(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, solver_name=milp_solver)
+
+    if heuristic_pricing:
+        pricer = LocalSearchPricer(
+            A_plus, A_minus, D_plus, D_minus, lambda_val, weight_engine=lps.weight_engine
         )
 
-    ap_milp = AP_MILP(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val)
+    presolver = None
+    if presolve:
+        presolver = PresolvedPricer(
+            vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, weight_engine=lps.weight_engine,
+            solver_name=milp_solver
+        )
+
+    stabilizer = None
+    if stabilization is not None:
+        if isinstance(stabilization, str):
+            stabilization = {"method": stabilization}
+        stabilizer = DualStabilizer(lps, **stabilization)
+        if checkpoint is not None and checkpoint["center"] is not None:
+            stabilizer.set_center(checkpoint["center"], checkpoint["best_bound"])
+
+    telemetry = Telemetry(callback, trace_path, counters={"wc_time": lambda: lps.weight_engine.elapsed})
+    start_time = time.perf_counter()
 
     cnt = 0
     lps_opt_list = []
+    ub_list = []
+    best_ub = float("inf")
+    warm_solves = None
+    first_solve = len(lps.iterations)
+    status = "optimal"
+    incumbent, incumbent_sol = None, {}
     cg_opt = 0
     cg_sol = {}
     S = []
+    elapsed_before = 0.0
+    if checkpoint is not None:
+        cnt = checkpoint["iteration"]
+        # 終了時のチェックポイントは最後の LPS の値も持つが, 再開すると LPS を解き直すので除く
+        lps_opt_list = list(checkpoint["lps_opt_list"])[:cnt]
+        ub_list = list(checkpoint["ub_list"])[:cnt]
+        best_ub = checkpoint["best_ub"]
+        incumbent, incumbent_sol = checkpoint["incumbent"], dict(checkpoint["incumbent_sol"])
+        elapsed_before = checkpoint["elapsed"]
+    last_checkpoint = time.perf_counter()
+
+    def write_checkpoint(final_status=None):
+        # 終えた反復 (cnt 回) の状態を保存する. 終了時は最後に解いた LPS (cg_opt) の値と上界も含める
+        nonlocal last_checkpoint
+        saved = cnt if final_status is None else len(lps_opt_list)
+        with telemetry.timer("checkpoint_time"):
+            save_checkpoint(
+                checkpoint_path, lps, cnt, lps_opt_list[:saved], ub_list[:saved], best_ub, status=final_status,
+                incumbent=incumbent, incumbent_sol=incumbent_sol,
+                center=None if stabilizer is None else stabilizer.center,
+                best_bound=float("inf") if stabilizer is None else stabilizer.best_bound,
+                elapsed=elapsed_before + time.perf_counter() - start_time,
+            )
+        last_checkpoint = time.perf_counter()
+
+    def update_incumbent(lps_primal_sol):
+        nonlocal incumbent, incumbent_sol
+        value, partition = find_incumbent(lps, lps_primal_sol, methods=heuristic_methods, max_seconds=heuristic_time)
+        if value is not None and (incumbent is None or value > incumbent):
+            incumbent, incumbent_sol = value, {C: 1.0 for C in partition}
+
+    try:
+        while(True):
+            telemetry.begin(cnt, columns_added=0)
+
+            # LP(S)を解く, 最適値, 主問題の解, 双対問題の解を得る. 
+            with telemetry.timer("master_time"):
+                lps_opt, lps_primal_sol, lps_dual_sol = lps.solve_model()
+            lps_opt_list.append(lps_opt)
+            ub_list.append(None)
+            if lps.is_warm() is not None:
+                warm_solves = (warm_solves or 0) + lps.is_warm()
+            telemetry.update(
+                lps_opt=lps_opt, lp_iterations=lps.iterations[-1], dual_change=telemetry.dual_change(lps_dual_sol)
+            )
+
+            # 定期的に LPS の列から暫定解を求める
+            if heuristic_interval is not None and cnt > 0 and cnt % heuristic_interval == 0:
+                update_incumbent(lps_primal_sol)
+
+            # 安定化の人工変数が 0 でなければ lps_opt は LP(全列) の下界にならない
+            lps_feasible = lps.dual_box_violation() <= 10e-6
+
+            # 制限時間を超えたら直前の LPS の解を返す
+            remaining = None
+            if time_limit is not None:
+                remaining = time_limit - (time.perf_counter() - start_time)
+                if remaining <= 0:
+                    if not lps_feasible:
+                        # 安定化をやめて元の LPS を解き直してから返す
+                        stabilizer.deactivate()
+                        cnt += 1
+                        continue
+
+                    status = "time_limit"
+                    cg_opt = lps_opt
+                    cg_sol = lps_primal_sol
+                    break
+
+            # 価格付けに使う双対変数 (安定化しない場合は LPS の双対変数そのもの)
+            pricing_dual_sol = lps_dual_sol
+            if stabilizer is not None:
+                pricing_dual_sol = stabilizer.pricing_duals(lps_dual_sol)
+
+            # 局所探索で被約費用が正の列を探す
+            columns = []
+            if heuristic_pricing:
+                seeds = [C for C, z_val in lps_primal_sol.items() if z_val > 10e-6]
+                with telemetry.timer("pricing_time"):
+                    columns = [
+                        C for _, C in pricer.find_columns(
+                            pricing_dual_sol, seeds=seeds, known_columns=lps.w_C_dict, max_columns=max_columns
+                        )
+                    ]
+                if columns:
+                    telemetry.update(pricing="heuristic")
+
+            # LPS から外した列で被約費用が正になったものを戻す
+            if not columns and purge_age is not None:
+                with telemetry.timer("pricing_time"):
+                    columns = lps.reprice_cached_columns(pricing_dual_sol, max_columns=max_columns)
+                if columns:
+                    telemetry.update(pricing="cache")
+
+            # 前処理で頂点を減らした AP-MILP で列を探す (見つからなければ元の AP-MILP で確かめる)
+            if not columns and presolver is not None:
+                with telemetry.timer("pricing_time"):
+                    columns = [
+                        C for _, C in presolver.find_columns(
+                            pricing_dual_sol, known_columns=lps.w_C_dict, max_columns=max_columns,
+                            max_seconds=None if remaining is None else max(remaining, 1e-3)
+                        )
+                    ]
+                if columns:
+                    telemetry.update(pricing="presolve")
 
-    while(True):
-        # LP(S)を解く, 最適値, 主問題の解, 双対問題の解を得る. 
-        lps_opt, lps_primal_sol, lps_dual_sol = lps.solve_model()
-        lps_opt_list.append(lps_opt)
+            # 見つからなければ AP-MILPを解く ap_milp_opt, ap_milp_sol
+            if not columns:
+                with telemetry.timer("build_time"):
+                    ap_milp.add_lps_dual_sol(pricing_dual_sol)
+                    # 固定しても AP-MILP の最適値 (0 との大きい方) は変わらないので, 上界と終了判定はそのまま使える
+                    fixed = []
+                    if presolve:
+                        fixed = fixable_vertices(
+                            pricing_dual_sol, ap_milp.D_plus, ap_milp.D_minus, ap_milp.lambda_val,
+                            exclude=[u for pair in ap_milp.together for u in pair]
+                        )
+                        telemetry.update(fixed=len(fixed))
+                    ap_milp.fix_vertices(fixed)
+                with telemetry.timer("pricing_time"):
+                    ap_milp_opt, ap_milp_sol = ap_milp.solve_model(
+                        max_seconds=None if remaining is None else max(remaining, 1e-3)
+                    )
 
-        # AP-MILPを解く ap_milp_opt, ap_milp_sol
-        ap_milp.add_lps_dual_sol(lps_dual_sol)
-        ap_milp_opt, ap_milp_sol = ap_milp.solve_model()
+                # ラグランジュ上界 (制限時間で打ち切った場合は AP-MILP の上界を使う)
+                ub = lagrangian_bound(pricing_dual_sol, ap_milp.ap_milp_bound, len(vertices))
+                ub_list[-1] = ub
+                best_ub = min(best_ub, ub)
+                telemetry.update(pricing="milp", ub=ub, best_ub=best_ub, gap=relative_gap(lps_opt, best_ub))
 
-        # 終了条件 ap_milp_opt <= 0 なら stop
-        if (ap_milp_opt <= 10e-6):
-            # 最終結果の保存
-            cg_opt = lps_opt
-            cg_sol = lps_primal_sol
+                if stabilizer is not None:
+                    stabilizer.update(pricing_dual_sol, ap_milp.ap_milp_bound)
 
-            break
+                # 終了条件 ギャップが gap_tol 以下になったら stop
+                if gap_tol is not None and lps_feasible and relative_gap(lps_opt, best_ub) <= gap_tol:
+                    status = "gap"
+                    cg_opt = lps_opt
+                    cg_sol = lps_primal_sol
 
-        # ap_milp_sol より S の更新
-        frozen_C = frozenset(u for u, x_val in ap_milp_sol["x_u"].items() if x_val == 1.0)
+                    break
 
-        # LPSを更新
-        S = lps.update_model(frozen_C)
+                # 制限時間で打ち切られて列が得られなければ, 次の反復の先頭で終了する
+                if ap_milp.status != OptimizationStatus.OPTIMAL and not ap_milp_opt > 10e-6:
+                    cnt += 1
+                    continue
+
+                if ap_milp_opt > 10e-6:
+                    # ap_milp_sol より S の更新
+                    frozen_C = frozenset(u for u, x_val in ap_milp_sol["x_u"].items() if x_val > 0.5)
+                    columns = [frozen_C]
+                    if multi_column:
+                        # 解プールと近傍から被約費用が正の列をまとめて集める
+                        with telemetry.timer("pricing_time"):
+                            pool = [frozen_C] + ap_milp.get_solution_pool()
+                            columns += [
+                                C for _, C in collect_improving_columns(
+                                    pool, lps.weight_engine, pricing_dual_sol,
+                                    known_columns=lps.w_C_dict, max_columns=max_columns
+                                )
+                                if C != frozen_C
+                            ]
+                        telemetry.update(pool_size=len(pool))
+                        if max_columns is not None:
+                            columns = columns[:max_columns]
+
+            if stabilizer is not None:
+                # 安定化した双対変数で見つけた列は, 元の双対変数で被約費用が正のものだけを追加する
+                w_C_list = lps.weight_engine.weights(columns)
+                columns = [
+                    C for C, w_C in zip(columns, w_C_list)
+                    if reduced_cost(w_C, C, lps_dual_sol) > 10e-6 and C not in lps.w_C_dict
+                ]
+
+            if not columns:
+                # 終了条件 安定化なしの双対変数で ap_milp_opt <= 0 なら stop
+                if stabilizer is None or stabilizer.is_exact():
+                    # 最終結果の保存
+                    cg_opt = lps_opt
+                    cg_sol = lps_primal_sol
+
+                    break
+
+                # misprice: 安定化を弱めて価格付けをやり直す
+                stabilizer.misprice()
+                cnt += 1
+                continue
+
+            if stabilizer is not None:
+                stabilizer.found_columns()
+
+            # 使われない列を外してから LPSを更新
+            with telemetry.timer("build_time"):
+                if purge_age is not None:
+                    lps.age_columns(purge_age, purge_threshold, cache_size=cache_size)
+                S = lps.update_model_batch(columns)
+            telemetry.update(columns_added=len(columns), columns=len(lps.w_C_dict))
+
+            # カウントの更新
+            cnt+=1
+
+            if checkpoint_path is not None and time.perf_counter() - last_checkpoint >= checkpoint_interval:
+                write_checkpoint()
+
+        if heuristic_interval is not None:
+            update_incumbent(cg_sol)
+
+        if checkpoint_path is not None:
+            write_checkpoint(status)
+
+        trace = telemetry.end(
+            status=status, cg_opt=cg_opt, best_ub=best_ub, gap=relative_gap(cg_opt, best_ub), iterations=cnt,
+            incumbent=incumbent, time=time.perf_counter() - start_time,
+        )
+    finally:
+        # 例外で抜けた場合もトレースのファイルを閉じる
+        telemetry.close()
+
+    if return_stats:
+        stats = {
+            "ub_list": ub_list,
+            "best_ub": best_ub,
+            "gap": relative_gap(cg_opt, best_ub),
+            "status": status,
+            "time": time.perf_counter() - start_time,
+            "incumbent": incumbent,
+            "incumbent_sol": incumbent_sol,
+            "incumbent_gap": float("inf") if incumbent is None else relative_gap(incumbent, best_ub),
+            "lp_iterations": lps.iterations[first_solve:],
+            "warm_solves": warm_solves,
+            "trace": trace,
+        }
+        return cg_opt, cg_sol, lps_opt_list, S, cnt, stats
+
+    return cg_opt, cg_sol, lps_opt_list, S, cnt
+
+def resume_column_generation(checkpoint_path, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, **options):
+    """
+    チェックポイントから列生成法を再開し, 同じファイルにチェックポイントを保存しながら続ける
+
+    Parameters:
+    - checkpoint_path: column_generation の checkpoint_path で保存したチェックポイント
+    - vertices, A_plus, A_minus, D_plus, D_minus, lambda_val: 保存したときと同じグラフと lambda
+    - options: column_generation に渡すその他の引数
+
+    Returns:
+    - column_generation と同じ
+    """
+    return column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, None,
+        checkpoint_path=checkpoint_path, resume_from=checkpoint_path, **options
+    )
 
-        # カウントの更新
-        cnt+=1
+def relative_gap(lower_bound, upper_bound):
+    """
+    相対ギャップ (upper_bound - lower_bound) / |upper_bound| (上界がなければ inf)
+    """
+    if upper_bound == float("inf"):
+        return float("inf")
 
-    return cg_opt, cg_sol, lps_opt_list, S, cnt
\ No newline at end of file
+    return max(0.0, upper_bound - lower_bound) / max(abs(upper_bound), 1e-10)
\ No newline at end of file
@@ -1,8 +1,14 @@
+import os
+
 from utils.lps import LPS
-from utils.ap_milp_with_partition import AP_MILPWithPartition
+from utils.parallel_pricing import PartitionPricer
+from utils.cardinality_search import CardinalitySearch
+from utils.telemetry import Telemetry
 
 def column_generation_with_partition(
-        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions):
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions, n_jobs=1, max_columns=None,
+        prune_k=True, lp_bound=False, lp_solver="CBC", milp_solver="CBC", callback=None, trace_path=None,
+        debug_model_dir=None):
     '''
     分割数制約付きの列生成法
 
@@ -13,6 +19,17 @@ def column_generation_with_partition(
     - D_plus: 正の次数
     - D_minus: 負の次数
     - lambda_val: パラメータ
+    - n_jobs: 要素数 k ごとの AP-MILP を解くワーカー数 (1 なら逐次, None なら CPU 数)
+    - max_columns: 1 回の反復でこの数の列が見つかったら残りの k を取り消す (None なら全ての k を解く)
+    - prune_k: True の場合, 被約費用の上界で列が存在しない k を飛ばし, 過去に列が見つかった k から調べる
+    - lp_bound: True の場合, AP-MILP の線形緩和の上界でも k を飛ばす
+    - lp_solver: LPS のソルバー ("CBC" または "HiGHS")
+    - milp_solver: AP-MILP のソルバー ("CBC" または "HiGHS")
+    - callback: 反復ごとの計測値の辞書を受け取る関数 (column_generation の callback とほぼ同じ.
+      pricing_time は全ての k の価格付けの時間で, ks_solved は解いた k の数, max_reduced_cost は被約費用の最大値)
+    - trace_path: callback と同じ辞書を 1 行ずつ書き出す JSONL ファイル (None なら書かない)
+    - debug_model_dir: 反復ごとの AP-MILP を ap_milp_{反復回数}.lp として書き出すディレクトリ
+      (デバッグ用. None なら書かない)
 
     Returns:
     '''
@@ -24,10 +41,15 @@ def column_generation_with_partition(
         D_plus=D_plus, 
         D_minus=D_minus, 
         lambda_val=lambda_val, 
-        init_partitions=init_partitions
+        init_partitions=init_partitions,
+        solver_name=lp_solver
         )
 
-    ap_milp = AP_MILPWithPartition(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val)
+    pricer = PartitionPricer(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, n_jobs=n_jobs, lp_bound=lp_bound, solver_name=milp_solver
+    )
+    search = CardinalitySearch(A_plus, A_minus, D_plus, D_minus, lambda_val)
+    telemetry = Telemetry(callback, trace_path, counters={"wc_time": lambda: lps.weight_engine.elapsed})
 
     cnt = 0
     lps_opt_list = []
@@ -36,45 +58,54 @@ def column_generation_with_partition(
     S = []
     cloumns = {} # 追加する予定の列を保存する辞書   
 
-    while(cnt < 1):
-        # LP(S)を解く, 最適値, 主問題の解, 双対問題の解を得る. 
-        lps_opt, lps_primal_sol, lps_dual_sol = lps.solve_model()
-        lps_opt_list.append(lps_opt)
-
-        # AP-MILPを解く ap_milp_opt, ap_milp_sol
-        ap_milp.add_lps_dual_sol(lps_dual_sol)
-
-        # 2 ~ 頂点総数までの分割制約でAP-MILPを解く
-        for k in range(2, len(vertices) + 1):
-            ap_milp.update_partition_constr(k)
-            ap_milp_opt, ap_milp_sol = ap_milp.solve_model()
-
-            # ap_milp_opt が正なら列に追加する
-            if (ap_milp_opt > 10e-6):
-                frozen_C = frozenset(u for u, x_val in ap_milp_sol["x_u"].items() if x_val == 1.0)
-                cloumns[k] = (frozen_C)
-
-        # 終了条件 cloumns が空なら stop
-        if len(cloumns) == 0:
-            break
-
-        # LPSを更新
-        for k in cloumns.keys():
-            S = lps.update_model(cloumns[k])
-
-        # DEBUG
-        print(f"cnt: {cnt}")
-        print(f"lps_opt: {lps_opt}")
-        print(f"lps_primal_sol: {lps_primal_sol}")
-        print(f"colums: {cloumns}")
-        print(f"S: {S}")
-
-        ap_milp.write_model(f"./data/output_data/ap_milp_{cnt}.lp")
-
-        # cloumnsの初期化
-        cloumns = {}
-
-        cnt += 1
+    try:
+        while(cnt < 1):
+            telemetry.begin(cnt, columns_added=0)
+
+            # LP(S)を解く, 最適値, 主問題の解, 双対問題の解を得る. 
+            with telemetry.timer("master_time"):
+                lps_opt, lps_primal_sol, lps_dual_sol = lps.solve_model()
+            lps_opt_list.append(lps_opt)
+            telemetry.update(
+                lps_opt=lps_opt, lp_iterations=lps.iterations[-1], dual_change=telemetry.dual_change(lps_dual_sol)
+            )
+
+            # 2 ~ 頂点総数までの分割制約でAP-MILPを解く (ap_milp_opt が正の列だけが返る)
+            with telemetry.timer("pricing_time"):
+                if prune_k:
+                    # 過去に列が見つかった k を先に解き, 見つからなければ残りの k も全て解く
+                    focus_ks, rest_ks = search.candidates(lps_dual_sol)
+                    cloumns, ap_milp_opts = pricer.price(lps_dual_sol, focus_ks, max_columns=max_columns)
+                    if len(cloumns) == 0:
+                        cloumns, ap_milp_opts = pricer.price(lps_dual_sol, rest_ks, max_columns=max_columns)
+                    search.record(cloumns)
+                else:
+                    cloumns, ap_milp_opts = pricer.price(
+                        lps_dual_sol, range(2, len(vertices) + 1), max_columns=max_columns
+                    )
+            telemetry.update(
+                pricing="milp", ks_solved=len(ap_milp_opts), max_reduced_cost=max(ap_milp_opts.values(), default=None)
+            )
+
+            # 終了条件 cloumns が空なら stop
+            if len(cloumns) == 0:
+                break
+
+            # LPSを更新
+            with telemetry.timer("build_time"):
+                S = lps.update_model_batch(cloumns.values())
+            telemetry.update(columns_added=len(cloumns), columns=len(lps.w_C_dict))
+
+            if debug_model_dir is not None and pricer.ap_milp is not None:
+                pricer.ap_milp.write_model(os.path.join(debug_model_dir, f"ap_milp_{cnt}.lp"))
+
+            # cloumnsの初期化
+            cloumns = {}
+
+            cnt += 1
+    finally:
+        pricer.close()
+        telemetry.end(iterations=cnt, cg_opt=lps_opt_list[-1] if lps_opt_list else None)
 
     # # TEST 列生成の生成する集合の要素数を固定する
     # # LP(S)を解く, 最適値, 主問題の解, 双対問題の解を得る. 
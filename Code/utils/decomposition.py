@@ -0,0 +1,181 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.signed_graph import as_signed_graph
+from utils.wc import ColumnWeightEngine
+from utils.lps import LPS
+from utils.partition import generate_singleton
+from utils.column_generation import column_generation
+
+# 成分の status をまとめるときの優先順 (前ほど悪い)
+_STATUS_ORDER = ("time_limit", "gap", "optimal")
+
+def _solve_trivial(nodes, weight_engine):
+    """
+    頂点数が 2 以下の連結成分 (孤立点と孤立した辺) の LPS を解析的に解く
+
+    2 頂点 {u, v} の LPS は z_u = z_v = 1 - z_uv となり, 目的関数は z_uv の 1 次式なので
+    {u, v} と {u}, {v} の良い方が最適解になる. 双対変数は {u, v} が良ければ差を等分して
+    y_u + y_v = w_uv, y_u >= w_u, y_v >= w_v を満たすようにとる.
+
+    Returns:
+    - opt, sol, columns, dual_sol: _solve_component と同じ (元のグラフの頂点番号)
+    """
+    singletons = [frozenset({int(u)}) for u in nodes]
+    w = dict(zip(singletons, weight_engine.weights(singletons)))
+    dual_sol = {int(u): w[frozenset({int(u)})] for u in nodes}
+
+    if len(nodes) == 1:
+        return w[singletons[0]], {singletons[0]: 1.0}, singletons, dual_sol
+
+    pair = frozenset(int(u) for u in nodes)
+    w_pair = weight_engine.weight(pair)
+    columns = singletons + [pair]
+    delta = w_pair - sum(w.values())
+    if delta <= 0:
+        return sum(w.values()), {C: 1.0 for C in singletons}, columns, dual_sol
+
+    return w_pair, {pair: 1.0}, columns, {u: y + delta / 2 for u, y in dual_sol.items()}
+
+def _solve_component(nodes, A_plus, A_minus, D_plus, D_minus, lambda_val, cg_options):
+    """
+    連結成分の誘導部分グラフで列生成法を解く (ワーカープロセスでも呼べるように引数は全て値で受け取る)
+
+    Returns:
+    - opt: 連結成分の LPS の最適値
+    - sol: LPS の解 {frozenset(C): 値} (元のグラフの頂点番号)
+    - columns: LPS の列のリスト (元のグラフの頂点番号)
+    - dual_sol: LPS の双対解 {頂点 u: 値} (元のグラフの頂点番号)
+    - status, cnt: column_generation の status と反復回数
+    """
+    vertices = list(range(len(nodes)))
+    lps = LPS(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, [generate_singleton(vertices)],
+        solver_name=cg_options.get("lp_solver", "CBC"),
+    )
+    _, _, _, _, cnt, stats = column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, None, lps=lps, return_stats=True, **cg_options
+    )
+
+    # 安定化の人工変数を外して解き直し, 元の LPS の最適な双対解を得る
+    lps.clear_dual_box()
+    opt, sol, dual_sol = lps.solve_model()
+
+    def lift(C):
+        return frozenset(int(nodes[u]) for u in C)
+
+    return (
+        opt,
+        {lift(C): z_val for C, z_val in sol.items() if z_val > 1e-9},
+        [lift(C) for C in lps.w_C_dict],
+        {int(nodes[u]): y for u, y in dual_sol.items()},
+        stats["status"],
+        cnt,
+    )
+
+def _solve_component_task(args):
+    return _solve_component(*args)
+
+def decomposed_column_generation(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, n_jobs=1, certify=True, tol=1e-6, **cg_options):
+    '''
+    連結成分ごとに列生成法を解き, 解を合わせて全体の LPS の解とする
+
+    連結成分をまたがない列だけを考えると LPS は連結成分ごとのブロックに分かれるので,
+    各成分の最適解と双対解を並べたものはそれらの列の上で最適になる.
+    ただし SMD では w_C = N(C) / |C| (N は辺と次数の項の和) なので, N が負の部分どうしをまとめると
+    平均が薄まって値が大きくなり, 連結成分をまたぐ列が最適解に入ることがある. そこで次の順で最適性を確かめる.
+    1. 全ての成分の列生成法が最適 ("optimal") に終わり, 全ての双対変数が非負なら,
+       成分ごとの部分 C_i からなる列 C の被約費用は
+       sum_i (|C_i| / |C|) (w_{C_i} - y(C_i)) - sum_i (1 - |C_i| / |C|) y(C_i) <= 0 なので, そのまま最適 ("dual").
+    2. そうでなければ, 全ての成分の列を入れた全体の LPS から column_generation を続け,
+       全体の AP-MILP で最適性を確かめる ("pricing"). certify が False ならこの手順は省く.
+       全体の列生成法も最適に終わらなければ最適性は確かめられない (None).
+    頂点数が 2 以下の成分 (孤立点と孤立した辺) は列生成法を使わずに解析的に解く.
+
+    Parameters:
+    - vertices, A_plus, A_minus, D_plus, D_minus, lambda_val: column_generation と同じ
+      (vertices は 0 から始まる頂点番号のリスト)
+    - n_jobs: 連結成分を解くワーカー数 (1 なら逐次, None なら CPU 数)
+    - certify: True の場合, 双対変数で最適性が示せなければ全体の列生成法で確かめる
+    - tol: 双対変数の非負性の許容誤差
+    - cg_options: column_generation に渡すその他の引数 (各成分と全体の列生成法で共通)
+
+    Returns:
+    - cg_opt: 全体の LPS の最適値
+    - cg_sol: 全体の LPS の解 {frozenset(C): 値}
+    - S: 全体の列集合
+    - stats: 分解の情報
+        components: 連結成分の数
+        trivial: 解析的に解いた連結成分の数
+        largest: 最大の連結成分の頂点数
+        component_opt: 成分ごとの最適値の和 (連結成分をまたぐ列を使わない LPS の最適値)
+        certificate: "dual", "pricing", または None (最適性を確かめていない)
+        statuses: 成分ごとの列生成法と全体の列生成法の status (重複を除いて整列したリスト)
+        status: statuses のうち最も悪いもの ("time_limit", "gap", "optimal" の順. 全て最適なら "optimal")
+        repair_iterations: 全体の列生成法の反復回数 (certificate が "pricing" のときのみ 0 より大きい)
+        time: 経過時間 [秒]
+    '''
+    start_time = time.perf_counter()
+    graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+    components = graph.components()
+    weight_engine = ColumnWeightEngine(graph, None, None, None, lambda_val)
+
+    trivial = [nodes for nodes in components if len(nodes) <= 2]
+    tasks = []
+    for nodes in components:
+        if len(nodes) > 2:
+            _, sub_A_plus, sub_A_minus, sub_D_plus, sub_D_minus = graph.subgraph(nodes).unpack()
+            tasks.append((nodes, sub_A_plus, sub_A_minus, sub_D_plus, sub_D_minus, lambda_val, cg_options))
+
+    results = [_solve_trivial(nodes, weight_engine) + ("optimal", 0) for nodes in trivial]
+    if n_jobs == 1 or len(tasks) <= 1:
+        results += [_solve_component(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results += list(executor.map(_solve_component_task, tasks))
+
+    cg_opt = 0.0
+    cg_sol, S, dual_sol = {}, [], {}
+    statuses = set()
+    for opt, sol, columns, duals, status, _ in results:
+        cg_opt += opt
+        cg_sol.update(sol)
+        S += columns
+        dual_sol.update(duals)
+        statuses.add(status)
+
+    component_opt = cg_opt
+    certificate = None
+    repair_iterations = 0
+    if statuses == {"optimal"} and (len(components) == 1 or min(dual_sol.values()) >= -tol):
+        certificate = "dual"
+    elif certify:
+        lps = LPS(
+            vertices, graph.A_plus, graph.A_minus, graph.D_plus, graph.D_minus, lambda_val,
+            [generate_singleton(vertices)], solver_name=cg_options.get("lp_solver", "CBC"),
+        )
+        lps.update_model_batch(S)
+        cg_opt, cg_sol, _, S, repair_iterations, repair_stats = column_generation(
+            vertices, graph.A_plus, graph.A_minus, graph.D_plus, graph.D_minus, lambda_val, None,
+            lps=lps, return_stats=True, **cg_options
+        )
+        S = list(lps.w_C_dict)
+        cg_sol = {C: z_val for C, z_val in cg_sol.items() if z_val > 1e-9}
+        statuses.add(repair_stats["status"])
+        if repair_stats["status"] == "optimal":
+            certificate = "pricing"
+
+    stats = {
+        "components": len(components),
+        "trivial": len(trivial),
+        "largest": len(components[0]) if components else 0,
+        "component_opt": component_opt,
+        "certificate": certificate,
+        "statuses": sorted(statuses),
+        "status": min(statuses, key=_STATUS_ORDER.index) if statuses else "optimal",
+        "repair_iterations": repair_iterations,
+        "time": time.perf_counter() - start_time,
+    }
+
+    return cg_opt, cg_sol, S, stats
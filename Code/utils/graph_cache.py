@@ -0,0 +1,194 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import scipy.sparse as sp
+
+from utils.signed_graph import SignedGraph
+
+CACHE_VERSION = 1
+HEADER_FILE = "header.json"
+ARRAY_NAMES = [
+    "plus_indptr", "plus_indices", "plus_data",
+    "minus_indptr", "minus_indices", "minus_data",
+    "D_plus", "D_minus",
+]
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    ファイル内容の SHA-256 ハッシュ値を計算する
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+
+    return h.hexdigest()
+
+def _closure_values(func):
+    """
+    関数のクロージャの値のうち, 数値・文字列などの値 (repr が内容を表すもの) だけを集める
+    """
+    primitive = (int, float, complex, str, bytes, bool, type(None))
+
+    def is_primitive(value):
+        if isinstance(value, tuple):
+            return all(is_primitive(x) for x in value)
+        return isinstance(value, primitive)
+
+    values = []
+    for cell in func.__closure__ or ():
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            continue
+        if is_primitive(value):
+            values.append(value)
+
+    return values
+
+def loader_key(loader):
+    """
+    キャッシュのキーに使う loader の識別子 (名前とハッシュ値)
+
+    functools.partial は元の関数と固定した引数を, ラムダ式や関数の中で定義した関数は
+    コード, デフォルト引数, クロージャの数値・文字列の値をハッシュ値に含める.
+    それ以外の値をクロージャで受け取る loader は, load_cached_signed_graph に key を与える.
+
+    Parameters:
+    - loader: 元ファイルのパスを受け取り SignedGraph を返す関数
+
+    Returns:
+    - key: ファイル名に使える文字列
+    """
+    parts = []
+    while isinstance(loader, functools.partial):
+        parts.append(repr((loader.args, sorted(loader.keywords.items()))))
+        loader = loader.func
+
+    name = getattr(loader, "__qualname__", None) or getattr(loader, "__name__", None) or type(loader).__name__
+    parts.append(f"{getattr(loader, '__module__', '')}.{name}")
+
+    code = getattr(loader, "__code__", None)
+    if code is not None and ("<lambda>" in name or "<locals>" in name):
+        parts.append(repr((
+            code.co_code, code.co_consts, code.co_names, loader.__defaults__,
+            sorted((loader.__kwdefaults__ or {}).items()), _closure_values(loader),
+        )))
+
+    digest = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+    short_name = re.sub(r"[^0-9A-Za-z_.-]", "_", getattr(loader, "__name__", name))
+
+    return f"{short_name}_{digest}"
+
+def save_signed_graph(graph, cache_path, source_digest=None, loader_name=None):
+    """
+    SignedGraph の CSR 配列を .npy ファイルとヘッダ (JSON) としてディレクトリに保存する
+
+    書き込みは一時ディレクトリで行い, 最後に名前を変更するので途中で中断されても壊れたキャッシュは残らない
+
+    Parameters:
+    - graph: SignedGraph
+    - cache_path: 保存先ディレクトリ
+    - source_digest: 元ファイルのハッシュ値
+    - loader_name: 元ファイルを読み込んだ loader の識別子
+    """
+    arrays = {
+        "plus_indptr": graph.A_plus.indptr,
+        "plus_indices": graph.A_plus.indices,
+        "plus_data": graph.A_plus.data,
+        "minus_indptr": graph.A_minus.indptr,
+        "minus_indices": graph.A_minus.indices,
+        "minus_data": graph.A_minus.data,
+        "D_plus": np.asarray(graph.D_plus),
+        "D_minus": np.asarray(graph.D_minus),
+    }
+    header = {
+        "version": CACHE_VERSION,
+        "n": graph.n,
+        "nnz_plus": int(graph.A_plus.nnz),
+        "nnz_minus": int(graph.A_minus.nnz),
+        "source_digest": source_digest,
+        "loader": loader_name,
+    }
+
+    parent = os.path.dirname(os.path.abspath(cache_path))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".tmp_")
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+        with open(os.path.join(tmp_dir, HEADER_FILE), "w") as f:
+            json.dump(header, f)
+        os.replace(tmp_dir, cache_path)
+    except OSError:
+        # 他のプロセスが先に同じキャッシュを書き込んだ場合など
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not os.path.exists(os.path.join(cache_path, HEADER_FILE)):
+            raise
+
+def load_signed_graph(cache_path, mmap_mode="r"):
+    """
+    save_signed_graph で保存した SignedGraph を読み込む
+
+    Parameters:
+    - cache_path: キャッシュのディレクトリ
+    - mmap_mode: np.load に渡すメモリマップのモード (None なら全体を読み込む)
+
+    Returns:
+    - graph: SignedGraph
+    """
+    with open(os.path.join(cache_path, HEADER_FILE)) as f:
+        header = json.load(f)
+    if header["version"] != CACHE_VERSION:
+        raise ValueError(f"unsupported cache version: {header['version']}")
+
+    arrays = {
+        name: np.load(os.path.join(cache_path, f"{name}.npy"), mmap_mode=mmap_mode)
+        for name in ARRAY_NAMES
+    }
+    n = header["n"]
+    A_plus = sp.csr_array(
+        (arrays["plus_data"], arrays["plus_indices"], arrays["plus_indptr"]), shape=(n, n), copy=False
+    )
+    A_minus = sp.csr_array(
+        (arrays["minus_data"], arrays["minus_indices"], arrays["minus_indptr"]), shape=(n, n), copy=False
+    )
+
+    return SignedGraph(A_plus, A_minus, arrays["D_plus"], arrays["D_minus"])
+
+def load_cached_signed_graph(input_data, loader, cache_dir=None, key=None):
+    """
+    元ファイルの内容のハッシュ値と loader をキーにキャッシュを参照し, SignedGraph を読み込む
+
+    キャッシュがなければ loader で元ファイルを読み込み, キャッシュを作成する.
+    2 回目以降はメモリマップで読み込むので, 元ファイルの解析は行わない.
+
+    Parameters:
+    - input_data: 元ファイルのパス
+    - loader: 元ファイルのパスを受け取り SignedGraph を返す関数
+    - cache_dir: キャッシュを置くディレクトリ (None なら元ファイルと同じ場所の .graph_cache)
+    - key: loader を識別する文字列 (None なら loader_key で loader と固定した引数から作る)
+
+    Returns:
+    - graph: SignedGraph
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(input_data)), ".graph_cache")
+
+    digest = file_digest(input_data)
+    loader_name = loader_key(loader) if key is None else re.sub(r"[^0-9A-Za-z_.-]", "_", key)
+    cache_path = os.path.join(cache_dir, f"{digest[:32]}_{loader_name}")
+
+    if os.path.exists(os.path.join(cache_path, HEADER_FILE)):
+        return load_signed_graph(cache_path)
+
+    graph = loader(input_data)
+    save_signed_graph(graph, cache_path, source_digest=digest, loader_name=loader_name)
+
+    return load_signed_graph(cache_path)
@@ -0,0 +1,156 @@
+import numpy as np
+
+from utils.signed_graph import as_signed_graph
+from utils.pricing import reduced_cost
+
+class LocalSearchPricer:
+    def __init__(self, A_plus, A_minus, D_plus, D_minus, lambda_val,
+                 n_starts=10, max_iter=50, tabu_tenure=5, patience=10, weight_engine=None):
+        """
+        局所探索 (タブー探索) による価格付け問題のヒューリスティック
+
+        コミュニティ C の被約費用 N(C) / |C| - sum_{u in C} y_u を最大化する.
+        ここで N(C) = 2 a+(C) - 2 (1 - lambda) d+(C) - 2 a-(C) + 2 lambda d-(C) は w_C の分子.
+        各頂点の C 内の正・負の隣接頂点数を保持し, 1 頂点の追加・削除による変化を全頂点について一度に評価する.
+
+        Parameters:
+        - A_plus, A_minus, D_plus, D_minus: calc_w_C と同じ (A_plus に SignedGraph も可)
+        - lambda_val: パラメータ
+        - n_starts: 正の辺から選ぶ初期解の数
+        - max_iter: 1 つの初期解あたりの最大移動回数
+        - tabu_tenure: 移動した頂点を再び動かせない反復数
+        - patience: 最良値が更新されないまま続ける反復数
+        - weight_engine: 見つけた列の被約費用を検算する ColumnWeightEngine (None なら検算しない)
+        """
+        self.graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+        self.lambda_val = lambda_val
+        self.n_starts = n_starts
+        self.max_iter = max_iter
+        self.tabu_tenure = tabu_tenure
+        self.patience = patience
+        self.weight_engine = weight_engine
+
+        D_plus = np.asarray(self.graph.D_plus, dtype=np.float64)
+        D_minus = np.asarray(self.graph.D_minus, dtype=np.float64)
+
+        # 頂点単体の N への寄与
+        self.c = -2 * (1 - lambda_val) * D_plus + 2 * lambda_val * D_minus
+
+    def find_columns(self, lps_dual_sol, seeds=(), known_columns=(), max_columns=None, tol=10e-6):
+        """
+        被約費用が正の列を探す
+
+        Parameters:
+        - lps_dual_sol: LPS の双対解 {頂点 u: 値}
+        - seeds: 初期解に加える列のリスト (LPS で正の値をとる列など)
+        - known_columns: 既に LPS にある列 (返さない)
+        - max_columns: 返す列の最大数 (None なら上限なし)
+        - tol: 被約費用の許容誤差
+
+        Returns:
+        - columns: [(被約費用, frozenset(C)), ...] (被約費用の降順)
+        """
+        y = np.array([lps_dual_sol[u] for u in self.graph.vertices], dtype=np.float64)
+
+        found = {}
+        starts = [list(C) for C in seeds if len(C) > 0] + self._edge_starts(y)
+        for start in starts:
+            self._search(start, y, found, tol)
+
+        if self.weight_engine is not None:
+            # 差分更新による丸め誤差を避けるため, 被約費用を計算し直す
+            new_columns = list(found.keys())
+            for C, w_C in zip(new_columns, self.weight_engine.weights(new_columns)):
+                found[C] = reduced_cost(w_C, C, lps_dual_sol)
+
+        known_columns = set(known_columns)
+        columns = sorted(
+            ((rc, C) for C, rc in found.items() if rc > tol and C not in known_columns),
+            key=lambda item: -item[0],
+        )
+        if max_columns is not None:
+            columns = columns[:max_columns]
+
+        return columns
+
+    def _edge_starts(self, y):
+        # 2 頂点のコミュニティとしての被約費用が大きい正の辺を初期解にする
+        E_plus, _ = self.graph.edges()
+        if len(E_plus) == 0:
+            return []
+
+        u, v = E_plus[:, 0], E_plus[:, 1]
+        rc = (self.c[u] + self.c[v] + 4) / 2 - y[u] - y[v]
+        k = min(self.n_starts, len(rc))
+        top = np.argpartition(-rc, k - 1)[:k]
+
+        return [[int(u[i]), int(v[i])] for i in top[np.argsort(-rc[top])]]
+
+    def _search(self, start, y, found, tol):
+        A_plus, A_minus = self.graph.A_plus, self.graph.A_minus
+        n = self.graph.n
+
+        in_C = np.zeros(n, dtype=bool)
+        cnt_plus = np.zeros(n, dtype=np.float64)
+        cnt_minus = np.zeros(n, dtype=np.float64)
+        members = set()
+        state = {"N": 0.0, "P": 0.0}
+
+        def toggle(v):
+            nbrs_plus = A_plus.indices[A_plus.indptr[v]:A_plus.indptr[v + 1]]
+            nbrs_minus = A_minus.indices[A_minus.indptr[v]:A_minus.indptr[v + 1]]
+            gain = 4 * cnt_plus[v] - 4 * cnt_minus[v] + self.c[v]
+            if in_C[v]:
+                in_C[v] = False
+                members.discard(v)
+                cnt_plus[nbrs_plus] -= 1
+                cnt_minus[nbrs_minus] -= 1
+                state["N"] -= gain
+                state["P"] -= y[v]
+            else:
+                in_C[v] = True
+                members.add(v)
+                cnt_plus[nbrs_plus] += 1
+                cnt_minus[nbrs_minus] += 1
+                state["N"] += gain
+                state["P"] += y[v]
+
+        for v in dict.fromkeys(start):
+            toggle(v)
+
+        best_rc = state["N"] / len(members) - state["P"]
+        if best_rc > tol:
+            found.setdefault(frozenset(members), best_rc)
+
+        tabu = np.zeros(n, dtype=np.int64)
+        stall = 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for it in range(1, self.max_iter + 1):
+                k = len(members)
+                gain = 4 * cnt_plus - 4 * cnt_minus + self.c
+                rc_add = (state["N"] + gain) / (k + 1) - (state["P"] + y)
+                rc_remove = (state["N"] - gain) / (k - 1) - (state["P"] - y) if k > 1 else np.full(n, -np.inf)
+
+                # 追加は正の隣接頂点に限り, 削除で空集合にはしない
+                score = np.where(in_C, rc_remove, np.where(cnt_plus > 0, rc_add, -np.inf))
+
+                # タブーの頂点は最良値を更新する場合のみ動かせる
+                score = np.where((tabu >= it) & (score <= best_rc), -np.inf, score)
+
+                v = int(np.argmax(score))
+                if not np.isfinite(score[v]):
+                    break
+
+                toggle(v)
+                tabu[v] = it + self.tabu_tenure
+
+                if score[v] > tol:
+                    found.setdefault(frozenset(members), score[v])
+
+                if score[v] > best_rc + tol:
+                    best_rc = score[v]
+                    stall = 0
+                else:
+                    stall += 1
+                    if stall >= self.patience:
+                        break
@@ -1,4 +1,8 @@
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+
+from utils.signed_graph import SignedGraph
 
 def  read_csv_as_numpy(input_data):
     '''
@@ -7,4 +11,90 @@ def  read_csv_as_numpy(input_data):
     df = pd.read_csv(input_data, header=None)
     np_array = df.to_numpy()
 
-    return np_array
\ No newline at end of file
+    return np_array
+
+def read_csv_as_signed_graph(input_data):
+    '''
+    隣接行列のCSVファイルを読み込み, SignedGraph に変換する関数
+    '''
+    return SignedGraph.from_adjacency(read_csv_as_numpy(input_data))
+
+def read_edge_list(input_data, n=None, sep=",", header=None, comment="#", chunksize=1_000_000):
+    '''
+    符号付き辺リストのファイルをチャンク単位で読み込み, SignedGraph に変換する関数
+
+    各行は u, v, sign[, weight] の形式で, 頂点番号は 0 始まりの整数とする (負の番号や n 以上の番号はエラー).
+    辺の符号は sign の符号で判定する. weight は正の値に限り (SMD は重みを使わない),
+    0 以下の weight があればエラーとする (符号は sign の列で与える).
+    同じ頂点対の辺は符号の和で判定し, 自己ループと符号が 0 の辺は無視する (SignedGraph.from_edges と同じ).
+    圧縮形式は拡張子から判定するので .gz などもそのまま読める.
+    チャンクごとに上三角の CSR 行列にまとめ, 辺数が同程度の行列どうしを順に足し合わせるので,
+    全ての辺の配列を同時に持つことはない.
+
+    Parameters:
+    - input_data: ファイルパス
+    - n: 頂点数 (None の場合は最大の頂点番号 + 1)
+    - sep: 区切り文字
+    - header: ヘッダ行の位置 (pandas.read_csv と同じ, ヘッダなしなら None)
+    - comment: コメント行の先頭文字
+    - chunksize: 一度に読み込む行数
+
+    Returns:
+    - graph: SignedGraph
+    '''
+    # 上三角の部分和の CSR 行列 (下にあるものほど辺数が多い) と, それまでの最大の頂点番号
+    stack = []
+    max_vertex = -1
+
+    reader = pd.read_csv(
+        input_data, sep=sep, header=header, comment=comment,
+        chunksize=chunksize, compression="infer", skipinitialspace=True,
+    )
+    for chunk in reader:
+        values = chunk.to_numpy()
+        if values.shape[1] not in (3, 4):
+            raise ValueError("edge list rows must be (u, v, sign) or (u, v, sign, weight).")
+        if values.shape[1] == 4 and not np.all(values[:, 3].astype(np.float64) > 0):
+            raise ValueError("edge weights must be positive (give the edge sign in the sign column).")
+
+        u = values[:, 0].astype(np.int64)
+        v = values[:, 1].astype(np.int64)
+        sign = np.sign(values[:, 2].astype(np.float64)).astype(np.int32)
+        min_vertex = min(int(u.min(initial=0)), int(v.min(initial=0)))
+        if min_vertex < 0:
+            raise ValueError(f"vertex {min_vertex} is out of range for n = {n}.")
+        max_vertex = max(max_vertex, int(u.max(initial=-1)), int(v.max(initial=-1)))
+        if n is not None and max_vertex >= n:
+            raise ValueError(f"vertex {max_vertex} is out of range for n = {n}.")
+
+        keep = (u != v) & (sign != 0)
+        u, v, sign = u[keep], v[keep], sign[keep]
+        size = max_vertex + 1
+        stack.append(sp.csr_array(
+            (sign, (np.minimum(u, v), np.maximum(u, v))), shape=(size, size)
+        ))
+
+        # 辺数が同程度になったら足し合わせる (足し算の総コストは辺数 x log(チャンク数) 程度)
+        while len(stack) >= 2 and stack[-2].nnz <= 2 * stack[-1].nnz:
+            top = stack.pop()
+            stack[-1] = _add_resized(stack[-1], top)
+
+    if n is None:
+        n = max_vertex + 1
+
+    upper = sp.csr_array((n, n), dtype=np.int32)
+    while stack:
+        upper = _add_resized(upper, stack.pop())
+    upper.resize((n, n))
+
+    return SignedGraph.from_adjacency(upper + upper.T)
+
+def _add_resized(A, B):
+    """
+    正方の疎行列の和 (大きさが違えば大きい方に揃える)
+    """
+    size = max(A.shape[0], B.shape[0])
+    A.resize((size, size))
+    B.resize((size, size))
+
+    return A + B
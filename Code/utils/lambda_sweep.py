@@ -0,0 +1,82 @@
+import time
+
+from utils.lps import LPS
+from utils.ap_milp import AP_MILP
+from utils.column_generation import column_generation
+from utils.primal_heuristics import find_incumbent
+
+def lambda_sweep(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_values, init_partitions,
+        lp_solver="CBC", milp_solver="CBC", heuristic_methods=("rounding", "mip"), heuristic_time=1.0,
+        tol=1e-6, **cg_options):
+    '''
+    複数の lambda について列生成法を解き, lambda ごとの分割の経路を求める
+
+    w_C は lambda の 1 次式なので, ある lambda で生成した列は他の lambda でもそのまま使える.
+    LPS と AP-MILP を全ての lambda で使い回し, lambda を変えるときは目的関数の係数だけを書き換える.
+    LPS は列と直前の基底を引き継ぎ, AP-MILP は前回の最適解を初期解にして解き始める.
+    lambda は昇順に解く (隣り合う lambda の解は近いので, 引き継いだ列と基底がよく効く).
+
+    Parameters:
+    - vertices, A_plus, A_minus, D_plus, D_minus, init_partitions: column_generation と同じ
+    - lambda_values: lambda の値のリスト
+    - lp_solver, milp_solver: column_generation と同じ
+    - heuristic_methods: LPS の解が分数のときに分割を求める手法 (find_incumbent の methods)
+    - heuristic_time: 分割を求める MIP の制限時間 [秒]
+    - tol: LPS の解が整数かを判定する許容誤差
+    - cg_options: column_generation に渡すその他の引数
+
+    Returns:
+    - path: lambda の昇順の辞書のリスト
+        lambda_val: lambda の値
+        cg_opt: 列生成法の最適値 (LP 緩和の上界)
+        cg_sol: 列生成法の解 {frozenset(C): 値}
+        partition: 分割 (frozenset のリスト). LPS の解が整数ならその列, そうでなければ LPS の列から求めた分割
+        partition_value: 分割の目的関数値
+        integral: LPS の解が整数か
+        iterations: 列生成法の反復回数
+        columns: 終了時の LPS の列の数
+        time: 経過時間 [秒]
+    '''
+    lambda_values = sorted(lambda_values)
+
+    lps = LPS(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_values[0], init_partitions, solver_name=lp_solver
+    )
+    ap_milp = AP_MILP(vertices, A_plus, A_minus, D_plus, D_minus, lambda_values[0], solver_name=milp_solver)
+
+    path = []
+    for lambda_val in lambda_values:
+        start_time = time.perf_counter()
+
+        # 列と基底を引き継いで目的関数の係数だけを更新する
+        lps.set_lambda(lambda_val)
+        ap_milp.set_lambda(lambda_val)
+
+        cg_opt, cg_sol, _, S, cnt = column_generation(
+            vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions,
+            lps=lps, ap_milp=ap_milp, **cg_options
+        )
+
+        integral = all(z_val < tol or z_val > 1 - tol for z_val in cg_sol.values())
+        if integral:
+            partition = [C for C, z_val in cg_sol.items() if z_val > 0.5]
+            partition_value = sum(lps.w_C_dict[C] for C in partition)
+        else:
+            partition_value, partition = find_incumbent(
+                lps, cg_sol, methods=heuristic_methods, max_seconds=heuristic_time
+            )
+
+        path.append({
+            "lambda_val": lambda_val,
+            "cg_opt": cg_opt,
+            "cg_sol": cg_sol,
+            "partition": partition,
+            "partition_value": partition_value,
+            "integral": integral,
+            "iterations": cnt,
+            "columns": len(S),
+            "time": time.perf_counter() - start_time,
+        })
+
+    return path
@@ -1,16 +1,31 @@
-from mip import Model, xsum, maximize, CONTINUOUS, Column, OptimizationStatus
+import numpy as np
+from mip import xsum, maximize, CONTINUOUS, INF, Column, OptimizationStatus, LP_Method
 
-from utils.wc import calc_w_C
+from utils.wc import ColumnWeightEngine
+from utils.solver import (
+    create_model, is_highs, highs_internals_available, simplex_iterations, get_basis, set_basis, reset_basis
+)
+from utils.milp_builder import incidence_matrix, add_constrs_from_matrix
 
 class LPS:
-    def __init__(self, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions):
+    def __init__(self, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, init_partitions, solver_name="CBC",
+                 warm_start=True):
         """
         LP(S)の初期化
 
+        warm_start が True の場合, 2 回目以降の求解は直前の最適基底から単体法を再開する.
+        CBC は Cbc_resolve (python-mip の optimize(relax=True)) で解き直す
+        (通常の optimize はモデルをリセットして最初から解く).
+        HiGHS は直前の最適基底 (restore_basis で与えた基底があればそれ) を設定し直してから解き,
+        列の追加の後は主単体法, 上界を下げた後は双対単体法で解く.
+        HiGHS が基底を受け付けなかった場合はスラック基底から解く (is_warm で確かめられる).
+
         Parameters:
         - S: 現在の列集合 (frozenset のリスト)
         - w_C_dict: 各列の重みを格納する辞書 {frozenset(C): w_C}
         - vertices: 頂点のリスト
+        - solver_name: LP ソルバー ("CBC" または "HiGHS")
+        - warm_start: 直前の基底から解き直すか
         """
         self.vertices = vertices
         self.A_plus = A_plus
@@ -20,8 +35,11 @@ class LPS:
         self.lambda_val = lambda_val
         self.init_partitions = init_partitions
 
-        self.model = Model(solver_name="CBC")
-        self.model.solver.set_verbose(False)
+        # 列の重みを計算するエンジン (集計値を列ごとに保持する)
+        self.weight_engine = ColumnWeightEngine(A_plus, A_minus, D_plus, D_minus, lambda_val)
+
+        self.model = create_model(solver_name)
+        self.warm_start = warm_start
         self.vertices = vertices
         self.w_C_dict = {}
         self.S = []
@@ -30,27 +48,49 @@ class LPS:
         # 変数
         self.z_C = {C: self.model.add_var(var_type=CONTINUOUS, lb=0, name=f"z_{C}") for C in self.S}
 
-        # 制約
-        self.constraints = {}
-        for u in vertices:
-            self.constraints[u] = self.model.add_constr(
-                xsum(self.z_C[C] for C in self.S if u in C) == 1
-            )
+        # 制約 (頂点と列の接続行列からまとめて生成する)
+        index = {u: i for i, u in enumerate(vertices)}
+        B = incidence_matrix(self.S, index, len(vertices)).tocsr()
+        constrs = add_constrs_from_matrix(
+            self.model, [self.z_C[C] for C in self.S], B, np.ones(len(vertices)), sense="="
+        )
+        self.constraints = dict(zip(vertices, constrs))
 
         # 目的関数
         self.model.objective = maximize(xsum(self.w_C_dict[C] * self.z_C[C] for C in self.S))
 
+        # 双対変数の安定化に使う人工変数 {頂点 u: (y+_u, y-_u)}
+        self.stab_vars = {}
+
+        # 列の管理: 被約費用が負のまま使われない反復数, モデルから外した列の重み
+        # 初期の列は LPS の実行可能性のために外さない
+        self.age = {C: 0 for C in self.S}
+        self.column_cache = {}
+        self.protected = set(self.S)
+
+        # 求解の記録: 各回の単体法の反復回数 (CBC では None), 直前の求解が前回の基底から始まったか
+        self.iterations = []
+        self.warm = False
+
+        # 次の求解で使う基底: 直前の最適基底と, restore_basis で設定済みか
+        self.last_basis = None
+        self.basis_restored = False
+
     def init_S_w_C_dict(self):
         """
         self.S と self.w_C_dict を初期化
         """
+        new_S = []
         for partition in self.init_partitions:
             for C in partition:
                 frozen_C = frozenset(C)
                 if frozen_C not in self.w_C_dict:
-                    self.w_C_dict[frozen_C] = calc_w_C(
-                        C, self.A_plus, self.A_minus, self.D_plus, self.D_minus, self.lambda_val
-                        )
+                    self.w_C_dict[frozen_C] = None
+                    new_S.append(frozen_C)
+
+        # 初期の列の重みはまとめて計算する
+        for C, w_C in zip(new_S, self.weight_engine.weights(new_S)):
+            self.w_C_dict[C] = w_C
         self.S = list(self.w_C_dict.keys())
 
     def solve_model(self):
@@ -61,7 +101,29 @@ class LPS:
         - lps_primal_sol: 主問題の解 {frozenset(C): 値}
         - lps_dual_sol: 双対問題の解 {頂点 u: 値}
         """
-        self.model.optimize()
+        if not highs_internals_available(self.model):
+            # CBC (と基底を扱えない HiGHS) では再開したかを確かめられない
+            self.warm = None
+        elif self.warm_start:
+            # 基底を設定し直し, HiGHS が受け付けたかで再開を判定する (受け付けなければスラック基底から解く)
+            if not self.basis_restored:
+                self.restore_basis(self.last_basis)
+            self.warm = self.basis_restored
+            if not self.warm:
+                reset_basis(self.model)
+        else:
+            reset_basis(self.model)
+            self.warm = False
+
+        if self.warm_start and not is_highs(self.model):
+            self.status = self.model.optimize(relax=True)
+        else:
+            self.status = self.model.optimize()
+        self.iterations.append(simplex_iterations(self.model))
+
+        self.basis_restored = False
+        if self.warm_start:
+            self.last_basis = self.save_basis()
 
         # 最適値
         self.lps_opt = self.model.objective_value
@@ -74,22 +136,110 @@ class LPS:
 
         return self.lps_opt, self.lps_primal_sol, self.lps_dual_sol
 
+    def is_warm(self):
+        """
+        直前の求解が前回の基底から再開したか
+
+        HiGHS は求解の前に設定した基底をソルバーが受け付けたかを返す.
+        CBC (と python-mip の非公開の属性を使えない HiGHS) では確かめられないので None を返す
+        """
+        return self.warm
+
+    def save_basis(self):
+        """
+        現在の基底を保存する (HiGHS のみ, CBC では None)
+
+        列の追加や削除の後でも戻せるように, 変数ごとの状態として保持する
+
+        Returns:
+        - basis: ({変数のキー: 状態}, 行の状態のリスト)
+        """
+        basis = get_basis(self.model)
+        if basis is None:
+            return None
+
+        col_status, row_status = basis
+        return {key: col_status[var.idx] for key, var in self._variables()}, row_status
+
+    def restore_basis(self, basis):
+        """
+        save_basis で保存した基底を次の求解の初期基底にする
+
+        保存した後に追加した列は下限 (値 0) の非基底とする
+
+        Returns:
+        - ok: 設定できたら True (CBC, basis が None, 基底として不正な場合は False)
+        """
+        self.basis_restored = False
+        if basis is None:
+            return False
+
+        saved, row_status = basis
+        variables = sorted(self._variables(), key=lambda item: item[1].idx)
+        col_status = [saved.get(key, 0) for key, _ in variables]
+        if len(col_status) != self.model.num_cols:
+            return False
+
+        self.basis_restored = set_basis(self.model, (col_status, row_status))
+        return self.basis_restored
+
+    def _variables(self):
+        """
+        (変数のキー, 変数) の組 (キーは列 C または人工変数の ("+", u), ("-", u))
+        """
+        items = list(self.z_C.items())
+        for u, (y_plus, y_minus) in self.stab_vars.items():
+            items += [(("+", u), y_plus), (("-", u), y_minus)]
+
+        return items
+
+    def _set_lp_method(self, lp_method):
+        # 次の求解で使う単体法 (HiGHS の再開のみで使う)
+        if self.warm_start:
+            self.model.lp_method = lp_method
+
+    def set_lambda(self, lambda_val):
+        """
+        パラメータ lambda を変更し, 全ての列 (キャッシュの列を含む) の重みと目的関数の係数を更新する
+
+        w_C は lambda の 1 次式なので, 保持している集計値から計算し直すだけでよい.
+        制約は変わらないので, 直前の基底は主実行可能のまま再開できる.
+        """
+        self.lambda_val = lambda_val
+        self.weight_engine.set_lambda(lambda_val)
+
+        self.w_C_dict = dict(zip(self.S, self.weight_engine.weights(self.S)))
+        for C in self.S:
+            self.z_C[C].obj = self.w_C_dict[C]
+
+        cached = list(self.column_cache)
+        self.column_cache = dict(zip(cached, self.weight_engine.weights(cached)))
+
+        self._set_lp_method(LP_Method.PRIMAL)
+
     def update_model(self, frozen_C):
         """
         新しい列を追加してモデルを更新
         Parameters:
-        - new_S: 新しい列集合 (frozenset のリスト)
-        - new_w_C_dict: 新しい列に対応する重み辞書
+        - frozen_C: 新しい列 (frozenset)
         """
-        new_w_C_dict = {}
-        if frozen_C not in self.w_C_dict:
-            new_w_C_dict[frozen_C] = calc_w_C(
-                list(frozen_C), self.A_plus, self.A_minus, self.D_plus, self.D_minus, self.lambda_val
-            )
-        new_S = list(new_w_C_dict.keys())
+        return self.update_model_batch([frozen_C])
+
+    def update_model_batch(self, columns):
+        """
+        複数の新しい列をまとめて追加してモデルを更新
+        Parameters:
+        - columns: 新しい列のリスト (frozenset のリスト)
+        """
+        new_S = list(dict.fromkeys(C for C in map(frozenset, columns) if C not in self.w_C_dict))
+        new_w_C_dict = dict(zip(new_S, self.weight_engine.weights(new_S)))
 
-        # S, w_C_dictの更新
+        # S, w_C_dictの更新 (キャッシュから戻した列は巡回を防ぐために以降は外さない)
         self.w_C_dict.update(new_w_C_dict)
+        for C in new_S:
+            if self.column_cache.pop(C, None) is not None:
+                self.protected.add(C)
+            self.age[C] = 0
         # self.S += new_S
         self.S = list(self.w_C_dict.keys())
 
@@ -110,8 +260,144 @@ class LPS:
             )
             self.z_C[C] = z_new
 
+        # 新しい列は値 0 の非基底なので, 直前の基底は主実行可能のまま
+        self._set_lp_method(LP_Method.PRIMAL)
+
         return self.S
-    
+
+    def age_columns(self, max_age, threshold, tol=10e-6, cache_size=None):
+        """
+        使われない列をモデルから外してキャッシュに移す
+
+        直前の解で値が 0 かつ被約費用が -threshold 未満の反復が max_age 回続いた列を外す.
+        外した列はキャッシュに残し, reprice_cached_columns で被約費用が正になれば戻す.
+        初期の列とキャッシュから戻した列は外さない.
+
+        Parameters:
+        - max_age: 列を外すまでの反復数
+        - threshold: 被約費用がこの値より小さい (-threshold 未満) ときに使われないとみなす
+        - tol: 列の値が 0 とみなす許容誤差
+        - cache_size: キャッシュに残す列の最大数 (None なら上限なし, 超えたら古い列から捨てる)
+
+        Returns:
+        - removed: 外した列のリスト
+        """
+        removed = []
+        for C in self.S:
+            z = self.z_C[C]
+            if z.x <= tol and z.rc < -threshold:
+                self.age[C] += 1
+            else:
+                self.age[C] = 0
+
+            if self.age[C] >= max_age and C not in self.protected:
+                removed.append(C)
+
+        if not removed:
+            return removed
+
+        # 外す列は被約費用が負の非基底なので, 残りの列の基底はそのまま使える
+        basis = self.save_basis()
+        self.model.remove([self.z_C[C] for C in removed])
+        for C in removed:
+            self.column_cache[C] = self.w_C_dict.pop(C)
+            del self.z_C[C]
+            del self.age[C]
+        self.S = list(self.w_C_dict.keys())
+        self.restore_basis(basis)
+        self._set_lp_method(LP_Method.PRIMAL)
+
+        if cache_size is not None:
+            while len(self.column_cache) > cache_size:
+                del self.column_cache[next(iter(self.column_cache))]
+
+        return removed
+
+    def reprice_cached_columns(self, lps_dual_sol, tol=10e-6, max_columns=None):
+        """
+        キャッシュの列のうち被約費用が正のものを返す (update_model_batch で追加するとキャッシュから戻る)
+
+        Parameters:
+        - lps_dual_sol: 双対解 {頂点 u: 値}
+        - tol: 被約費用の許容誤差
+        - max_columns: 戻す列の最大数 (None なら上限なし, 被約費用の大きい順)
+
+        Returns:
+        - columns: 被約費用が正の列のリスト
+        """
+        improving = []
+        for C, w_C in self.column_cache.items():
+            rc = w_C - sum(lps_dual_sol[u] for u in C)
+            if rc > tol:
+                improving.append((rc, C))
+
+        improving.sort(key=lambda item: -item[0])
+
+        return [C for _, C in improving[:max_columns]]
+
+    def restrict_columns(self, is_allowed):
+        """
+        is_allowed(C) が False の列の上界を 0 にして使えなくする (分枝価格法のノードの切り替え)
+
+        列はモデルに残すので, 他のノードで再び使える.
+
+        Parameters:
+        - is_allowed: 列 C (frozenset) を受け取り, 使ってよければ True を返す関数
+        """
+        for C in self.S:
+            self.z_C[C].ub = INF if is_allowed(C) else 0
+
+        # 上界を下げると主実行可能性は崩れるが, 双対実行可能性は保たれる
+        self._set_lp_method(LP_Method.DUAL)
+
+    def set_dual_box(self, center, delta, epsilon):
+        """
+        双対変数を center +- delta の箱に誘導する人工変数を設定する (du Merle の安定化)
+
+        各頂点 u の制約に y+_u (係数 1, 目的関数の係数 center_u - delta) と
+        y-_u (係数 -1, 目的関数の係数 -(center_u + delta)) を加え, 上界を epsilon とする.
+        双対側では, 箱の外に出た分に epsilon の重みでペナルティが課される.
+
+        Parameters:
+        - center: 安定化の中心 {頂点 u: 値}
+        - delta: 箱の半径
+        - epsilon: 人工変数の上界 (箱の外のペナルティの傾き)
+        """
+        for u in self.vertices:
+            if u not in self.stab_vars:
+                self.stab_vars[u] = (
+                    self.model.add_var(
+                        var_type=CONTINUOUS, lb=0, column=Column([self.constraints[u]], [1]), name=f"y_plus_{u}"
+                    ),
+                    self.model.add_var(
+                        var_type=CONTINUOUS, lb=0, column=Column([self.constraints[u]], [-1]), name=f"y_minus_{u}"
+                    ),
+                )
+
+            y_plus, y_minus = self.stab_vars[u]
+            y_plus.obj = center[u] - delta
+            y_minus.obj = -(center[u] + delta)
+            y_plus.ub = epsilon
+            y_minus.ub = epsilon
+
+        self._set_lp_method(LP_Method.AUTO)
+
+    def clear_dual_box(self):
+        """
+        安定化の人工変数を無効にする (上界を 0 にして元の LP(S) に戻す)
+        """
+        for y_plus, y_minus in self.stab_vars.values():
+            y_plus.ub = 0
+            y_minus.ub = 0
+
+        self._set_lp_method(LP_Method.DUAL)
+
+    def dual_box_violation(self):
+        """
+        直前の解での人工変数の値の合計 (0 なら元の LP(S) の実行可能解)
+        """
+        return sum(y_plus.x + y_minus.x for y_plus, y_minus in self.stab_vars.values())
+
     def debag_print_model(self):    
         print("\n=== LPS ===")
 
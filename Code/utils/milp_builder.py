@@ -0,0 +1,169 @@
+import mip
+import numpy as np
+import scipy.sparse as sp
+from mip import LinExpr
+
+from utils.solver import TESTED_MIP_VERSIONS, is_highs, highs_internals_available
+
+def stack_rows(blocks, num_vars):
+    """
+    制約のブロックを 1 つの CSR 行列と右辺にまとめる
+
+    Parameters:
+    - blocks: [(cols, coeffs, rhs), ...] のリスト
+        cols: 各行で使う変数の番号 (行数 x 非ゼロ数 の配列)
+        coeffs: 各非ゼロ要素の係数 (cols と同じ形の配列, または長さが非ゼロ数の配列)
+        rhs: 各行の右辺 (長さが行数の配列, またはスカラー)
+    - num_vars: 変数の数
+
+    Returns:
+    - A: 制約行列 (CSR 形式)
+    - b: 右辺の配列
+    """
+    matrices, rhs_list = [], []
+    for cols, coeffs, rhs in blocks:
+        cols = np.asarray(cols, dtype=np.int64)
+        num_rows, nnz_per_row = cols.shape
+        data = np.broadcast_to(np.asarray(coeffs, dtype=np.float64), cols.shape)
+        indptr = np.arange(0, num_rows * nnz_per_row + 1, nnz_per_row)
+        matrices.append(sp.csr_array((data.ravel(), cols.ravel(), indptr), shape=(num_rows, num_vars)))
+        rhs_list.append(np.broadcast_to(np.asarray(rhs, dtype=np.float64), (num_rows,)))
+
+    A = sp.vstack(matrices, format="csr") if matrices else sp.csr_array((0, num_vars))
+    b = np.concatenate(rhs_list) if rhs_list else np.empty(0)
+
+    return A, b
+
+def incidence_matrix(columns, index, num_rows):
+    """
+    列 (頂点の集合) の接続行列を作る
+
+    Parameters:
+    - columns: 頂点の集合のリスト
+    - index: {頂点 u: 行番号}
+    - num_rows: 行数
+
+    Returns:
+    - B: B[index[u], j] = 1 (u in columns[j]) の CSC 行列
+    """
+    indptr = np.zeros(len(columns) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(C) for C in columns])
+    indices = np.fromiter((index[u] for C in columns for u in C), dtype=np.int64, count=indptr[-1])
+
+    return sp.csc_array((np.ones(len(indices)), indices, indptr), shape=(num_rows, len(columns)))
+
+def _add_rows_highs(model, indptr, indices, data, b, sense):
+    """
+    HiGHS の Highs_addRows で CSR 行列の行をまとめて追加する
+    """
+    import mip.highs
+
+    ffi = mip.highs.ffi
+    solver = model.solver
+    m = len(b)
+    # 等式は上下限を同じ値にした範囲制約として追加する
+    lower = np.ascontiguousarray(np.full(m, -mip.INF) if sense == "<" else b, dtype=np.float64)
+    upper = np.ascontiguousarray(np.full(m, mip.INF) if sense == ">" else b, dtype=np.float64)
+    int_type = np.int32 if ffi.sizeof("HighsInt") == 4 else np.int64
+    starts = np.ascontiguousarray(indptr[:-1], dtype=int_type)
+    index = np.ascontiguousarray(indices, dtype=int_type)
+    value = np.ascontiguousarray(data, dtype=np.float64)
+
+    # python-mip が溜めている変数と制約を先に HiGHS に渡してから, 追加した行数を python-mip 側にも反映する
+    solver._flush()
+    mip.highs.check(solver._lib.Highs_addRows(
+        solver._model, m,
+        ffi.cast("double *", ffi.from_buffer(lower)), ffi.cast("double *", ffi.from_buffer(upper)),
+        len(value),
+        ffi.cast("HighsInt *", ffi.from_buffer(starts)), ffi.cast("HighsInt *", ffi.from_buffer(index)),
+        ffi.cast("double *", ffi.from_buffer(value)),
+    ))
+    solver._row_committed += m
+
+def _add_rows_cbc(model, indptr, indices, data, b, sense):
+    """
+    CBC の Cbc_addRow を numpy の配列へのポインタで呼び, LinExpr を作らずに行を追加する
+
+    CBC の C インターフェースには行をまとめて追加する関数がないので, 呼び出しは行ごとに行う
+    """
+    from mip.cbc import cbclib, ffi
+
+    m = len(b)
+    index = np.ascontiguousarray(indices, dtype=np.int32)
+    value = np.ascontiguousarray(data, dtype=np.float64)
+    index_ptr = ffi.cast("int *", ffi.from_buffer(index))
+    value_ptr = ffi.cast("double *", ffi.from_buffer(value))
+    # 空の行は python-mip と同じく係数 0 の項を 1 つ持たせる
+    dummy_index, dummy_value = ffi.new("int[1]", [0]), ffi.new("double[1]", [0.0])
+
+    sense_char = sense.encode("utf-8")
+    starts = indptr.tolist()
+    rhs = b.tolist()
+    first = model.solver.num_rows()
+    cbc_model = model.solver._model
+    for i in range(m):
+        start, nnz = starts[i], starts[i + 1] - starts[i]
+        name = f"constr({first + i})".encode("utf-8")
+        if nnz == 0:
+            cbclib.Cbc_addRow(cbc_model, name, 1, dummy_index, dummy_value, sense_char, rhs[i])
+        else:
+            cbclib.Cbc_addRow(cbc_model, name, nnz, index_ptr + start, value_ptr + start, sense_char, rhs[i])
+
+def _bulk_rows_available(model):
+    """
+    python-mip を介さずにソルバーへ直接行を追加できるか
+
+    直接追加した行は python-mip の制約のリストを作り直して反映するので, まだ制約がないモデルに限る.
+    非公開の属性を使うので, 動作を確かめた python-mip の版でだけ使う
+    """
+    if model.num_rows != 0 or not mip.__version__.startswith(TESTED_MIP_VERSIONS):
+        return False
+    if is_highs(model):
+        return highs_internals_available(model) and hasattr(model.solver, "_row_committed")
+
+    return model.solver_name.upper() == "CBC" and hasattr(model.solver, "_model")
+
+def add_constrs_from_matrix(model, variables, A, b, sense="<"):
+    """
+    CSR 行列の各行を制約 A[i] x (sense) b[i] としてモデルに追加する
+
+    まだ制約がないモデルでは, HiGHS は Highs_addRows で全ての行を 1 回で, CBC は Cbc_addRow を
+    numpy の配列へのポインタで呼んで追加する (LinExpr も python-mip の制約も行ごとには作らない).
+    それ以外の場合は LinExpr を直接作って 1 行ずつ追加する.
+
+    Parameters:
+    - model: python-mip のモデル
+    - variables: 列番号に対応する変数のリスト
+    - A: 制約行列 (CSR 形式)
+    - b: 右辺の配列
+    - sense: "<", ">", "=" のいずれか
+
+    Returns:
+    - constrs: 追加した制約のリスト
+    """
+    A = sp.csr_array(A)
+    b = np.asarray(b, dtype=np.float64)
+
+    if _bulk_rows_available(model):
+        # 列番号を python-mip の変数の番号 (idx) に直す
+        var_idx = np.fromiter((var.idx for var in variables), dtype=np.int64, count=len(variables))
+        add_rows = _add_rows_highs if is_highs(model) else _add_rows_cbc
+        if not A.has_canonical_format:
+            # 同じ行の同じ変数の係数を合わせる (LinExpr と同じ. HiGHS は重複した要素を受け付けない)
+            A = A.copy()
+            A.sum_duplicates()
+        add_rows(model, A.indptr, var_idx[A.indices], A.data, b, sense)
+        model.constrs.update_constrs(model.solver.num_rows())
+
+        return list(model.constrs)
+
+    indptr, indices, data = A.indptr, A.indices.tolist(), A.data.tolist()
+    b = b.tolist()
+
+    constrs = []
+    for i in range(A.shape[0]):
+        start, end = indptr[i], indptr[i + 1]
+        expr = LinExpr([variables[j] for j in indices[start:end]], data[start:end], -b[i], sense)
+        constrs.append(model.add_constr(expr))
+
+    return constrs
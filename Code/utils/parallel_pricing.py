@@ -0,0 +1,121 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from utils.ap_milp_with_partition import AP_MILPWithPartition
+
+# ワーカープロセスごとに 1 つだけ構築する AP-MILP
+_worker_ap_milp = None
+
+def _init_worker(vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, formulation, solver_name):
+    global _worker_ap_milp
+    _worker_ap_milp = AP_MILPWithPartition(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, formulation=formulation, solver_name=solver_name
+    )
+
+def _solve_k(ap_milp, k, lps_dual_sol, lp_bound=False, tol=10e-6):
+    ap_milp.add_lps_dual_sol(lps_dual_sol)
+    ap_milp.update_partition_constr(k)
+
+    # 線形緩和の上界で列が存在しないと分かれば MILP は解かない
+    if lp_bound:
+        relax_opt = ap_milp.solve_relaxation()
+        if relax_opt <= tol:
+            return k, relax_opt, frozenset()
+
+    ap_milp_opt, ap_milp_sol = ap_milp.solve_model()
+    frozen_C = frozenset(u for u, x_val in ap_milp_sol["x_u"].items() if x_val > 0.5)
+
+    return k, ap_milp_opt, frozen_C
+
+def _solve_k_in_worker(k, lps_dual_sol, lp_bound, tol):
+    return _solve_k(_worker_ap_milp, k, lps_dual_sol, lp_bound, tol)
+
+class PartitionPricer:
+    def __init__(self, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, n_jobs=1, formulation="compact",
+                 lp_bound=False, solver_name="CBC"):
+        """
+        要素数 k ごとの AP-MILP を並列に解く価格付けの実行器
+
+        双対変数が与えられれば要素数 k ごとの部分問題は独立なので, k をプロセスプールに分散する.
+        各ワーカーは AP-MILP を 1 度だけ構築し, 以降は双対変数と k の更新だけで使い回す.
+
+        Parameters:
+        - vertices, A_plus, A_minus, D_plus, D_minus, lambda_val: AP_MILPWithPartition と同じ
+        - n_jobs: ワーカー数 (1 の場合はプロセスを使わずに逐次で解く, None の場合は CPU 数)
+        - formulation: AP_MILPWithPartition の定式化
+        - lp_bound: True の場合, 先に線形緩和を解き, その上界が許容誤差以下の k は MILP を解かずに飛ばす
+        - solver_name: MILP ソルバー ("CBC" または "HiGHS")
+        """
+        self.n_jobs = n_jobs
+        self.lp_bound = lp_bound
+        self.ap_milp = None
+        self.executor = None
+
+        args = (vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, formulation, solver_name)
+        if n_jobs == 1:
+            self.ap_milp = AP_MILPWithPartition(*args[:-2], formulation=formulation, solver_name=solver_name)
+        else:
+            self.executor = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=args)
+
+    def price(self, lps_dual_sol, ks, max_columns=None, tol=10e-6):
+        """
+        各 k について AP-MILP を解き, 被約費用が正の列を集める
+
+        Parameters:
+        - lps_dual_sol: LPS の双対解 {頂点 u: 値}
+        - ks: 調べる要素数のリスト
+        - max_columns: この数の列が見つかった時点で, まだ始まっていない k を取り消す (None なら全て解く)
+        - tol: 被約費用の許容誤差
+
+        Returns:
+        - columns: {k: frozenset(C)}
+        - ap_milp_opts: {k: 最適値} (取り消した k は含まない, 線形緩和で飛ばした k は緩和の最適値)
+        """
+        columns = {}
+        ap_milp_opts = {}
+
+        def enough():
+            return max_columns is not None and len(columns) >= max_columns
+
+        if self.executor is None:
+            for k in ks:
+                k, ap_milp_opt, frozen_C = _solve_k(self.ap_milp, k, lps_dual_sol, self.lp_bound, tol)
+                ap_milp_opts[k] = ap_milp_opt
+                if ap_milp_opt > tol:
+                    columns[k] = frozen_C
+                if enough():
+                    break
+
+            return dict(sorted(columns.items())), ap_milp_opts
+
+        pending = {self.executor.submit(_solve_k_in_worker, k, lps_dual_sol, self.lp_bound, tol) for k in ks}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    continue
+                k, ap_milp_opt, frozen_C = future.result()
+                ap_milp_opts[k] = ap_milp_opt
+                if ap_milp_opt > tol:
+                    columns[k] = frozen_C
+
+            if enough():
+                # 実行中のものは止められないので, 開始前のものだけ取り消して結果は待たない
+                for future in pending:
+                    future.cancel()
+                break
+
+        return dict(sorted(columns.items())), ap_milp_opts
+
+    def close(self):
+        """
+        プロセスプールを終了する
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,188 @@
+import numpy as np
+
+from utils.signed_graph import as_signed_graph
+from utils.wc import ColumnWeightEngine
+from utils.ap_milp import AP_MILP
+from utils.pricing import reduced_cost, collect_improving_columns
+
+def reduce_pricing_graph(A_plus, A_minus=None, D_plus=None, D_minus=None):
+    """
+    価格付けの前処理の規則で, AP-MILP から外す頂点と同じ値に揃える頂点の組を求める
+
+    - 孤立点 (辺がない頂点) と負の辺しかない頂点は外す (正の辺がないので, 入れても w_C の正の項は増えない)
+    - 正の辺 1 本だけでつながる葉 (ペンダント) は外す (隣接頂点が列に入ったときにだけ戻す)
+    - 符号付きの隣接頂点の集合が同じ頂点 (双子) は組にする (双対変数が等しい反復では x_u = x_v とする)
+      正の辺で隣接する双子は, 自分を含めた正の隣接頂点の集合で比べる
+
+    Parameters:
+    - A_plus, A_minus, D_plus, D_minus: calc_w_C と同じ (A_plus に SignedGraph も可)
+
+    Returns:
+    - kept: AP-MILP に残す頂点の配列
+    - removed: {頂点: 外した理由 ("isolated", "negative_only", "pendant")}
+    - anchors: {ペンダント: 正の辺でつながる頂点}
+    - twins: 双子の組 (u, v) のリスト (いずれも kept に含まれる)
+    """
+    graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+    A_plus, A_minus = graph.A_plus, graph.A_minus
+    deg_plus = np.diff(A_plus.indptr)
+    deg_minus = np.diff(A_minus.indptr)
+
+    removed, anchors = {}, {}
+    for v in range(graph.n):
+        if deg_plus[v] == 0:
+            removed[v] = "isolated" if deg_minus[v] == 0 else "negative_only"
+        elif deg_plus[v] == 1 and deg_minus[v] == 0:
+            u = int(A_plus.indices[A_plus.indptr[v]])
+            # 2 頂点だけの成分では片方を残す
+            if not (u in removed or (deg_plus[u] == 1 and deg_minus[u] == 0 and u > v)):
+                removed[v] = "pendant"
+                anchors[v] = u
+
+    kept = np.array([v for v in range(graph.n) if v not in removed], dtype=np.int64)
+
+    groups = {}
+    for v in kept.tolist():
+        plus = A_plus.indices[A_plus.indptr[v]:A_plus.indptr[v + 1]].tolist()
+        minus = tuple(A_minus.indices[A_minus.indptr[v]:A_minus.indptr[v + 1]].tolist())
+        groups.setdefault(("open", tuple(plus), minus), []).append(v)
+        groups.setdefault(("closed", tuple(sorted(plus + [v])), minus), []).append(v)
+
+    twins = []
+    for members in groups.values():
+        twins += [(members[0], v) for v in members[1:]]
+
+    return kept, removed, anchors, twins
+
+def fixable_vertices(lps_dual_sol, D_plus, D_minus, lambda_val, exclude=(), tol=10e-6):
+    """
+    双対変数 y のもとで, AP-MILP の最適値 (0 との大きい方) を変えずに x_v = 0 に固定できる頂点を求める
+
+    N(C) = 4 e+(C) - 2 (1 - lambda) d+(C) - 4 e-(C) + 2 lambda d-(C), r(C) = N(C) / |C| - y(C) とし,
+    C = C' + {v} (|C'| = s >= 1) に v を加えたときの N の増分を g とすると
+        r(C) = s / (s + 1) r(C') + (g - y_v) / (s + 1) - (y(C') + s y_v) / (s + 1)
+    となる. g <= G_v = (2 + 2 lambda) d+_v + 2 lambda d-_v (正の隣接頂点が全て C' にある場合) と
+    y(C') >= s min_u y_u より, y_v >= max(G_v, -min_u y_u) なら r(C) <= max(r(C'), 0).
+    単独の列も r({v}) = N({v}) - y_v <= N({v}) - G_v = -4 d+_v <= 0 なので,
+    固定した AP-MILP の最適値を M' とすると, 元の AP-MILP の最適値 M は max(M, 0) = max(M', 0) を満たす.
+    固定する頂点どうしでも条件は列によらないので, 同時に固定してよい (全ての頂点が条件を満たす場合は 1 つ残す).
+
+    Parameters:
+    - lps_dual_sol: 価格付けに使う双対変数 {頂点 u: 値}
+    - D_plus, D_minus, lambda_val: calc_w_C と同じ
+    - exclude: 固定しない頂点 (Ryan-Foster 分枝で他の頂点と同じ列に入れる頂点など)
+    - tol: 条件の許容誤差 (この分だけ厳しく判定する)
+
+    Returns:
+    - fixed: x_v = 0 に固定できる頂点のリスト
+    """
+    vertices = list(lps_dual_sol)
+    y = np.array([lps_dual_sol[u] for u in vertices], dtype=np.float64)
+    D_plus = np.asarray(D_plus, dtype=np.float64)[vertices]
+    D_minus = np.asarray(D_minus, dtype=np.float64)[vertices]
+
+    bound = np.maximum((2 + 2 * lambda_val) * D_plus + 2 * lambda_val * D_minus, -y.min())
+    exclude = set(exclude)
+    fixed = [u for u, y_u, b in zip(vertices, y.tolist(), bound.tolist()) if y_u - tol >= b and u not in exclude]
+    if len(fixed) == len(vertices):
+        fixed = fixed[:-1]
+
+    return fixed
+
+class PresolvedPricer:
+    def __init__(self, vertices, A_plus, A_minus, D_plus, D_minus, lambda_val, weight_engine=None,
+                 solver_name="CBC"):
+        """
+        前処理で頂点を減らした AP-MILP で被約費用が正の列を探す価格付けの実行器
+
+        reduce_pricing_graph で外した頂点を除いた誘導部分グラフの上に AP-MILP を作り (次数は元のグラフのまま),
+        双対変数が等しい双子には x_u = x_v を課して解く. 得られた列は元の頂点に戻し (lift),
+        外した頂点のうち加えると被約費用が増えるものを貪欲に加え, 1 頂点の追加・削除の近傍も調べる.
+        外した頂点だけからなる単独の列も調べる.
+
+        規則は SMD の価格付けの最適性を保つとは限らない (w_C は |C| で割った値なので,
+        負の辺しかない頂点でも双対変数によっては列に入る). そのため列を探すだけの発見的な価格付けで,
+        列が見つからなくても最適性の証明にはならない. その反復では元の AP-MILP を解き,
+        そこでは最適値を保つ固定 (fixable_vertices) だけを使う.
+
+        Parameters:
+        - vertices, A_plus, A_minus, D_plus, D_minus, lambda_val: AP_MILP と同じ
+        - weight_engine: 列の重みの計算に使う ColumnWeightEngine (None なら作る)
+        - solver_name: MILP ソルバー ("CBC" または "HiGHS")
+        """
+        graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+        self.vertices = vertices
+        self.weight_engine = weight_engine or ColumnWeightEngine(graph, None, None, None, lambda_val)
+        self.kept, self.removed, self.anchors, twins = reduce_pricing_graph(graph)
+
+        # 元の頂点番号と AP-MILP の頂点番号 (kept の中の位置) の対応
+        self.local = {int(v): i for i, v in enumerate(self.kept)}
+        self.twins = [(self.local[u], self.local[v]) for u, v in twins]
+
+        self.ap_milp = None
+        if len(self.kept) > 0:
+            sub = graph.subgraph(self.kept)
+            self.ap_milp = AP_MILP(
+                list(range(len(self.kept))), sub.A_plus, sub.A_minus,
+                np.asarray(graph.D_plus)[self.kept], np.asarray(graph.D_minus)[self.kept], lambda_val,
+                solver_name=solver_name,
+            )
+
+    def num_binaries(self):
+        """
+        前処理後の AP-MILP のバイナリ変数の数
+        """
+        return len(self.kept)
+
+    def find_columns(self, lps_dual_sol, known_columns=(), max_columns=None, max_seconds=None, tol=10e-6):
+        """
+        前処理した AP-MILP を解き, 元の頂点に戻した列から被約費用が正のものを集める
+
+        Parameters:
+        - lps_dual_sol: LPS の双対解 {頂点 u: 値}
+        - known_columns: 既に LPS にある列 (返さない)
+        - max_columns: 返す列の最大数 (None なら上限なし)
+        - max_seconds: AP-MILP の制限時間 (None なら制限なし)
+        - tol: 被約費用の許容誤差
+
+        Returns:
+        - columns: [(被約費用, frozenset(C)), ...] (被約費用の降順)
+        """
+        pool = []
+        if self.ap_milp is not None:
+            local_dual_sol = {i: lps_dual_sol[int(v)] for i, v in enumerate(self.kept)}
+            self.ap_milp.add_lps_dual_sol(local_dual_sol)
+            self.ap_milp.set_branching_constrs(together=[
+                (a, b) for a, b in self.twins if abs(local_dual_sol[a] - local_dual_sol[b]) <= tol
+            ])
+            self.ap_milp.solve_model(max_seconds=max_seconds)
+            if self.ap_milp.model.num_solutions > 0:
+                pool = [
+                    self.lift(frozenset(int(self.kept[i]) for i in C), lps_dual_sol)
+                    for C in self.ap_milp.get_solution_pool()
+                ]
+
+        pool += [frozenset({v}) for v in self.removed]
+
+        return collect_improving_columns(
+            pool, self.weight_engine, lps_dual_sol, known_columns=known_columns, max_columns=max_columns, tol=tol
+        )
+
+    def lift(self, C, lps_dual_sol):
+        """
+        前処理した AP-MILP の列に, 外した頂点のうち被約費用が増えるものを貪欲に加える
+
+        ペンダントは正の辺でつながる頂点が列に入っているときだけ加える
+        """
+        if not C:
+            return C
+
+        w_C = self.weight_engine.weight(C)
+        for v in self.removed:
+            if v in self.anchors and self.anchors[v] not in C:
+                continue
+            C_new, w_C_new = self.weight_engine.derive(C, add=[v])
+            if reduced_cost(w_C_new, C_new, lps_dual_sol) > reduced_cost(w_C, C, lps_dual_sol):
+                C, w_C = C_new, w_C_new
+
+        return C
@@ -0,0 +1,77 @@
+def reduced_cost(w_C, C, lps_dual_sol):
+    """
+    列 C の被約費用 w_C - sum_{u in C} y_u を計算する
+    """
+    return w_C - sum(lps_dual_sol[u] for u in C)
+
+def neighbor_columns(weight_engine, C):
+    """
+    列 C から 1 頂点だけ削除・追加した列を列挙する
+
+    追加する頂点は C の正の隣接頂点に限る
+
+    Returns:
+    - neighbors: [(C', w_C'), ...]
+    """
+    A_plus = weight_engine.graph.A_plus
+    neighbors = []
+
+    if len(C) > 1:
+        for v in C:
+            neighbors.append(weight_engine.derive(C, remove=[v]))
+
+    boundary = set()
+    for u in C:
+        boundary.update(A_plus.indices[A_plus.indptr[u]:A_plus.indptr[u + 1]].tolist())
+    for v in boundary - C:
+        neighbors.append(weight_engine.derive(C, add=[v]))
+
+    return neighbors
+
+def collect_improving_columns(
+        pool, weight_engine, lps_dual_sol, known_columns=(), neighbors=True, max_columns=None, tol=10e-6):
+    """
+    被約費用が正の列をまとめて集める
+
+    Parameters:
+    - pool: AP-MILP の解プールから得た列のリスト (先頭が最適解)
+    - weight_engine: ColumnWeightEngine
+    - lps_dual_sol: LPS の双対解 {頂点 u: 値}
+    - known_columns: 既に LPS にある列 (追加しない)
+    - neighbors: True の場合, 解プールの列の近傍 (1 頂点の追加・削除) も調べる
+    - max_columns: 返す列の最大数 (None なら上限なし)
+    - tol: 被約費用の許容誤差
+
+    Returns:
+    - columns: [(被約費用, frozenset(C)), ...] (被約費用の降順)
+    """
+    known_columns = set(known_columns)
+    candidates = {}
+
+    pool = [frozenset(C) for C in pool if len(C) > 0]
+    for C, w_C in zip(pool, weight_engine.weights(pool)):
+        candidates[C] = reduced_cost(w_C, C, lps_dual_sol)
+
+    if neighbors:
+        for C in pool:
+            for C_new, w_C in neighbor_columns(weight_engine, C):
+                if C_new not in candidates:
+                    candidates[C_new] = reduced_cost(w_C, C_new, lps_dual_sol)
+
+    columns = sorted(
+        ((rc, C) for C, rc in candidates.items() if rc > tol and C not in known_columns),
+        key=lambda item: -item[0],
+    )
+    if max_columns is not None:
+        columns = columns[:max_columns]
+
+    return columns
+
+def lagrangian_bound(lps_dual_sol, max_reduced_cost, num_vertices):
+    """
+    双対変数 y での LP(全列) の最適値の上界 sum_u y_u + n max(0, 被約費用の最大値)
+
+    どの解でも sum_C z_C <= n なので, 任意の y について成り立つ.
+    max_reduced_cost は AP-MILP を最適に解いたときの値でなければならない.
+    """
+    return sum(lps_dual_sol.values()) + num_vertices * max(0, max_reduced_cost)
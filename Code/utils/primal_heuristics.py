@@ -0,0 +1,166 @@
+from mip import Model, xsum, maximize, BINARY, CONTINUOUS, OptimizationStatus
+
+def _build_restricted_master(vertices, w_C_dict, var_type):
+    """
+    列集合 w_C_dict の上の集合分割問題を作る
+
+    Returns:
+    - model: python-mip のモデル
+    - z_C: {frozenset(C): 変数}
+    """
+    model = Model(solver_name="CBC")
+    model.solver.set_verbose(False)
+
+    z_C = {C: model.add_var(var_type=var_type, lb=0, ub=1, obj=w_C) for C, w_C in w_C_dict.items()}
+
+    members = {u: [] for u in vertices}
+    for C, z in z_C.items():
+        for u in C:
+            members[u].append(z)
+    for u in vertices:
+        model.add_constr(xsum(members[u]) == 1)
+
+    model.objective = maximize(xsum(w_C * z_C[C] for C, w_C in w_C_dict.items()))
+
+    return model, z_C
+
+def restricted_master_mip(vertices, w_C_dict, max_seconds=None, start=None):
+    """
+    LPS の列だけを使い, z_C をバイナリとした集合分割問題を解く
+
+    Parameters:
+    - vertices: 頂点のリスト
+    - w_C_dict: 列の重み {frozenset(C): w_C}
+    - max_seconds: 制限時間 (None なら最適解が得られるまで解く)
+    - start: 初期解とする分割 (frozenset のリスト)
+
+    Returns:
+    - value: 得られた分割の目的関数値 (実行可能解が見つからなければ None)
+    - partition: 得られた分割 (frozenset のリスト, 実行可能解が見つからなければ None)
+    """
+    model, z_C = _build_restricted_master(vertices, w_C_dict, BINARY)
+
+    if start is not None:
+        model.start = [(z_C[C], 1.0) for C in start if C in z_C]
+
+    if max_seconds is None:
+        model.optimize()
+    else:
+        model.optimize(max_seconds=max_seconds)
+
+    if model.num_solutions == 0:
+        return None, None
+
+    partition = [C for C, z in z_C.items() if z.x > 0.5]
+
+    return sum(w_C_dict[C] for C in partition), partition
+
+def dive(vertices, w_C_dict, tol=1e-6):
+    """
+    LPS の列の上で LP を解き, 最大の分数値をとる列を 1 に固定することを整数解になるまで繰り返す
+
+    Parameters:
+    - vertices: 頂点のリスト
+    - w_C_dict: 列の重み {frozenset(C): w_C}
+    - tol: 許容誤差
+
+    Returns:
+    - value: 得られた分割の目的関数値 (途中で実行不能になれば None)
+    - partition: 得られた分割 (frozenset のリスト, 途中で実行不能になれば None)
+    """
+    model, z_C = _build_restricted_master(vertices, w_C_dict, CONTINUOUS)
+
+    while(True):
+        if model.optimize() != OptimizationStatus.OPTIMAL:
+            return None, None
+
+        fractional = [(z.x, C) for C, z in z_C.items() if tol < z.x < 1 - tol]
+        if not fractional:
+            partition = [C for C, z in z_C.items() if z.x > 0.5]
+            return sum(w_C_dict[C] for C in partition), partition
+
+        _, C = max(fractional, key=lambda item: item[0])
+        z_C[C].lb = 1
+
+def greedy_rounding(vertices, lps_primal_sol, weight_engine, tol=1e-6):
+    """
+    LPS の解を値の大きい列から互いに素になるように選び, 残った頂点を貪欲に割り当てる
+
+    残った頂点は, 単独のコミュニティにするか, 選んだ列のいずれかに加えるかのうち
+    目的関数値が最も大きくなるものを選ぶ.
+
+    Parameters:
+    - vertices: 頂点のリスト
+    - lps_primal_sol: LPS の主問題の解 {frozenset(C): 値}
+    - weight_engine: ColumnWeightEngine
+    - tol: 許容誤差
+
+    Returns:
+    - value: 得られた分割の目的関数値
+    - partition: 得られた分割 (frozenset のリスト)
+    """
+    candidates = [C for C, z_val in lps_primal_sol.items() if z_val > tol]
+    w_C_list = weight_engine.weights(candidates)
+    order = sorted(range(len(candidates)), key=lambda i: (-lps_primal_sol[candidates[i]], -w_C_list[i]))
+
+    partition, weights = [], []
+    covered = set()
+    for i in order:
+        C = candidates[i]
+        if covered.isdisjoint(C):
+            partition.append(C)
+            weights.append(w_C_list[i])
+            covered.update(C)
+
+    # 修復: 残った頂点を 1 つずつ割り当てる
+    for u in vertices:
+        if u in covered:
+            continue
+
+        singleton = frozenset({u})
+        best_gain, best_index, best_C = weight_engine.weight(singleton), None, singleton
+        for i, C in enumerate(partition):
+            C_new, w_C_new = weight_engine.derive(C, add=[u])
+            if w_C_new - weights[i] > best_gain:
+                best_gain, best_index, best_C = w_C_new - weights[i], i, C_new
+
+        if best_index is None:
+            partition.append(best_C)
+            weights.append(best_gain)
+        else:
+            partition[best_index] = best_C
+            weights[best_index] += best_gain
+        covered.add(u)
+
+    return sum(weights), partition
+
+def find_incumbent(lps, lps_primal_sol, methods=("rounding", "mip"), max_seconds=None):
+    """
+    LPS の列から整数の分割を求める
+
+    Parameters:
+    - lps: LPS
+    - lps_primal_sol: LPS の主問題の解
+    - methods: 使う手法 ("rounding", "diving", "mip") のタプル
+      "mip" は他の手法で得た最良の分割を初期解にする
+    - max_seconds: "mip" の制限時間
+
+    Returns:
+    - value: 最良の分割の目的関数値 (見つからなければ None)
+    - partition: 最良の分割 (frozenset のリスト, 見つからなければ None)
+    """
+    best_value, best_partition = None, None
+
+    def update(value, partition):
+        nonlocal best_value, best_partition
+        if value is not None and (best_value is None or value > best_value):
+            best_value, best_partition = value, partition
+
+    if "rounding" in methods:
+        update(*greedy_rounding(lps.vertices, lps_primal_sol, lps.weight_engine))
+    if "diving" in methods:
+        update(*dive(lps.vertices, lps.w_C_dict))
+    if "mip" in methods:
+        update(*restricted_master_mip(lps.vertices, lps.w_C_dict, max_seconds=max_seconds, start=best_partition))
+
+    return best_value, best_partition
@@ -0,0 +1,262 @@
+from collections import Counter
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import eigsh
+
+from utils.signed_graph import as_signed_graph
+from utils.partition import generate_singleton
+
+def _labels_to_partition(labels):
+    """
+    頂点ごとのラベルを分割 (リストのリスト) に変換する
+    """
+    groups = {}
+    for u, label in enumerate(labels):
+        groups.setdefault(label, []).append(u)
+
+    return list(groups.values())
+
+def positive_components(A_plus, A_minus=None, D_plus=None, D_minus=None):
+    """
+    正の辺だけのグラフの連結成分による分割
+
+    Returns:
+    - partition: 分割 (リストのリスト)
+    """
+    graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+    _, labels = connected_components(graph.A_plus, directed=False)
+
+    return _labels_to_partition(labels)
+
+def label_propagation(A_plus, A_minus=None, D_plus=None, D_minus=None, max_iter=20, seed=0):
+    """
+    符号付きのラベル伝播による分割
+
+    各頂点は, 隣接頂点のラベルごとに (正の辺の数) - (負の辺の数) を数え,
+    それが正で現在のラベルより大きいラベルに移る. ラベルが変わらなくなるまで繰り返す.
+
+    Parameters:
+    - A_plus, A_minus, D_plus, D_minus: calc_w_C と同じ (A_plus に SignedGraph も可)
+    - max_iter: 全頂点を調べる回数の上限
+    - seed: 頂点を調べる順序の乱数シード
+
+    Returns:
+    - partition: 分割 (リストのリスト)
+    """
+    graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+    A_plus, A_minus = graph.A_plus, graph.A_minus
+    rng = np.random.default_rng(seed)
+    labels = np.arange(graph.n)
+
+    for _ in range(max_iter):
+        changed = 0
+        for v in rng.permutation(graph.n):
+            score = Counter(labels[A_plus.indices[A_plus.indptr[v]:A_plus.indptr[v + 1]]].tolist())
+            score.subtract(labels[A_minus.indices[A_minus.indptr[v]:A_minus.indptr[v + 1]]].tolist())
+
+            best_label, best_score = labels[v], max(score.get(labels[v], 0), 0)
+            for label, value in score.items():
+                if value > best_score:
+                    best_label, best_score = label, value
+
+            if best_label != labels[v]:
+                labels[v] = best_label
+                changed += 1
+
+        if changed == 0:
+            break
+
+    return _labels_to_partition(labels)
+
+def smd_local_moving(A_plus, A_minus, D_plus, D_minus, lambda_val, init_partition=None, max_iter=10, seed=0):
+    """
+    SMD (sum_C w_C) を目的関数とする局所移動 (Louvain 法の第 1 段階) による分割
+
+    各頂点を, 正の隣接頂点を含むコミュニティまたは新しい単独のコミュニティのうち,
+    目的関数の増加が最大のものに移す. 改善がなくなるまで繰り返す.
+    コミュニティごとに a+, a-, d+, d-, |C| を保持し, 移動による w_C の変化を差分で計算する.
+
+    Parameters:
+    - A_plus, A_minus, D_plus, D_minus: calc_w_C と同じ (A_plus に SignedGraph も可)
+    - lambda_val: パラメータ
+    - init_partition: 初期の分割 (None なら単独の頂点の分割)
+    - max_iter: 全頂点を調べる回数の上限
+    - seed: 頂点を調べる順序の乱数シード
+
+    Returns:
+    - partition: 分割 (リストのリスト)
+    """
+    graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+    A_plus, A_minus = graph.A_plus, graph.A_minus
+    D_plus = np.asarray(graph.D_plus, dtype=np.int64)
+    D_minus = np.asarray(graph.D_minus, dtype=np.int64)
+    n = graph.n
+    rng = np.random.default_rng(seed)
+
+    labels = np.arange(n)
+    if init_partition is not None:
+        for label, C in enumerate(init_partition):
+            labels[list(C)] = label
+
+    def w(sums):
+        sum_a_plus, sum_a_minus, sum_d_plus, sum_d_minus, size_C = sums
+        if size_C == 0:
+            return 0.0
+        return (
+            2 * sum_a_plus - 2 * (1 - lambda_val) * sum_d_plus - 2 * sum_a_minus + 2 * lambda_val * sum_d_minus
+        ) / size_C
+
+    # コミュニティごとの集計値 [a+, a-, d+, d-, |C|]
+    sums = {}
+    for v in range(n):
+        entry = sums.setdefault(labels[v], [0, 0, 0, 0, 0])
+        entry[2] += D_plus[v]
+        entry[3] += D_minus[v]
+        entry[4] += 1
+    E_plus, E_minus = graph.edges()
+    for E, index in ((E_plus, 0), (E_minus, 1)):
+        for u, v in E[labels[E[:, 0]] == labels[E[:, 1]]].tolist():
+            sums[labels[u]][index] += 2
+
+    next_label = n
+    for _ in range(max_iter):
+        moved = 0
+        for v in rng.permutation(n):
+            a = labels[v]
+            k_plus = Counter(labels[A_plus.indices[A_plus.indptr[v]:A_plus.indptr[v + 1]]].tolist())
+            k_minus = Counter(labels[A_minus.indices[A_minus.indptr[v]:A_minus.indptr[v + 1]]].tolist())
+
+            # v を現在のコミュニティから取り除いたときの変化
+            removed = [
+                sums[a][0] - 2 * k_plus[a], sums[a][1] - 2 * k_minus[a],
+                sums[a][2] - D_plus[v], sums[a][3] - D_minus[v], sums[a][4] - 1,
+            ]
+            base = w(removed) - w(sums[a])
+
+            # 単独のコミュニティにする (現在単独なら移動しないのと同じ)
+            best_gain, best_label = 1e-10, None
+            if sums[a][4] > 1:
+                gain = base + w([0, 0, D_plus[v], D_minus[v], 1])
+                if gain > best_gain:
+                    best_gain, best_label = gain, -1
+
+            for b in k_plus:
+                if b == a:
+                    continue
+                added = [
+                    sums[b][0] + 2 * k_plus[b], sums[b][1] + 2 * k_minus[b],
+                    sums[b][2] + D_plus[v], sums[b][3] + D_minus[v], sums[b][4] + 1,
+                ]
+                gain = base + w(added) - w(sums[b])
+                if gain > best_gain:
+                    best_gain, best_label = gain, b
+
+            if best_label is None:
+                continue
+
+            if best_label == -1:
+                best_label = next_label
+                next_label += 1
+                sums[best_label] = [0, 0, 0, 0, 0]
+
+            b = best_label
+            sums[a] = removed
+            if sums[a][4] == 0:
+                del sums[a]
+            sums[b] = [
+                sums[b][0] + 2 * k_plus[b], sums[b][1] + 2 * k_minus[b],
+                sums[b][2] + D_plus[v], sums[b][3] + D_minus[v], sums[b][4] + 1,
+            ]
+            labels[v] = b
+            moved += 1
+
+        if moved == 0:
+            break
+
+    return _labels_to_partition(labels)
+
+def spectral_bisection(A_plus, A_minus=None, D_plus=None, D_minus=None, depth=3):
+    """
+    符号付き隣接行列 A_plus - A_minus の最大固有値の固有ベクトルの符号で再帰的に二分割する
+
+    Parameters:
+    - A_plus, A_minus, D_plus, D_minus: calc_w_C と同じ (A_plus に SignedGraph も可)
+    - depth: 二分割を繰り返す回数
+
+    Returns:
+    - partitions: 各段階の分割のリスト (depth 個)
+    """
+    graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+    A = sp.csr_array(graph.A_plus, dtype=np.float64) - sp.csr_array(graph.A_minus, dtype=np.float64)
+
+    partitions = []
+    parts = [np.arange(graph.n)]
+    for _ in range(depth):
+        new_parts = []
+        for part in parts:
+            if len(part) < 3:
+                new_parts.append(part)
+                continue
+
+            sub = A[part][:, part]
+            if len(part) <= 200:
+                _, vectors = np.linalg.eigh(sub.toarray())
+                vector = vectors[:, -1]
+            else:
+                _, vectors = eigsh(sub, k=1, which="LA", v0=np.ones(len(part)))
+                vector = vectors[:, 0]
+
+            positive, negative = part[vector >= 0], part[vector < 0]
+            if len(positive) == 0 or len(negative) == 0:
+                new_parts.append(part)
+            else:
+                new_parts += [positive, negative]
+
+        parts = new_parts
+        partitions.append([part.tolist() for part in parts])
+
+    return partitions
+
+def generate_seed_partitions(
+        vertices, A_plus, A_minus, D_plus, D_minus, lambda_val,
+        methods=("components", "label_propagation", "local_moving", "spectral"), seed=0):
+    """
+    列生成法の初期の分割集合 (init_partitions) をヒューリスティックで生成する
+
+    単独の頂点の分割は常に先頭に含める. 局所移動は単独の頂点からと,
+    他の手法で得た各分割から始めたものを加える. 同じ分割は 1 つにまとめる.
+
+    Parameters:
+    - vertices, A_plus, A_minus, D_plus, D_minus, lambda_val: column_generation と同じ
+    - methods: 使う手法 ("components", "label_propagation", "local_moving", "spectral") のタプル
+    - seed: 乱数シード
+
+    Returns:
+    - init_partitions: 分割のリスト
+    """
+    graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+
+    candidates = []
+    if "components" in methods:
+        candidates.append(positive_components(graph))
+    if "label_propagation" in methods:
+        candidates.append(label_propagation(graph, seed=seed))
+    if "spectral" in methods:
+        candidates += spectral_bisection(graph)
+    if "local_moving" in methods:
+        candidates = [
+            smd_local_moving(graph, None, None, None, lambda_val, init_partition=partition, seed=seed)
+            for partition in [None] + candidates
+        ] + candidates
+
+    init_partitions = [generate_singleton(vertices)]
+    seen = {frozenset(frozenset(C) for C in init_partitions[0])}
+    for partition in candidates:
+        key = frozenset(frozenset(C) for C in partition)
+        if key not in seen:
+            seen.add(key)
+            init_partitions.append([[vertices[u] for u in C] for C in partition])
+
+    return init_partitions
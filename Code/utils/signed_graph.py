@@ -0,0 +1,205 @@
+import numpy as np
+import scipy.sparse as sp
+import networkx as nx
+from scipy.sparse.csgraph import connected_components
+
+class SignedGraph:
+    def __init__(self, A_plus, A_minus, D_plus=None, D_minus=None):
+        """
+        CSR 形式の疎行列で保持する符号付きグラフ
+
+        Parameters:
+        - A_plus: 正の隣接行列 (密行列または疎行列, 対称)
+        - A_minus: 負の隣接行列 (密行列または疎行列, 対称)
+        - D_plus: 正の次数 (None の場合は A_plus から計算)
+        - D_minus: 負の次数 (None の場合は A_minus から計算)
+        """
+        self.A_plus = _as_csr(A_plus)
+        self.A_minus = _as_csr(A_minus)
+        self.n = self.A_plus.shape[0]
+        self.vertices = list(range(self.n))
+
+        # 次数は行ごとの非ゼロ要素数なので indptr の差分で O(n) で求まる
+        self.D_plus = np.diff(self.A_plus.indptr) if D_plus is None else np.asarray(D_plus)
+        self.D_minus = np.diff(self.A_minus.indptr) if D_minus is None else np.asarray(D_minus)
+
+        self._edges = None
+
+    @classmethod
+    def from_adjacency(cls, A):
+        """
+        符号付き隣接行列 A (密行列または疎行列) から生成する
+        """
+        A = sp.csr_array(A)
+        A.eliminate_zeros()
+        A_plus = sp.csr_array((A > 0).astype(np.int8))
+        A_minus = sp.csr_array((A < 0).astype(np.int8))
+
+        return cls(A_plus, A_minus)
+
+    @classmethod
+    def from_edges(cls, n, u, v, sign):
+        """
+        符号付き辺リストから生成する
+
+        Parameters:
+        - n: 頂点数
+        - u, v: 辺の端点の配列 (0 始まりの頂点番号)
+        - sign: 辺の符号の配列 (正なら正の辺, 負なら負の辺, 0 は無視)
+
+        同じ頂点対に複数の辺がある場合は符号の和で判定し, 自己ループは無視する
+        """
+        u = np.asarray(u, dtype=np.int64)
+        v = np.asarray(v, dtype=np.int64)
+        sign = np.sign(np.asarray(sign)).astype(np.int64)
+
+        keep = (u != v) & (sign != 0)
+        u, v, sign = u[keep], v[keep], sign[keep]
+
+        # 対称化して重複辺をまとめる
+        rows = np.concatenate([u, v])
+        cols = np.concatenate([v, u])
+        data = np.concatenate([sign, sign])
+        A = sp.csr_array((data, (rows, cols)), shape=(n, n))
+        A.sum_duplicates()
+
+        return cls.from_adjacency(A)
+
+    def edges(self):
+        """
+        上三角部分の辺を行優先の順で返す
+
+        Returns:
+        - E_plus: 正の辺の端点 (u, v) の配列 (u < v), shape (m_plus, 2)
+        - E_minus: 負の辺の端点 (u, v) の配列 (u < v), shape (m_minus, 2)
+        """
+        if self._edges is None:
+            self._edges = (_upper_edges(self.A_plus), _upper_edges(self.A_minus))
+
+        return self._edges
+
+    def edge_lists(self):
+        """
+        AP-MILP 用に辺をタプルのリストで返す
+
+        Returns:
+        - E_plus: 正の辺のリスト [(u, v), ...]
+        - E_minus: 負の辺のリスト [(u, v), ...]
+        """
+        E_plus, E_minus = self.edges()
+
+        return list(map(tuple, E_plus.tolist())), list(map(tuple, E_minus.tolist()))
+
+    def induced_sums(self, C):
+        """
+        C の誘導部分グラフ上の隣接行列の和を O(vol(C)) で計算する
+
+        Returns:
+        - sum_a_plus: A_plus[C, C] の和 (各辺を 2 回数える)
+        - sum_a_minus: A_minus[C, C] の和 (各辺を 2 回数える)
+        """
+        return induced_sum(self.A_plus, C), induced_sum(self.A_minus, C)
+
+    def unpack(self):
+        """
+        既存の関数に渡すための (vertices, A_plus, A_minus, D_plus, D_minus) を返す
+        """
+        return self.vertices, self.A_plus, self.A_minus, self.D_plus, self.D_minus
+
+    def components(self):
+        """
+        辺の符号を区別しない連結成分
+
+        Returns:
+        - components: 各連結成分の頂点番号の配列のリスト (頂点数の降順)
+        """
+        _, labels = connected_components(self.A_plus + self.A_minus, directed=False)
+        order = np.argsort(labels, kind="stable")
+        sizes = np.bincount(labels)
+        components = np.split(order, np.cumsum(sizes)[:-1])
+
+        return sorted(components, key=len, reverse=True)
+
+    def subgraph(self, nodes):
+        """
+        nodes の誘導部分グラフ (頂点番号は nodes の順に 0 から振り直す)
+
+        次数は部分グラフの中で数え直すので, nodes が連結成分の和でなければ元のグラフの次数とは異なる
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+
+        return SignedGraph(self.A_plus[nodes][:, nodes], self.A_minus[nodes][:, nodes])
+
+    def to_networkx(self):
+        """
+        辺に sign 属性を持つ networkx グラフを構築する
+        """
+        # 正負をまとめた上三角部分を行優先で走査し, 辺の追加順を保つ
+        signed = sp.triu(self.A_plus.astype(np.int8) - self.A_minus.astype(np.int8), k=1, format="csr")
+        signed.sort_indices()
+        signed = signed.tocoo()
+
+        G = nx.Graph()
+        G.add_edges_from(
+            (u, v, {"sign": s})
+            for u, v, s in zip(signed.row.tolist(), signed.col.tolist(), signed.data.tolist())
+            if s != 0
+        )
+
+        return G
+
+def as_signed_graph(A_plus, A_minus=None, D_plus=None, D_minus=None):
+    """
+    密行列・疎行列・SignedGraph のいずれからでも SignedGraph を得る
+    """
+    if isinstance(A_plus, SignedGraph):
+        return A_plus
+
+    return SignedGraph(A_plus, A_minus, D_plus, D_minus)
+
+def signed_edge_lists(A_plus, A_minus):
+    """
+    正負の隣接行列から上三角部分の辺リストを得る
+
+    Returns:
+    - E_plus: 正の辺のリスト [(u, v), ...] (u < v)
+    - E_minus: 負の辺のリスト [(u, v), ...] (u < v)
+    """
+    return as_signed_graph(A_plus, A_minus).edge_lists()
+
+def induced_sum(A, C):
+    """
+    A[C, C] の要素の和を計算する
+
+    A が疎行列の場合は C の行だけを取り出すので O(vol(C)) で済む
+    """
+    if not sp.issparse(A):
+        return np.sum(A[np.ix_(C, C)])
+
+    C = np.asarray(C, dtype=np.int64)
+    mask = np.zeros(A.shape[0], dtype=bool)
+    mask[C] = True
+
+    rows = A[C]
+
+    return rows.data[mask[rows.indices]].sum(dtype=np.int64)
+
+def _as_csr(A):
+    A = sp.csr_array(A)
+    if A.dtype != np.int8:
+        A = A.astype(np.int8)
+
+    # 読み取り専用の配列 (memmap 等) を書き換えないよう, 必要なときだけ整形する
+    if np.any(A.data == 0):
+        A.eliminate_zeros()
+    if not A.has_sorted_indices:
+        A.sort_indices()
+
+    return A
+
+def _upper_edges(A):
+    upper = sp.triu(A, k=1, format="csr")
+    upper.sort_indices()
+    upper = upper.tocoo()
+
+    return np.column_stack([upper.row, upper.col]).astype(np.int64)
@@ -0,0 +1,151 @@
+import mip
+from mip import Model
+
+# 使える LP/MILP ソルバー (python-mip のバックエンド)
+SOLVERS = ("CBC", "HiGHS")
+
+# HiGHS の基底と反復回数は python-mip の非公開の属性 (_lib, _model, _flush, _get_int_info_value) で扱う.
+# 動作を確かめた python-mip の版でだけ使い, それ以外の版や呼び出しに失敗した場合は取り出さない (最初から解く)
+TESTED_MIP_VERSIONS = ("2.0.",)
+_HIGHS_INTERNALS = ("_lib", "_model", "_flush", "_get_int_info_value")
+
+def create_model(solver_name="CBC"):
+    """
+    指定したソルバーで python-mip のモデルを作る (ログは出さない)
+
+    HiGHS は highspy パッケージが必要. 双対単体法の再最適化が速いので, 大きくなる LPS に向く.
+
+    Parameters:
+    - solver_name: "CBC" または "HiGHS" (大文字小文字は区別しない)
+
+    Returns:
+    - model: python-mip のモデル
+    """
+    names = {name.upper(): name for name in SOLVERS}
+    if solver_name.upper() not in names:
+        raise ValueError(f"solver_name must be one of {SOLVERS}.")
+
+    if solver_name.upper() == "HIGHS" and not highs_available():
+        raise ImportError("The HiGHS backend requires the highspy package.")
+
+    model = Model(solver_name=names[solver_name.upper()])
+    model.solver.set_verbose(False)
+
+    return model
+
+def highs_available():
+    """
+    HiGHS のライブラリを読み込めるか
+    """
+    try:
+        import mip.highs
+    except ImportError:
+        return False
+
+    return mip.highs.has_highs
+
+def has_solution_pool(model):
+    """
+    探索中に見つけた複数の解 (xi) を取り出せるか (CBC のみ)
+    """
+    return model.solver_name.upper() == "CBC"
+
+def is_highs(model):
+    """
+    HiGHS のモデルか
+    """
+    return model.solver_name.upper() == "HIGHS"
+
+def highs_internals_available(model):
+    """
+    HiGHS のモデルで, 基底と反復回数を扱う python-mip の非公開の属性を使えるか
+
+    python-mip の版が TESTED_MIP_VERSIONS にないか, 属性がなければ False
+    """
+    if not is_highs(model) or not mip.__version__.startswith(TESTED_MIP_VERSIONS):
+        return False
+
+    return all(hasattr(model.solver, name) for name in _HIGHS_INTERNALS)
+
+def simplex_iterations(model):
+    """
+    直前の求解の単体法の反復回数
+
+    CBC の C インターフェースからは LP の反復回数を得られないので None を返す
+    (HiGHS でも非公開の属性を使えなければ None)
+    """
+    if not highs_internals_available(model):
+        return None
+
+    try:
+        return model.solver._get_int_info_value("simplex_iteration_count")
+    except (AttributeError, TypeError, mip.InterfacingError):
+        return None
+
+def get_basis(model):
+    """
+    直前の求解の基底を取り出す (HiGHS のみ, CBC や取り出せない場合は None)
+
+    Returns:
+    - basis: (列の状態のリスト, 行の状態のリスト) (0: 下限, 1: 基底, 2: 上限)
+    """
+    if not highs_internals_available(model):
+        return None
+
+    try:
+        import mip.highs
+        solver = model.solver
+        col_status = mip.highs.ffi.new("HighsInt[]", solver.num_cols())
+        row_status = mip.highs.ffi.new("HighsInt[]", solver.num_rows())
+        mip.highs.check(solver._lib.Highs_getBasis(solver._model, col_status, row_status))
+    except (AttributeError, TypeError, mip.InterfacingError):
+        return None
+
+    return list(col_status), list(row_status)
+
+def set_basis(model, basis):
+    """
+    次の求解の初期基底を設定する (HiGHS のみ)
+
+    Parameters:
+    - basis: get_basis と同じ形式 (列数と行数が現在のモデルと一致すること)
+
+    Returns:
+    - ok: HiGHS が基底として受け付けたら True (CBC, 基底として不正な場合, 設定に失敗した場合は False)
+    """
+    if basis is None or not highs_internals_available(model):
+        return False
+
+    try:
+        import mip.highs
+        solver = model.solver
+        solver._flush()
+        col_status, row_status = basis
+        if len(col_status) != solver.num_cols() or len(row_status) != solver.num_rows():
+            return False
+
+        status = solver._lib.Highs_setBasis(
+            solver._model, mip.highs.ffi.new("HighsInt[]", col_status), mip.highs.ffi.new("HighsInt[]", row_status)
+        )
+    except (AttributeError, TypeError, mip.InterfacingError):
+        return False
+
+    return status == 0
+
+def reset_basis(model):
+    """
+    保持している基底を捨て, 次の求解をスラック基底から始める (HiGHS のみ, CBC では何もしない)
+
+    Returns:
+    - ok: 基底を捨てたら True (CBC や非公開の属性を使えない場合は False)
+    """
+    if not highs_internals_available(model):
+        return False
+
+    try:
+        model.solver._flush()
+        status = model.solver._lib.Highs_setLogicalBasis(model.solver._model)
+    except (AttributeError, TypeError, mip.InterfacingError):
+        return False
+
+    return status == 0
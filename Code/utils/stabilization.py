@@ -0,0 +1,146 @@
+from utils.pricing import lagrangian_bound
+
+class DualStabilizer:
+    def __init__(self, lps, method="wentges", alpha=0.8, delta=1.0, epsilon=None,
+                 factor=0.5, max_mispricings=5, tol=10e-6):
+        """
+        列生成法の双対変数の安定化
+
+        安定化の中心 (ラグランジュ上界が最小だった双対変数) を保持し, 価格付けに使う双対変数を中心に寄せる.
+        - "wentges": 価格付けに中心と LPS の双対変数の凸結合 alpha * center + (1 - alpha) * y を使う
+        - "box": 双対変数を center +- delta の箱に制限する (箱の外のペナルティを十分大きくした du Merle)
+        - "du_merle": 箱の外に epsilon の重みのペナルティを課す
+
+        安定化した双対変数で列が見つからないこと (misprice) は最適性を意味しない.
+        その場合は安定化を弱め ("wentges" は alpha を下げ, "box" は箱を広げ, "du_merle" はペナルティを下げる),
+        max_mispricings 回続いたら安定化をやめる. is_exact() が True のときだけ終了してよい.
+
+        Parameters:
+        - lps: LPS
+        - method: "wentges", "box", "du_merle" のいずれか
+        - alpha: Wentges の平滑化の重み (0 <= alpha < 1)
+        - delta: 箱の半径
+        - epsilon: 人工変数の上界 (None なら "box" は頂点数, "du_merle" は 1)
+        - factor: misprice のたびに安定化を弱める倍率
+        - max_mispricings: 安定化をやめるまでの misprice の回数
+        - tol: 人工変数の値の許容誤差
+        """
+        if method not in ("wentges", "box", "du_merle"):
+            raise ValueError("method must be 'wentges', 'box' or 'du_merle'.")
+        if not 0 <= alpha < 1:
+            raise ValueError("alpha must be in [0, 1).")
+
+        self.lps = lps
+        self.method = method
+        self.alpha = alpha
+        self.delta = delta
+        if epsilon is None:
+            epsilon = len(lps.vertices) if method == "box" else 1.0
+        self.epsilon = epsilon
+        self.factor = factor
+        self.max_mispricings = max_mispricings
+        self.tol = tol
+
+        self.center = None
+        self.best_bound = float("inf")
+        self.mispricings = 0
+        self.active = True
+        self.smoothed = False
+
+    def pricing_duals(self, lps_dual_sol):
+        """
+        価格付けに使う双対変数を返す
+
+        Parameters:
+        - lps_dual_sol: LPS の双対解 {頂点 u: 値}
+        """
+        if self.center is None:
+            self.center = dict(lps_dual_sol)
+            self._apply()
+
+        # misprice の回数に応じて alpha を下げる
+        alpha = max(0.0, 1 - (self.mispricings + 1) * (1 - self.alpha))
+        self.smoothed = self.active and self.method == "wentges" and alpha > 0 and self.center != lps_dual_sol
+        if not self.smoothed:
+            return lps_dual_sol
+
+        return {u: alpha * self.center[u] + (1 - alpha) * y_u for u, y_u in lps_dual_sol.items()}
+
+    def set_center(self, center, best_bound=float("inf")):
+        """
+        安定化の中心を与える (チェックポイントから再開するときに使う)
+
+        Parameters:
+        - center: 中心の双対変数 {頂点 u: 値}
+        - best_bound: center でのラグランジュ上界
+        """
+        self.center = dict(center)
+        self.best_bound = best_bound
+        self._apply()
+
+    def update(self, pricing_dual_sol, max_reduced_cost):
+        """
+        AP-MILP を最適に解いた結果で安定化の中心を更新する
+
+        Parameters:
+        - pricing_dual_sol: 価格付けに使った双対変数
+        - max_reduced_cost: AP-MILP の最適値
+
+        Returns:
+        - bound: pricing_dual_sol でのラグランジュ上界
+        """
+        bound = lagrangian_bound(pricing_dual_sol, max_reduced_cost, len(self.lps.vertices))
+        if bound < self.best_bound:
+            self.best_bound = bound
+            self.center = dict(pricing_dual_sol)
+            self._apply()
+
+        return bound
+
+    def found_columns(self):
+        """
+        列が見つかったら misprice の回数を戻す
+        """
+        self.mispricings = 0
+
+    def is_exact(self):
+        """
+        列が見つからなかったときに LPS の最適値が LP(全列) の最適値と一致するか
+        """
+        if not self.active:
+            return True
+        if self.method == "wentges":
+            return not self.smoothed
+        return self.lps.dual_box_violation() <= self.tol
+
+    def misprice(self):
+        """
+        安定化した双対変数で列が見つからなかったときに安定化を弱める
+        """
+        self.mispricings += 1
+
+        if self.method == "wentges":
+            # alpha は pricing_duals で下げるので, 同じ LPS の解でもう一度価格付けすればよい
+            return
+
+        if self.mispricings >= self.max_mispricings:
+            self.deactivate()
+            return
+
+        # 中心を移し, 箱を広げる (du Merle はペナルティも下げる)
+        self.center = dict(self.lps.lps_dual_sol)
+        self.delta /= self.factor
+        if self.method == "du_merle":
+            self.epsilon *= self.factor
+        self._apply()
+
+    def deactivate(self):
+        """
+        安定化をやめる (以降は LPS の双対変数そのもので価格付けする)
+        """
+        self.active = False
+        self.lps.clear_dual_box()
+
+    def _apply(self):
+        if self.active and self.method != "wentges":
+            self.lps.set_dual_box(self.center, self.delta, self.epsilon)
@@ -0,0 +1,69 @@
+import numpy as np
+
+from utils.signed_graph import SignedGraph
+
+def planted_signed_graph(n, communities=4, density=0.1, negative_fraction=0.3, noise=0.0, seed=0):
+    """
+    コミュニティを埋め込んだランダムな符号付きグラフを生成する
+
+    頂点をほぼ同じ大きさのコミュニティに分け, 辺の (1 - negative_fraction) をコミュニティ内,
+    negative_fraction をコミュニティ間に置く. コミュニティ内の辺は正, コミュニティ間の辺は負とし,
+    各辺の符号を確率 noise で反転する (noise = 0 なら埋め込んだ分割は構造的にバランスしている).
+    辺の数は density * n(n-1)/2 を目安とし, 重複した頂点対は 1 本にまとめる.
+    密な隣接行列は作らないので, 大きな n でも辺の数に比例するメモリで生成できる.
+
+    Parameters:
+    - n: 頂点数
+    - communities: コミュニティ数
+    - density: 辺の密度 (0 ~ 1)
+    - negative_fraction: 負の辺 (コミュニティ間の辺) の割合の目安 (0 ~ 1)
+    - noise: 辺の符号を反転する確率
+    - seed: 乱数シード
+
+    Returns:
+    - graph: SignedGraph
+    - labels: 各頂点のコミュニティ番号の配列
+    """
+    if communities < 1 or communities > n:
+        raise ValueError("communities must be between 1 and n.")
+    if not 0 <= density <= 1 or not 0 <= negative_fraction <= 1 or not 0 <= noise <= 1:
+        raise ValueError("density, negative_fraction and noise must be between 0 and 1.")
+
+    rng = np.random.default_rng(seed)
+    labels = rng.permutation(np.arange(n) % communities)
+
+    # コミュニティ順に並べた頂点と各コミュニティの先頭位置・大きさ
+    order = np.argsort(labels, kind="stable")
+    sizes = np.bincount(labels, minlength=communities)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    num_edges = int(round(density * n * (n - 1) / 2))
+    num_inter = int(round(num_edges * negative_fraction)) if communities > 1 else 0
+    num_intra = num_edges - num_inter
+
+    # コミュニティ内の頂点対: u を選び, 同じコミュニティから v を選ぶ
+    u_intra = rng.integers(0, n, size=2 * num_intra)
+    c_intra = labels[u_intra]
+    v_intra = order[starts[c_intra] + (rng.random(len(u_intra)) * sizes[c_intra]).astype(np.int64)]
+
+    # コミュニティ間の頂点対: 一様に選び, 同じコミュニティの対を捨てる
+    u_inter = rng.integers(0, n, size=4 * num_inter)
+    v_inter = rng.integers(0, n, size=4 * num_inter)
+    keep = labels[u_inter] != labels[v_inter]
+    u_inter, v_inter = u_inter[keep], v_inter[keep]
+
+    u_all, v_all = [], []
+    for u, v, count in ((u_intra, v_intra, num_intra), (u_inter, v_inter, num_inter)):
+        u, v = np.minimum(u, v), np.maximum(u, v)
+        keys = u[u != v] * n + v[u != v]
+        _, first = np.unique(keys, return_index=True)
+        keys = keys[np.sort(first)][:count]
+        u_all.append(keys // n)
+        v_all.append(keys % n)
+
+    u = np.concatenate(u_all)
+    v = np.concatenate(v_all)
+    sign = np.where(labels[u] == labels[v], 1, -1)
+    sign[rng.random(len(sign)) < noise] *= -1
+
+    return SignedGraph.from_edges(n, u, v, sign), labels
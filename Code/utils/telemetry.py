@@ -0,0 +1,114 @@
+import json
+import math
+import time
+from contextlib import contextmanager
+
+def _json_value(value):
+    """
+    JSON に書けるように inf と nan を None にする
+    """
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+class Telemetry:
+    def __init__(self, callback=None, trace_path=None, counters=None):
+        """
+        列生成法の反復ごとの計測値を集め, コールバックと JSONL のトレースに渡す
+
+        反復は begin で始め, 次の begin または end で確定する (途中で continue や break しても記録が漏れない).
+        timer で測った時間と update で与えた値を 1 つの記録にまとめ,
+        確定した記録を callback(record) に渡し, trace_path があれば 1 行ずつ書き出す.
+
+        Parameters:
+        - callback: 確定した記録 (辞書) を受け取る関数 (None なら呼ばない)
+        - trace_path: JSONL のトレースの出力先 (None なら書かない)
+        - counters: {名前: 累積値を返す関数}. 反復の間の増分を記録に加える
+        """
+        self.callback = callback
+        self.trace = None if trace_path is None else open(trace_path, "w", encoding="utf-8")
+        self.counters = counters or {}
+        self.records = []
+        self.current = None
+        self.start_time = time.perf_counter()
+        self._counter_start = {}
+        self._prev_dual_sol = None
+
+    def begin(self, iteration, **fields):
+        """
+        前の反復の記録を確定し, 新しい反復の記録を始める
+        """
+        self._flush()
+        self.current = {"event": "iteration", "iteration": iteration, **fields}
+        self._counter_start = {name: counter() for name, counter in self.counters.items()}
+
+    def update(self, **fields):
+        """
+        現在の反復の記録に値を加える
+        """
+        if self.current is not None:
+            self.current.update(fields)
+
+    @contextmanager
+    def timer(self, name):
+        """
+        with ブロックの経過時間 [秒] を現在の反復の記録の name に加算する
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.current is not None:
+                self.current[name] = self.current.get(name, 0.0) + time.perf_counter() - start
+
+    def dual_change(self, dual_sol):
+        """
+        前回与えた双対変数との差のユークリッドノルム (初回は None)
+        """
+        prev, self._prev_dual_sol = self._prev_dual_sol, dict(dual_sol)
+        if prev is None:
+            return None
+
+        return math.sqrt(sum((value - prev.get(u, 0.0)) ** 2 for u, value in dual_sol.items()))
+
+    def end(self, **fields):
+        """
+        最後の反復の記録を確定し, 終了の記録 (event = "finish") を出す
+
+        Returns:
+        - records: 全ての記録のリスト
+        """
+        self._flush()
+        self._emit({"event": "finish", **fields})
+        self.close()
+
+        return self.records
+
+    def close(self):
+        """
+        トレースのファイルを閉じる (end の後や, end を呼ばずに例外で抜けた場合に呼ぶ. 何度呼んでもよい)
+
+        途中の反復の記録は確定しないので, トレースには確定した反復までが残る
+        """
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+    def _flush(self):
+        if self.current is None:
+            return
+
+        record = self.current
+        self.current = None
+        for name, counter in self.counters.items():
+            record[name] = counter() - self._counter_start[name]
+        self._emit(record)
+
+    def _emit(self, record):
+        record["elapsed"] = time.perf_counter() - self.start_time
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+        if self.trace is not None:
+            self.trace.write(json.dumps({key: _json_value(value) for key, value in record.items()}) + "\n")
+            self.trace.flush()
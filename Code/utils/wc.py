@@ -1,4 +1,10 @@
+import time
+from collections import OrderedDict
+
 import numpy as np
+import scipy.sparse as sp
+
+from utils.signed_graph import as_signed_graph, induced_sum
 
 def calc_w_C(C, A_plus, A_minus, D_plus, D_minus, lambda_val):
     """
@@ -6,8 +12,8 @@ def calc_w_C(C, A_plus, A_minus, D_plus, D_minus, lambda_val):
 
     Parameters:
     - C: コミュニティ
-    - A_plus: 正の隣接行列
-    - A_minus: 負の隣接行列
+    - A_plus: 正の隣接行列 (密行列または CSR 形式の疎行列)
+    - A_minus: 負の隣接行列 (密行列または CSR 形式の疎行列)
     - D_plus: 正の次数
     - D_minus: 負の次数
     - lambda_val: パラメータ
@@ -18,16 +24,13 @@ def calc_w_C(C, A_plus, A_minus, D_plus, D_minus, lambda_val):
     # コミュニティのサイズ
     size_C = len(C)
 
-    # CとCの直積
-    CC = np.ix_(C, C)
-
     # 正のエッジ
-    sum_a_plus = np.sum(A_plus[CC])
+    sum_a_plus = induced_sum(A_plus, C)
     sum_d_plus = np.sum(D_plus[C])
     plus = (2 * sum_a_plus - 2 * (1 - lambda_val) * sum_d_plus)
 
     # 負のエッジ
-    sum_a_minus = np.sum(A_minus[CC])
+    sum_a_minus = induced_sum(A_minus, C)
     sum_d_minus = np.sum(D_minus[C])
     minus = (2 * sum_a_minus - 2 * lambda_val * sum_d_minus)
 
@@ -35,3 +38,173 @@ def calc_w_C(C, A_plus, A_minus, D_plus, D_minus, lambda_val):
     w_C = (plus - minus) / size_C
 
     return w_C
+
+class ColumnWeightEngine:
+    def __init__(self, A_plus, A_minus, D_plus, D_minus, lambda_val, batch_size=4096, cache_size=100_000):
+        """
+        列 (コミュニティ) の重み w_C をまとめて計算するエンジン
+
+        各列について辺数の和などの集計値を保持しておき,
+        既に計算した列と数頂点だけ異なる列は差分で重みを求める.
+        局所探索や丸めで試すだけの列も多いので, 集計値は最近使った cache_size 列だけを保持する (LRU).
+        保持していない列は集計し直すので, 結果は cache_size によらない.
+
+        Parameters:
+        - A_plus, A_minus, D_plus, D_minus: calc_w_C と同じ (A_plus に SignedGraph も可)
+        - lambda_val: パラメータ
+        - batch_size: 一度に集計する列の数
+        - cache_size: 集計値を保持する列の最大数 (None なら上限なし)
+        """
+        self.graph = as_signed_graph(A_plus, A_minus, D_plus, D_minus)
+        self.lambda_val = lambda_val
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+
+        # 各列の集計値 {frozenset(C): (sum_a_plus, sum_a_minus, sum_d_plus, sum_d_minus, size_C)} (古い順)
+        self.sums = OrderedDict()
+
+        # 重みの計算にかかった累積時間 [秒] (計測用)
+        self.elapsed = 0.0
+
+    def weights(self, columns):
+        """
+        複数の列の重みを一度に計算する
+
+        Parameters:
+        - columns: 列 (頂点の集合) のリスト
+
+        Returns:
+        - w: 各列の重みの配列
+        """
+        start_time = time.perf_counter()
+        columns = [frozenset(C) for C in columns]
+        rows = {C: self._cached(C) for C in columns}
+        new_columns = [C for C, row in rows.items() if row is None]
+        for start in range(0, len(new_columns), self.batch_size):
+            batch = new_columns[start:start + self.batch_size]
+            for C, row in zip(batch, self._edge_sums(batch)):
+                rows[C] = tuple(row)
+                self._remember(C, rows[C])
+
+        w = self.weights_from_sums(np.array([rows[C] for C in columns], dtype=np.int64).reshape(-1, 5))
+        self.elapsed += time.perf_counter() - start_time
+
+        return w
+
+    def weight(self, C):
+        """
+        1 つの列の重みを計算する
+        """
+        return self.weights([C])[0]
+
+    def derive(self, base_C, add=(), remove=()):
+        """
+        計算済みの列 base_C に頂点を追加・削除した列の重みを差分で計算する
+
+        Parameters:
+        - base_C: 元の列
+        - add: 追加する頂点
+        - remove: 削除する頂点
+
+        Returns:
+        - C: 新しい列 (frozenset)
+        - w_C: 新しい列の重み
+        """
+        start_time = time.perf_counter()
+        base_C = frozenset(base_C)
+        base_sums = self._cached(base_C)
+        if base_sums is None:
+            base_sums = tuple(self._edge_sums([base_C])[0])
+            self._remember(base_C, base_sums)
+
+        sum_a_plus, sum_a_minus, sum_d_plus, sum_d_minus, size_C = base_sums
+        C = set(base_C)
+        for v in remove:
+            if v not in C:
+                continue
+            C.discard(v)
+            in_plus, in_minus = self._neighbors_in(v, C)
+            sum_a_plus -= 2 * in_plus
+            sum_a_minus -= 2 * in_minus
+            sum_d_plus -= self.graph.D_plus[v]
+            sum_d_minus -= self.graph.D_minus[v]
+            size_C -= 1
+        for v in add:
+            if v in C:
+                continue
+            in_plus, in_minus = self._neighbors_in(v, C)
+            C.add(v)
+            sum_a_plus += 2 * in_plus
+            sum_a_minus += 2 * in_minus
+            sum_d_plus += self.graph.D_plus[v]
+            sum_d_minus += self.graph.D_minus[v]
+            size_C += 1
+
+        C = frozenset(C)
+        row = (sum_a_plus, sum_a_minus, sum_d_plus, sum_d_minus, size_C)
+        self._remember(C, row)
+        w_C = self.weights_from_sums(np.array([row], dtype=np.int64))[0]
+        self.elapsed += time.perf_counter() - start_time
+
+        return C, w_C
+
+    def set_lambda(self, lambda_val):
+        """
+        パラメータ lambda を変更する (集計値は lambda によらないのでそのまま使える)
+        """
+        self.lambda_val = lambda_val
+
+    def weights_from_sums(self, sums):
+        """
+        集計値の配列 (列数 x 5) から重みを計算する (calc_w_C と同じ式)
+        """
+        sum_a_plus, sum_a_minus, sum_d_plus, sum_d_minus, size_C = sums.T
+
+        plus = (2 * sum_a_plus - 2 * (1 - self.lambda_val) * sum_d_plus)
+        minus = (2 * sum_a_minus - 2 * self.lambda_val * sum_d_minus)
+
+        return (plus - minus) / size_C
+
+    def _cached(self, C):
+        # 保持している集計値 (なければ None). 使った列は新しい側に移す
+        row = self.sums.get(C)
+        if row is not None:
+            self.sums.move_to_end(C)
+        return row
+
+    def _remember(self, C, row):
+        # 集計値を保持し, cache_size を超えたら最も古く使った列から捨てる
+        self.sums[C] = row
+        self.sums.move_to_end(C)
+        if self.cache_size is not None:
+            while len(self.sums) > self.cache_size:
+                self.sums.popitem(last=False)
+
+    def _edge_sums(self, columns):
+        # 列の指示行列 X (n x k) を作り, diag(X^T A X) を疎行列の積で一度に求める
+        sizes = np.fromiter((len(C) for C in columns), dtype=np.int64, count=len(columns))
+        indices = np.fromiter((u for C in columns for u in C), dtype=np.int64, count=int(sizes.sum()))
+        indptr = np.concatenate([[0], np.cumsum(sizes)])
+        X = sp.csc_array(
+            (np.ones(len(indices), dtype=np.int64), indices, indptr),
+            shape=(self.graph.n, len(columns)),
+        )
+
+        sum_a_plus = (self.graph.A_plus @ X).multiply(X).sum(axis=0)
+        sum_a_minus = (self.graph.A_minus @ X).multiply(X).sum(axis=0)
+        D_plus = np.asarray(self.graph.D_plus, dtype=np.int64)
+        D_minus = np.asarray(self.graph.D_minus, dtype=np.int64)
+        sum_d_plus = np.add.reduceat(D_plus[indices], indptr[:-1])
+        sum_d_minus = np.add.reduceat(D_minus[indices], indptr[:-1])
+
+        return np.column_stack([
+            np.asarray(sum_a_plus).ravel(), np.asarray(sum_a_minus).ravel(), sum_d_plus, sum_d_minus, sizes
+        ]).astype(np.int64)
+
+    def _neighbors_in(self, v, C):
+        # 頂点 v の正・負の隣接頂点のうち C に含まれるものの数
+        A_plus, A_minus = self.graph.A_plus, self.graph.A_minus
+        nbrs_plus = A_plus.indices[A_plus.indptr[v]:A_plus.indptr[v + 1]].tolist()
+        nbrs_minus = A_minus.indices[A_minus.indptr[v]:A_minus.indptr[v + 1]].tolist()
+
+        return sum(1 for u in nbrs_plus if u in C), sum(1 for u in nbrs_minus if u in C)